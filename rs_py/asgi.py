@@ -0,0 +1,4 @@
+# asgi.py
+from src.python.asgi_integrator import create_asgi_app
+
+app = create_asgi_app()
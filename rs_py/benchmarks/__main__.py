@@ -0,0 +1,89 @@
+# benchmarks/__main__.py
+"""Run the benchmark suites and compare results against a baseline.
+
+    python -m benchmarks run                          # all suites, print a table
+    python -m benchmarks run -o current.json          # ... and save the results
+    python -m benchmarks run --suite micro --save-baseline
+    python -m benchmarks run --suite memory           # KiB held by a 10k-unit config
+    python -m benchmarks compare current.json         # against benchmarks/baseline.json
+    python -m benchmarks compare old.json new.json --threshold 0.2
+
+No baseline is committed, as timings depend on the machine: record one
+with --save-baseline before comparing against it. compare exits with
+status 1 if any benchmark regressed. Server throughput
+is measured separately by `python -m benchmarks.servers`.
+"""
+import argparse
+import os
+import sys
+
+from benchmarks import api, memory, micro, startup
+from benchmarks.harness import (
+    DEFAULT_BASELINE, DEFAULT_THRESHOLD, FULL, QUICK,
+    compare, load, print_comparison, print_results, save
+)
+
+SUITES = {
+    "micro": micro,
+    "api": api,
+    "cli": startup,
+    "memory": memory,
+}
+
+
+def run_suites(names, settings):
+    results = []
+    for name in names:
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        results.extend(SUITES[name].run(settings))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Relative Sizes benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmark suites")
+    run_parser.add_argument("--suite", choices=sorted(SUITES), action="append",
+                            help="Suite to run (default: all)")
+    run_parser.add_argument("--output", "-o", help="Save results as JSON to this file")
+    run_parser.add_argument("--save-baseline", action="store_true",
+                            help=f"Save results as the baseline ({os.path.relpath(DEFAULT_BASELINE)})")
+    run_parser.add_argument("--quick", action="store_true", help="One short sample per benchmark")
+
+    compare_parser = commands.add_parser("compare", help="Compare results with a baseline")
+    compare_parser.add_argument("files", nargs="+", metavar="FILE",
+                                help="CURRENT, or BASELINE CURRENT")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="Increase that counts as a regression (default: 0.10 = 10%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suites(args.suite or list(SUITES), QUICK if args.quick else FULL)
+        print_results(results)
+        if args.output:
+            save(results, args.output)
+        if args.save_baseline:
+            save(results, DEFAULT_BASELINE)
+        return 0
+
+    if len(args.files) > 2:
+        parser.error("compare takes CURRENT or BASELINE CURRENT")
+    baseline_path, current_path = ([DEFAULT_BASELINE] + args.files)[-2:]
+    if not os.path.exists(baseline_path):
+        parser.error(f"no baseline at {os.path.relpath(baseline_path)}; record one with "
+                     f"`python -m benchmarks run --save-baseline`, or name one: compare BASELINE CURRENT")
+    if not os.path.exists(current_path):
+        parser.error(f"no results at {current_path}; save some with `python -m benchmarks run -o {current_path}`")
+    rows = compare(load(baseline_path), load(current_path), args.threshold)
+    print_comparison(rows)
+    regressions = [row for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
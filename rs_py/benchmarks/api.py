@@ -0,0 +1,38 @@
+# benchmarks/api.py
+"""Macro-benchmarks: one request per /api route through the Flask test client.
+
+Measures routing, JSON decoding and encoding and the handlers, without a
+network or server in the way (benchmarks.servers covers those). The
+result cache is off while measuring, so every conversion does the work.
+"""
+from benchmarks.harness import bench
+
+SUITE = "api"
+
+CONVERT_BODY = {"inputValue": 90000, "currentUnit": "seconds", "currentScale": "time"}
+BATCH_BODY = {"inputValues": list(range(1, 101)), "currentUnit": "seconds", "currentScale": "time"}
+
+
+def run(settings):
+    from src.python.integrator import app
+    from src.python.relative_sizes import relative_sizes
+
+    client = app.test_client()
+    cases = [
+        ("POST /api/convert", lambda: client.post("/api/convert", json=CONVERT_BODY)),
+        ("POST /api/convert/batch (100)", lambda: client.post("/api/convert/batch", json=BATCH_BODY)),
+        ("GET /api/config", lambda: client.get("/api/config")),
+        ("GET /api/scales", lambda: client.get("/api/scales")),
+        ("GET /api/units/<scale>", lambda: client.get("/api/units/time")),
+        ("GET /api/cache", lambda: client.get("/api/cache")),
+    ]
+
+    cache = relative_sizes.cache
+    relative_sizes.disable_cache()
+    try:
+        for name, request in cases:
+            response = request()
+            assert response.status_code == 200, f"{name} returned {response.status_code}"
+        return [bench(SUITE, name, request, settings) for name, request in cases]
+    finally:
+        relative_sizes.cache = cache
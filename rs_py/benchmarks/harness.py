@@ -0,0 +1,141 @@
+# benchmarks/harness.py
+"""Timing, result files and baseline comparison shared by the suites.
+
+A result is a dict: suite, name, unit ("us" per operation, or "KiB" for
+memory), median, best, stdev, number (operations per sample) and repeat
+(samples). Medians are
+what compare() looks at; they are steadier than means on a busy machine.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# A result this much slower than its baseline is a regression
+DEFAULT_THRESHOLD = 0.10
+
+
+class Settings:
+    """How long to measure: repeat samples of at least min_time seconds each."""
+
+    def __init__(self, repeat=7, min_time=0.05):
+        self.repeat = repeat
+        self.min_time = min_time
+
+
+FULL = Settings()
+QUICK = Settings(repeat=1, min_time=0.001)
+
+
+def result(suite, name, samples, number=1, unit="us"):
+    return {
+        "suite": suite,
+        "name": name,
+        "unit": unit,
+        "median": statistics.median(samples),
+        "best": min(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": len(samples),
+    }
+
+
+def bench(suite, name, fn, settings):
+    """Time fn() with timeit (GC off), calibrating the loop count first."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < settings.min_time:
+        number *= 2
+    samples = [total / number * 1e6 for total in timer.repeat(settings.repeat, number)]
+    return result(suite, name, samples, number)
+
+
+def time_process(command, env=None, cwd=ROOT):
+    """Wall-clock microseconds for one run of a command."""
+    started = time.perf_counter()
+    subprocess.run(command, cwd=cwd, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - started) * 1e6
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def save(results, path):
+    with open(path, "w") as f:
+        json.dump({"meta": metadata(), "results": results}, f, indent=2)
+        f.write("\n")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Match results by suite and name.
+
+    Returns rows of (key, baseline_median, current_median, ratio, status),
+    where status is "regression", "improvement", "ok", "new" or "missing".
+    """
+    def by_key(document):
+        return {(r["suite"], r["name"]): r for r in document["results"]}
+
+    old, new = by_key(baseline), by_key(current)
+    rows = []
+    for key in list(old) + [k for k in new if k not in old]:
+        if key not in new:
+            rows.append((key, old[key]["median"], None, None, "missing"))
+            continue
+        if key not in old:
+            rows.append((key, None, new[key]["median"], None, "new"))
+            continue
+        ratio = new[key]["median"] / old[key]["median"] if old[key]["median"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((key, old[key]["median"], new[key]["median"], ratio, status))
+    return rows
+
+
+def print_results(results, out=sys.stdout):
+    out.write(f"{'benchmark':<44}{'median':>12}{'best':>12}{'stdev':>10}  unit\n")
+    for r in results:
+        out.write(f"{r['suite'] + ': ' + r['name']:<44}{r['median']:>12.2f}"
+                  f"{r['best']:>12.2f}{r['stdev']:>10.2f}  {r['unit']}\n")
+
+
+def print_comparison(rows, out=sys.stdout):
+    out.write(f"{'benchmark':<44}{'baseline':>12}{'current':>12}{'change':>9}  status\n")
+    for (suite, name), old, new, ratio, status in rows:
+        old_text = f"{old:12.2f}" if old is not None else f"{'-':>12}"
+        new_text = f"{new:12.2f}" if new is not None else f"{'-':>12}"
+        change = f"{(ratio - 1) * 100:+8.1f}%" if ratio is not None else f"{'-':>9}"
+        out.write(f"{suite + ': ' + name:<44}{old_text}{new_text}{change}  {status}\n")
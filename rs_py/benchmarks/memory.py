@@ -0,0 +1,98 @@
+# benchmarks/memory.py
+"""Memory held by a large config: 10 scales of 1000 units each.
+
+Each result is the KiB still allocated, as traced by tracemalloc, once a
+step has finished and garbage has been collected. The Scale model shares
+its name strings with the config dicts it was built from, so it is
+measured with those dicts already in memory; so is ConfigSnapshot, which
+builds its own model and indexes on top.
+
+Route legs are measured the same way: LEGS legs between LEG_POINTS
+points, as makep2p objects and as a LegTable, from the same tuples.
+"""
+import gc
+import json
+import random
+import tracemalloc
+
+from benchmarks.harness import result
+from src.python.routeFinder import LegTable, makep2p
+from src.python.scale_model import load_scales
+from src.python.scale_registry import ConfigSnapshot
+
+SUITE = "memory"
+SCALES = 10
+UNITS_PER_SCALE = 1000
+LEGS = 100_000
+LEG_POINTS = 10_000
+
+
+def synthetic_config(scales=SCALES, units_per_scale=UNITS_PER_SCALE):
+    """A valid config of scales * units_per_scale units with distinct names."""
+    return {"scales": [
+        {
+            "name": f"scale{s}",
+            "defaultUnit": f"s{s}unit0",
+            "units": [
+                {
+                    "name": f"s{s}unit{i}",
+                    "plural": f"s{s}units{i}",
+                    "conversionFactor": 1.01 ** i,
+                    "decimalPlaces": i % 3,
+                }
+                for i in range(units_per_scale)
+            ],
+        }
+        for s in range(scales)
+    ]}
+
+
+def synthetic_legs(legs=LEGS, points=LEG_POINTS, seed=0):
+    """(start, end, distance, duration) tuples between points named p0, p1, ..."""
+    rng = random.Random(seed)
+    names = [f"p{i}" for i in range(points)]
+    return [(rng.choice(names), rng.choice(names), rng.randint(1, 9), rng.randint(1, 90)) for _ in range(legs)]
+
+
+def leg_table(legs):
+    table = LegTable()
+    for leg in legs:
+        table.add(*leg)
+    return table
+
+
+def retained_kib(build):
+    """KiB allocated by build() and still held by what it returns."""
+    # Once unmeasured, so one-off entries in module-level caches are not counted
+    build()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        built = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del built
+    return (after - before) / 1024
+
+
+def run(settings):
+    text = json.dumps(synthetic_config())
+    config = json.loads(text)
+    units = SCALES * UNITS_PER_SCALE
+    legs = synthetic_legs()
+    cases = [
+        (f"config dicts ({units} units)", lambda: json.loads(text)),
+        (f"Scale model ({units} units)", lambda: load_scales(config)),
+        (f"ConfigSnapshot ({units} units)", lambda: ConfigSnapshot(config, 1)),
+        (f"makep2p legs ({LEGS} legs)", lambda: [makep2p(*leg) for leg in legs]),
+        (f"LegTable ({LEGS} legs)", lambda: leg_table(legs)),
+    ]
+    # Allocation is repeatable, so a few samples are plenty
+    repeat = max(min(settings.repeat, 3), 1)
+    return [
+        result(SUITE, name, [retained_kib(build) for _ in range(repeat)], unit="KiB")
+        for name, build in cases
+    ]
@@ -0,0 +1,69 @@
+# benchmarks/micro.py
+"""Micro-benchmarks for the conversion core.
+
+Inputs come from a fixed seed and the result cache is off, so runs are
+comparable across commits.
+"""
+import random
+
+from benchmarks.harness import bench
+from src.python.number_format import format_number, load_numpy
+from src.python.relative_sizes import RelativeSizes
+from src.python.scale_registry import ScaleRegistry
+
+SUITE = "micro"
+SEED = 1234
+SAMPLE_SIZE = 1000
+
+
+def inputs(scale):
+    """(value, unit) pairs spread over every unit and several magnitudes."""
+    rng = random.Random(SEED)
+    units = [u["plural"] for u in scale["units"]]
+    return [(rng.choice([rng.randint(1, 100), rng.uniform(0, 1e6), rng.uniform(0, 1)]), rng.choice(units))
+            for _ in range(SAMPLE_SIZE)]
+
+
+def run(settings):
+    rs = RelativeSizes()
+    snapshot = ScaleRegistry().current()
+    scale = snapshot.config["scales"][0]
+    compiled = snapshot.scales[scale["name"]]
+    pairs = inputs(scale)
+    values = [value for value, _ in pairs]
+    per_item = len(pairs)
+
+    def convert_raw():
+        for value, unit in pairs:
+            rs.convert(value, unit, scale)
+
+    def convert_compiled():
+        for value, unit in pairs:
+            rs.convert(value, unit, compiled)
+
+    def find_best_unit():
+        for value in values:
+            rs.find_best_unit(value, compiled.units)
+
+    def format_numbers():
+        for value in values:
+            format_number(value, 2)
+
+    cases = [
+        ("convert (raw scale)", convert_raw),
+        ("convert (compiled scale)", convert_compiled),
+        ("find_best_unit", find_best_unit),
+        ("format_number", format_numbers),
+    ]
+    if load_numpy() is not None:
+        unit = scale["units"][0]["plural"]
+        cases.append(("convert_many (per value)", lambda: rs.convert_many(values, unit, compiled)))
+
+    results = []
+    for name, fn in cases:
+        r = bench(SUITE, name, fn, settings)
+        # Report per value, not per loop over the sample
+        for key in ("median", "best", "stdev"):
+            r[key] /= per_item
+        results.append(r)
+    return results
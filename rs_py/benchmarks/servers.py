@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# benchmarks/servers.py
+"""Compare the WSGI (gunicorn) and ASGI (uvicorn) variants of the API.
+
+Starts each server on a local port, drives POST /api/convert with a
+keep-alive load generator and reports requests/sec and latency percentiles.
+
+    python -m benchmarks.servers --connections 32 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "wsgi": lambda port, workers: [
+        sys.executable, "-m", "gunicorn", "wsgi:app", "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers), "--worker-class", "gthread", "--threads", "8",
+        "--log-level", "warning",
+    ],
+    "asgi": lambda port, workers: [
+        sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning",
+    ],
+}
+
+BODY = json.dumps({"inputValue": 90000, "currentUnit": "seconds", "currentScale": "time"}).encode()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+def request_bytes(port, body=BODY):
+    return (
+        f"POST /api/convert HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; return (status, keep_alive)."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = dict(line.split(":", 1) for line in lines[1:] if ":" in line)
+    headers = {k.strip().lower(): v.strip().lower() for k, v in headers.items()}
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("connection") != "close"
+
+
+async def client(port, deadline, latencies, errors):
+    request = request_bytes(port)
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        if writer is None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        started = time.perf_counter()
+        writer.write(request)
+        status, keep_alive = await read_response(reader)
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            errors.append(status)
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def generate_load(port, connections, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(client(port, deadline, latencies, errors) for _ in range(connections)))
+    return latencies, errors
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run(variant, connections, duration, workers):
+    port = free_port()
+    server = subprocess.Popen(SERVERS[variant](port, workers), cwd=ROOT)
+    try:
+        wait_for_port(port)
+        asyncio.run(generate_load(port, connections, 1))  # warm up
+        latencies, errors = asyncio.run(generate_load(port, connections, duration))
+    finally:
+        server.terminate()
+        server.wait()
+    latencies.sort()
+    return {
+        "variant": variant,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_sec": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the WSGI and ASGI servers")
+    parser.add_argument("--connections", type=int, default=32, help="Concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per server")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes")
+    parser.add_argument("--variant", choices=sorted(SERVERS), action="append",
+                        help="Server to benchmark (default: both)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [run(v, args.connections, args.duration, args.workers)
+               for v in args.variant or sorted(SERVERS)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return results
+    print(f"{'variant':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for r in results:
+        print(f"{r['variant']:<8}{r['requests_per_sec']:>10.0f}{r['p50_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['errors']:>8}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# benchmarks/startup.py
+"""CLI start-up timings: whole `python cli.py ...` processes.
+
+Cold runs get an empty bytecode cache and no config cache, as after a
+fresh checkout or a config edit. Warm runs reuse both, as when the CLI is
+called repeatedly from a shell loop.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+from benchmarks.harness import result, time_process
+
+SUITE = "cli"
+
+COMMANDS = [
+    ("scales", ["scales"]),
+    ("convert", ["convert", "time", "60", "seconds"]),
+]
+
+
+def run(settings):
+    # Whole processes are slow, so settings.repeat alone sets the run count
+    runs = max(settings.repeat, 1)
+    workdir = tempfile.mkdtemp(prefix="rs-bench-")
+    try:
+        results = []
+        for label, args in COMMANDS:
+            command = [sys.executable, "cli.py", *args]
+            cold, warm = [], []
+            for run_number in range(runs):
+                env = dict(os.environ)
+                # The cold run must be able to fill the bytecode cache for the warm one
+                env.pop("PYTHONDONTWRITEBYTECODE", None)
+                env["PYTHONPYCACHEPREFIX"] = os.path.join(workdir, f"pycache-{label}-{run_number}")
+                env["RS_CONFIG_CACHE"] = os.path.join(workdir, f"config-{label}-{run_number}.marshal")
+                cold.append(time_process(command, env))
+                warm.append(time_process(command, env))
+            results.append(result(SUITE, f"{label} (cold)", cold))
+            results.append(result(SUITE, f"{label} (warm)", warm))
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
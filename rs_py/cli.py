@@ -1,133 +1,71 @@
 #!/usr/bin/env python3
 # cli.py
-import argparse
-import json
-import os
+"""Relative Sizes Converter CLI.
+
+Each command imports only what it needs, so listing scales does not pay
+for the converter, the interactive shell or the bulk machinery. Run with
+`python -X importtime cli.py ...` to see what a command loads.
+"""
 import sys
-import cmd
-from src.python.relative_sizes import relative_sizes
 
-# Add color support if available
-try:
-    import colorama
-    from colorama import Fore, Style
-    colorama.init()
-    USE_COLOR = True
-except ImportError:
-    USE_COLOR = False
-    class DummyFore:
-        def __getattr__(self, name):
-            return ""
-    class DummyStyle:
-        def __getattr__(self, name):
-            return ""
-    Fore = DummyFore()
-    Style = DummyStyle()
+# Record formats for 'stream', as in src/python/bulk_convert.py
+INPUT_FORMATS = ('auto', 'csv', 'jsonl')
+OUTPUT_FORMATS = ('jsonl', 'csv')
+
+def read_lines(paths):
+    """Yield lines from each file in turn; '-' is stdin"""
+    for path in paths:
+        if path == '-':
+            yield from sys.stdin
+            continue
+        with open(path, 'r', newline='') as f:
+            yield from f
 
-def load_config():
-    """Load the configuration file"""
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                              'src', 'config', 'config.json')
+def stream_conversions(args):
+    """Convert records from files or stdin, writing plain JSONL or CSV to stdout"""
+    from src.python.bulk_convert import convert_stream
+    from src.python.scale_registry import ConfigError, cached_registry
     try:
-        with open(config_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"{Fore.RED}Error: Config file not found at {config_path}{Style.RESET_ALL}")
-        sys.exit(1)
-    except json.JSONDecodeError:
-        print(f"{Fore.RED}Error: Config file contains invalid JSON{Style.RESET_ALL}")
+        snapshot = cached_registry().current()
+        convert_stream(read_lines(args.files), sys.stdout, snapshot,
+                       input_format=args.input_format, output_format=args.format,
+                       jobs=args.jobs, flush=args.flush)
+    except (ConfigError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
-def print_scales(config):
-    """List all available scales"""
-    print(f"{Fore.CYAN}Available scales:{Style.RESET_ALL}")
-    for scale in config["scales"]:
-        print(f"  {Fore.GREEN}{scale['name']}{Style.RESET_ALL}")
-
-def print_units(config, scale_name):
-    """List all units for a given scale"""
-    scale = next((s for s in config["scales"] if s["name"] == scale_name), None)
-    if not scale:
-        print(f"{Fore.RED}Error: Scale '{scale_name}' not found{Style.RESET_ALL}")
-        return False
-    
-    print(f"{Fore.CYAN}Units for scale '{scale_name}':{Style.RESET_ALL}")
-    for unit in scale["units"]:
-        print(f"  {Fore.GREEN}{unit['name']}{Style.RESET_ALL} ({unit['plural']})")
-        print(f"    Conversion factor: {Fore.YELLOW}{unit['conversionFactor']}{Style.RESET_ALL}")
-    return True
-
-def perform_conversion(config, scale_name, input_value, unit):
-    """Convert a value using the relative sizes module"""
-    # Find the scale
-    scale = next((s for s in config["scales"] if s["name"] == scale_name), None)
-    if not scale:
-        print(f"{Fore.RED}Error: Scale '{scale_name}' not found{Style.RESET_ALL}")
-        return None
-    
-    # Perform conversion
+def serve(args):
+    """Run the converter daemon on a Unix socket"""
+    from src.python.scale_registry import ConfigError, DEFAULT_CONFIG_PATH, ScaleRegistry
+    from src.python.socket_daemon import run
     try:
-        float_value = float(input_value)
-    except ValueError:
-        print(f"{Fore.RED}Error: '{input_value}' is not a valid number{Style.RESET_ALL}")
-        return None
-    
-    result = relative_sizes.convert(float_value, unit, scale)
-    print(f"{Fore.CYAN}{result}{Style.RESET_ALL}")
-    return result
+        # Only SIGHUP reloads, so a half-written config is never picked up
+        registry = ScaleRegistry(args.config or DEFAULT_CONFIG_PATH, check_interval=float('inf'))
+        run(args.socket, registry)
+    except (ConfigError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-class RelativeSizesShell(cmd.Cmd):
-    intro = f"{Fore.GREEN}Relative Sizes Converter Interactive Shell.{Style.RESET_ALL} Type help or ? to list commands.\n"
-    prompt = f"{Fore.BLUE}converter> {Style.RESET_ALL}"
-    
-    def __init__(self):
-        super().__init__()
-        self.config = load_config()
-    
-    def do_scales(self, arg):
-        """List all available scales"""
-        print_scales(self.config)
-    
-    def do_units(self, arg):
-        """List units for a scale: units SCALE_NAME"""
-        if not arg:
-            print(f"{Fore.RED}Error: Scale name is required{Style.RESET_ALL}")
-            return
-        print_units(self.config, arg)
-    
-    def do_convert(self, arg):
-        """Convert a value: convert SCALE VALUE UNIT"""
-        args = arg.split()
-        if len(args) < 3:
-            print(f"{Fore.RED}Error: Not enough arguments. Usage: convert SCALE VALUE UNIT{Style.RESET_ALL}")
-            return
-        
-        scale, value, unit = args[0], args[1], args[2]
-        perform_conversion(self.config, scale, value, unit)
-    
-    def do_exit(self, arg):
-        """Exit the interactive shell"""
-        print(f"{Fore.GREEN}Goodbye!{Style.RESET_ALL}")
-        return True
-    
-    def do_quit(self, arg):
-        """Exit the interactive shell"""
-        return self.do_exit(arg)
-    
-    def do_EOF(self, arg):
-        """Exit on Ctrl+D"""
-        print()
-        return self.do_exit(arg)
-    
-    def emptyline(self):
-        """Do nothing on empty line"""
-        pass
+def convert_over_socket(args):
+    """Convert one value with a running daemon, skipping the converter's startup"""
+    from src.python.socket_client import SocketClient
+    try:
+        with SocketClient(args.socket) as client:
+            response = client.convert(args.scale, args.value, args.unit)
+    except OSError as e:
+        print(f"Error: cannot reach converter daemon at {args.socket}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if "error" in response:
+        print(f"Error: {response['error']}", file=sys.stderr)
+        sys.exit(1)
+    print(response["result"])
 
 def main():
     """Main CLI entry point"""
+    import argparse
     parser = argparse.ArgumentParser(
         description="Relative Sizes Converter CLI",
-        epilog="Example: python cli.py convert time 60 seconds"
+        epilog="Example: python cli.py convert time 60 seconds, or python cli.py convert 60 km"
     )
     
     parser.add_argument('--interactive', '-i', action='store_true', 
@@ -145,30 +83,73 @@ def main():
     
     # 'convert' command for performing conversions
     convert_parser = subparsers.add_parser('convert', help='Convert a value')
-    convert_parser.add_argument('scale', help='Scale name (time, distance, weight)')
+    convert_parser.add_argument('scale', nargs='?',
+                                help='Scale name (time, distance, weight); optional if only one scale has the unit')
     convert_parser.add_argument('value', help='Value to convert')
     convert_parser.add_argument('unit', help='Source unit name')
+    convert_parser.add_argument('--socket', metavar='PATH',
+                                help='Ask the daemon listening on PATH instead of converting here')
+    
+    # 'stream' command for converting many records in one process
+    stream_parser = subparsers.add_parser(
+        'stream', aliases=['batch'],
+        help='Convert scale,value,unit records (CSV or JSON lines) from files or stdin')
+    stream_parser.add_argument('files', nargs='*', default=['-'],
+                               help="Input files, '-' for stdin (default: stdin)")
+    stream_parser.add_argument('--input-format', choices=INPUT_FORMATS, default='auto',
+                               help='Input record format (default: detect per line)')
+    stream_parser.add_argument('--format', choices=OUTPUT_FORMATS, default='jsonl',
+                               help='Output format (default: jsonl)')
+    stream_parser.add_argument('--jobs', '-j', type=int, default=1,
+                               help='Worker processes for large inputs (default: 1)')
+    stream_parser.add_argument('--flush', action='store_true',
+                               help='Flush output after every record')
+    
+    # 'serve' command for the resident converter daemon
+    serve_parser = subparsers.add_parser('serve', help='Run a converter daemon on a Unix socket')
+    serve_parser.add_argument('--socket', metavar='PATH', required=True,
+                              help='Unix socket path to listen on')
+    serve_parser.add_argument('--config', metavar='PATH',
+                              help='Config file (default: src/config/config.json); SIGHUP reloads it')
     
     # Parse arguments
     args = parser.parse_args()
     
     # Interactive mode
     if args.interactive:
+        from src.python.cli_shell import RelativeSizesShell
         RelativeSizesShell().cmdloop()
         return
     
+    # Machine-readable bulk mode: no colour, no human-facing helpers
+    if args.command in ('stream', 'batch'):
+        stream_conversions(args)
+        return
+    
+    if args.command == 'serve':
+        serve(args)
+        return
+    
+    if args.command == 'convert' and args.socket:
+        convert_over_socket(args)
+        return
+    
+    if args.command is None:
+        parser.print_help()
+        return
+    
+    from src.python.cli_commands import load_registry, perform_conversion, print_scales, print_units
+    
     # Load configuration
-    config = load_config()
+    snapshot = load_registry().current()
     
     # Handle commands
     if args.command == 'scales':
-        print_scales(config)
+        print_scales(snapshot)
     elif args.command == 'units':
-        print_units(config, args.scale)
+        print_units(snapshot, args.scale)
     elif args.command == 'convert':
-        perform_conversion(config, args.scale, args.value, args.unit)
-    else:
-        parser.print_help()
+        perform_conversion(snapshot, args.scale, args.value, args.unit)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,11 @@
+# gunicorn.conf.py
+# Read by gunicorn when started from this directory, e.g. `gunicorn wsgi:app`
+import os
+
+
+def on_starting(server):
+    # Workers share /metrics through RS_METRICS_DIR; drop counts from the last run
+    metrics_dir = os.environ.get("RS_METRICS_DIR")
+    if metrics_dir:
+        from src.python.metrics import clear_directory
+        clear_directory(metrics_dir)
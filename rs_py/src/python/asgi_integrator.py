@@ -0,0 +1,308 @@
+# src/python/asgi_integrator.py
+"""ASGI variant of the converter API.
+
+Serves the same /api routes as integrator.py with async handlers, sharing
+its config registry, Main and HTMLHandler, so both variants give identical
+results. Every response has an x-config-version header, as in Flask, and
+requests are counted and timed into the same /metrics as Flask's.
+It also serves /ws/convert, a WebSocket channel the slider uses when
+available (the Flask app has no WebSocket support), and the page with its
+static files, so the page's same-origin channel is there to connect to.
+Run with an ASGI server, e.g. `uvicorn asgi:app`.
+"""
+import asyncio
+import json
+import mimetypes
+import os
+import re
+import time
+
+from flask import render_template
+from werkzeug.security import safe_join
+
+from src.python.compiled_scale import THRESHOLD
+from src.python.integrator import app as flask_app, html_handler, main, registry
+from src.python.html_handler import MAX_BATCH_SIZE
+from src.python.main import convert_state
+from src.python.metrics import CONTENT_TYPE, metrics
+
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+
+class Response:
+    def __init__(self, body, content_type, status=200):
+        self.body = body.encode()
+        self.status = status
+        self.headers = [(b"content-type", content_type.encode())]
+
+    async def send(self, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": self.headers + [(b"content-length", str(len(self.body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": self.body})
+
+
+class FileResponse(Response):
+    def __init__(self, body, content_type):
+        self.body = body
+        self.status = 200
+        self.headers = [(b"content-type", content_type.encode())]
+
+
+class JSONResponse(Response):
+    def __init__(self, body, status=200):
+        self.body = json.dumps(body).encode()
+        self.status = status
+        self.headers = list(JSON_HEADERS)
+
+
+async def read_json(receive):
+    """Read the whole request body and decode it as JSON, or None."""
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    try:
+        return json.loads(b"".join(chunks) or b"null")
+    except ValueError:
+        return None
+
+
+async def convert(receive, snapshot):
+    data = await read_json(receive)
+    if not isinstance(data, dict):
+        return JSONResponse({"error": "No data provided"}, 400)
+    return JSONResponse({"result": main.convert_request(data, snapshot)})
+
+
+async def convert_all(receive, snapshot):
+    data = await read_json(receive)
+    if not data:
+        return JSONResponse({"error": "No data provided"}, 400)
+    try:
+        return JSONResponse(main.convert_all_request(data, snapshot))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, 400)
+
+
+async def convert_batch(receive, snapshot):
+    data = await read_json(receive)
+    if not data:
+        return JSONResponse({"error": "No data provided"}, 400)
+    try:
+        items = html_handler.batch_items(data)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, 400)
+    if len(items) > MAX_BATCH_SIZE:
+        return JSONResponse({"error": f"Batch too large: at most {MAX_BATCH_SIZE} items"}, 400)
+    return JSONResponse({"results": [html_handler.convert_item(*item, snapshot.scales) for item in items]})
+
+
+async def get_cache_stats(receive, snapshot):
+    return JSONResponse(html_handler.cache_report())
+
+
+async def clear_cache(receive, snapshot):
+    return JSONResponse(html_handler.cache_report(clear=True))
+
+
+async def get_config(receive, snapshot):
+    return JSONResponse(snapshot.config)
+
+
+async def get_scales(receive, snapshot):
+    return JSONResponse({"scales": snapshot.scale_names})
+
+
+async def get_units_for_scale(receive, snapshot, scale):
+    scale_config = snapshot.scales.get(scale)
+    if not scale_config:
+        return JSONResponse({"error": "Scale not found"}, 404)
+
+    return JSONResponse({
+        "units": [unit.to_dict() for unit in scale_config.units],
+        "defaultUnit": scale_config.default_unit
+    })
+
+
+async def get_breakpoints(receive, snapshot, scale):
+    scale_config = snapshot.scales.get(scale)
+    if not scale_config:
+        return JSONResponse({"error": "Scale not found"}, 404)
+    breakpoints = scale_config.describe_breakpoints()
+    if breakpoints is None:
+        return JSONResponse({"error": "Scale has no breakpoint table"}, 404)
+
+    return JSONResponse({"scale": scale, "threshold": THRESHOLD, "breakpoints": breakpoints})
+
+
+async def get_metrics(receive, snapshot):
+    return Response(metrics.render(), CONTENT_TYPE)
+
+
+async def index(receive, snapshot):
+    with flask_app.app_context():
+        return Response(render_template("index.html"), "text/html; charset=utf-8")
+
+
+async def send_file(directory, filename):
+    """A file under directory, as Flask's send_from_directory serves it, or a 404."""
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        return JSONResponse({"error": "Not found"}, 404)
+
+    def read():
+        with open(path, "rb") as f:
+            return f.read()
+
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return FileResponse(await asyncio.to_thread(read), content_type)
+
+
+async def serve_static(receive, snapshot, filename):
+    return await send_file(flask_app.static_folder, filename)
+
+
+async def serve_css(receive, snapshot, filename):
+    return await send_file(os.path.join(flask_app.root_path, "../../src/css"), filename)
+
+
+ROUTES = [
+    ("GET", re.compile(r"/"), index),
+    ("GET", re.compile(r"/static/(?P<filename>.+)"), serve_static),
+    ("GET", re.compile(r"/css/(?P<filename>.+)"), serve_css),
+    ("POST", re.compile(r"/api/convert"), convert),
+    ("POST", re.compile(r"/api/convert/all"), convert_all),
+    ("POST", re.compile(r"/api/convert/batch"), convert_batch),
+    ("GET", re.compile(r"/api/cache"), get_cache_stats),
+    ("DELETE", re.compile(r"/api/cache"), clear_cache),
+    ("GET", re.compile(r"/api/config"), get_config),
+    ("GET", re.compile(r"/api/scales"), get_scales),
+    ("GET", re.compile(r"/api/units/(?P<scale>[^/]+)"), get_units_for_scale),
+    ("GET", re.compile(r"/api/breakpoints/(?P<scale>[^/]+)"), get_breakpoints),
+    ("GET", re.compile(r"/metrics"), get_metrics),
+]
+
+
+def rule(pattern):
+    """A route pattern written the Flask way, e.g. /api/units/<scale>, for metric labels."""
+    return re.sub(r"\(\?P<(\w+)>[^)]*\)", r"<\1>", pattern.pattern)
+
+
+async def dispatch(method, path, receive):
+    """Find the handler for a request and run it with the current config."""
+    started = time.perf_counter()
+    snapshot = registry.current()
+    label, response = await route(method, path, receive, snapshot)
+    response.headers.append((b"x-config-version", str(snapshot.version).encode()))
+    metrics.record_request(label, method, response.status, time.perf_counter() - started)
+    return response
+
+
+async def route(method, path, receive, snapshot):
+    """(route label, response) for a request."""
+    matched = None
+    for route_method, pattern, handler in ROUTES:
+        match = pattern.fullmatch(path)
+        if not match:
+            continue
+        matched = rule(pattern)
+        if method == route_method:
+            return matched, await handler(receive, snapshot, **match.groupdict())
+    if matched:
+        return matched, JSONResponse({"error": "Method not allowed"}, 405)
+    return "unmatched", JSONResponse({"error": "Not found"}, 404)
+
+
+async def convert_stream(receive, send):
+    """WebSocket channel for the slider: clients send deltas, we stream results.
+
+    A client sends JSON objects holding only what changed (any of inputValue,
+    currentUnit, currentScale, plus an optional seq echoed back). Deltas that
+    arrive while a result is being sent are merged, so only the most recent
+    state is converted. Each result says which configVersion it used.
+    """
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+    await send({"type": "websocket.accept"})
+
+    state = dict(registry.current().default_state)
+    pending = {}
+    wake = asyncio.Event()
+    closed = False
+
+    async def read_deltas():
+        nonlocal closed
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                delta = json.loads(message.get("text") or message.get("bytes") or b"")
+            except ValueError:
+                continue
+            if isinstance(delta, dict):
+                pending.update(delta)
+                wake.set()
+        closed = True
+        wake.set()
+
+    reader = asyncio.ensure_future(read_deltas())
+    try:
+        while True:
+            await wake.wait()
+            wake.clear()
+            if closed:
+                break
+            delta = dict(pending)
+            pending.clear()
+            snapshot = registry.current()
+            state = main.request_state({**state, **delta}, snapshot.default_state)
+            try:
+                response = {"result": convert_state(main.relative_sizes, snapshot.scales, state)}
+            except (ArithmeticError, ValueError, TypeError) as e:
+                # e.g. an infinite inputValue: report it and keep the channel open
+                response = {"error": f"Could not convert: {e}"}
+            response["configVersion"] = snapshot.version
+            if "seq" in delta:
+                response["seq"] = delta["seq"]
+            await send({"type": "websocket.send", "text": json.dumps(response)})
+    finally:
+        reader.cancel()
+
+
+WEBSOCKET_ROUTES = {
+    "/ws/convert": convert_stream,
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def create_asgi_app():
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await lifespan(receive, send)
+        if scope["type"] == "websocket":
+            handler = WEBSOCKET_ROUTES.get(scope["path"])
+            if handler is None:
+                return await send({"type": "websocket.close", "code": 1008})
+            return await handler(receive, send)
+        if scope["type"] != "http":
+            return
+        response = await dispatch(scope["method"], scope["path"], receive)
+        await response.send(send)
+
+    return app
@@ -0,0 +1,170 @@
+# src/python/bulk_convert.py
+"""Convert a stream of records, for `cli.py stream`.
+
+Input has one record per line: CSV (scale,value,unit) or a JSON object
+({"scale": ..., "value": ..., "unit": ...}). Output is JSON Lines or CSV
+with a result or an error per record, in input order. Lines are read and
+written a chunk at a time, so memory use does not grow with the input.
+"""
+import csv
+import io
+import itertools
+import json
+from collections import deque
+
+from src.python.compiled_scale import compile_scales
+from src.python.relative_sizes import is_error, relative_sizes
+from src.python.unit_index import AmbiguousUnitError, UnitIndex
+
+INPUT_FORMATS = ("auto", "csv", "jsonl")
+OUTPUT_FORMATS = ("jsonl", "csv")
+OUTPUT_FIELDS = ["scale", "value", "unit", "result", "error"]
+CSV_HEADER = "scale,value,unit"
+
+# Lines handed to a worker at a time
+CHUNK_SIZE = 500
+
+
+def parse_record(line, input_format="auto"):
+    """(scale, value, unit) from one input line; raises ValueError."""
+    if input_format == "jsonl" or (input_format == "auto" and line.lstrip().startswith("{")):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            raise ValueError("Invalid JSON record")
+        return record.get("scale"), record.get("value"), record.get("unit")
+
+    fields = next(csv.reader([line]), [])
+    if len(fields) != 3:
+        raise ValueError("Expected scale,value,unit")
+    return tuple(field.strip() for field in fields)
+
+
+def convert_record(scales, scale_name, value, unit, units=None):
+    """The output row for one record: its fields plus a result or an error.
+
+    With a UnitIndex, a record without a scale gets the scale of its unit.
+    """
+    if units is not None and not scale_name and unit:
+        try:
+            found = units.scale_for(unit)
+        except AmbiguousUnitError as e:
+            return {"scale": scale_name, "value": value, "unit": unit, "error": str(e)}
+        if found is None:
+            return {"scale": scale_name, "value": value, "unit": unit, "error": f"No scale has a unit '{unit}'"}
+        scale_name = found
+    row = {"scale": scale_name, "value": value, "unit": unit}
+    scale = scales.get(scale_name) if isinstance(scale_name, str) else None
+    if scale is None:
+        row["error"] = f"Scale '{scale_name}' not found"
+        return row
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        number = float(value)
+    except (TypeError, ValueError):
+        row["error"] = f"'{value}' is not a valid number"
+        return row
+
+    try:
+        result = relative_sizes.convert(number, unit, scale)
+    except (ArithmeticError, ValueError):
+        # inf, nan or a value whose conversion overflows: this record only
+        row["error"] = f"'{value}' cannot be converted"
+        return row
+    row["error" if is_error(result) else "result"] = result
+    return row
+
+
+def format_rows(rows, output_format):
+    """Render output rows as JSON Lines or CSV (without a header)."""
+    if output_format == "jsonl":
+        return "".join(json.dumps(row) + "\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, OUTPUT_FIELDS, lineterminator="\n")
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def convert_lines(lines, scales, input_format="auto", output_format="jsonl", units=None):
+    """Convert a chunk of input lines to output text.
+
+    Blank lines and a scale,value,unit header are skipped; a line that
+    cannot be parsed becomes an error row. With a UnitIndex, records
+    without a scale get the scale of their unit.
+    """
+    rows = []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.lower() == CSV_HEADER:
+            continue
+        try:
+            record = parse_record(stripped, input_format)
+        except ValueError as e:
+            rows.append({"scale": None, "value": None, "unit": None, "error": f"{e}: {stripped}"})
+            continue
+        rows.append(convert_record(scales, *record, units))
+    return format_rows(rows, output_format)
+
+
+def chunked(lines, size):
+    iterator = iter(lines)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Each pool worker compiles and indexes the config once, in _init_worker
+_worker_scales = None
+_worker_units = None
+
+
+def _init_worker(config):
+    global _worker_scales, _worker_units
+    _worker_scales = compile_scales(config)
+    _worker_units = UnitIndex(_worker_scales)
+
+
+def _convert_in_worker(lines, input_format, output_format):
+    return convert_lines(lines, _worker_scales, input_format, output_format, _worker_units)
+
+
+def convert_stream(lines, out, snapshot, input_format="auto", output_format="jsonl",
+                   jobs=1, chunk_size=CHUNK_SIZE, flush=False):
+    """Convert every line of an iterable, writing results to out in order.
+
+    snapshot is a ConfigSnapshot. With jobs > 1 chunks are converted by a
+    process pool, with at most two chunks per worker in flight so input is
+    not read far ahead of output. flush=True flushes out after every
+    record, for pipelines that wait on each answer.
+    """
+    if output_format == "csv":
+        out.write(",".join(OUTPUT_FIELDS) + "\n")
+    if flush:
+        chunk_size = 1
+
+    if jobs <= 1:
+        for chunk in chunked(lines, chunk_size):
+            out.write(convert_lines(chunk, snapshot.scales, input_format, output_format, snapshot.units))
+            if flush:
+                out.flush()
+        return
+
+    # Only the pool needs multiprocessing, which is slow to import
+    import multiprocessing
+    with multiprocessing.Pool(jobs, _init_worker, (snapshot.config,)) as pool:
+        pending = deque()
+        for chunk in chunked(lines, chunk_size):
+            pending.append(pool.apply_async(_convert_in_worker, (chunk, input_format, output_format)))
+            if len(pending) >= 2 * jobs:
+                out.write(pending.popleft().get())
+                if flush:
+                    out.flush()
+        while pending:
+            out.write(pending.popleft().get())
+            if flush:
+                out.flush()
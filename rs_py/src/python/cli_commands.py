@@ -0,0 +1,82 @@
+# src/python/cli_commands.py
+"""The human-facing cli.py commands: coloured listings and single conversions.
+
+cli.py imports this only for the commands that need it.
+"""
+import sys
+from src.python.relative_sizes import relative_sizes
+from src.python.scale_registry import ConfigError, cached_registry
+from src.python.unit_index import AmbiguousUnitError
+
+# Add color support if available
+try:
+    import colorama
+    from colorama import Fore, Style
+    colorama.init()
+    USE_COLOR = True
+except ImportError:
+    USE_COLOR = False
+    class DummyFore:
+        def __getattr__(self, name):
+            return ""
+    class DummyStyle:
+        def __getattr__(self, name):
+            return ""
+    Fore = DummyFore()
+    Style = DummyStyle()
+
+def load_registry():
+    """Load and validate the configuration file"""
+    try:
+        return cached_registry()
+    except ConfigError as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+
+def print_scales(snapshot):
+    """List all available scales"""
+    print(f"{Fore.CYAN}Available scales:{Style.RESET_ALL}")
+    for name in snapshot.scale_names:
+        print(f"  {Fore.GREEN}{name}{Style.RESET_ALL}")
+
+def print_units(snapshot, scale_name):
+    """List all units for a given scale"""
+    scale = snapshot.scales.get(scale_name)
+    if not scale:
+        print(f"{Fore.RED}Error: Scale '{scale_name}' not found{Style.RESET_ALL}")
+        return False
+
+    print(f"{Fore.CYAN}Units for scale '{scale_name}':{Style.RESET_ALL}")
+    for unit in scale.units:
+        print(f"  {Fore.GREEN}{unit.name}{Style.RESET_ALL} ({unit.plural})")
+        print(f"    Conversion factor: {Fore.YELLOW}{unit.conversion_factor}{Style.RESET_ALL}")
+    return True
+
+def perform_conversion(snapshot, scale_name, input_value, unit):
+    """Convert a value using the relative sizes module; scale_name None looks the unit up"""
+    if scale_name is None:
+        try:
+            scale_name = snapshot.units.scale_for(unit)
+        except AmbiguousUnitError as e:
+            print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+            return None
+        if scale_name is None:
+            print(f"{Fore.RED}Error: No scale has a unit '{unit}'{Style.RESET_ALL}")
+            return None
+
+    # Find the scale
+    scale = snapshot.scales.get(scale_name)
+    if not scale:
+        print(f"{Fore.RED}Error: Scale '{scale_name}' not found{Style.RESET_ALL}")
+        return None
+
+    # Perform conversion
+    try:
+        float_value = float(input_value)
+    except ValueError:
+        print(f"{Fore.RED}Error: '{input_value}' is not a valid number{Style.RESET_ALL}")
+        return None
+
+    result = relative_sizes.convert(float_value, unit, scale)
+    print(f"{Fore.CYAN}{result}{Style.RESET_ALL}")
+    return result
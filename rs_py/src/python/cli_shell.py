@@ -0,0 +1,67 @@
+# src/python/cli_shell.py
+import cmd
+from src.python.cli_commands import (
+    Fore, Style, load_registry, perform_conversion, print_scales, print_units
+)
+
+class RelativeSizesShell(cmd.Cmd):
+    intro = f"{Fore.GREEN}Relative Sizes Converter Interactive Shell.{Style.RESET_ALL} Type help or ? to list commands.\n"
+    prompt = f"{Fore.BLUE}converter> {Style.RESET_ALL}"
+
+    def __init__(self):
+        super().__init__()
+        # Keep the registry so config edits show up without restarting the shell
+        self.registry = load_registry()
+
+    def do_scales(self, arg):
+        """List all available scales"""
+        print_scales(self.registry.current())
+
+    def do_units(self, arg):
+        """List units for a scale: units SCALE_NAME"""
+        if not arg:
+            print(f"{Fore.RED}Error: Scale name is required{Style.RESET_ALL}")
+            return
+        print_units(self.registry.current(), arg)
+
+    def do_convert(self, arg):
+        """Convert a value: convert [SCALE] VALUE UNIT"""
+        args = arg.split()
+        if len(args) < 2:
+            print(f"{Fore.RED}Error: Not enough arguments. Usage: convert [SCALE] VALUE UNIT{Style.RESET_ALL}")
+            return
+
+        # Without a scale, the unit says which one
+        scale, value, unit = args[:3] if len(args) >= 3 else (None, *args)
+        perform_conversion(self.registry.current(), scale, value, unit)
+
+    def complete_units(self, text, line, begidx, endidx):
+        return [name for name in self.registry.current().scale_names if name.startswith(text)]
+
+    def complete_convert(self, text, line, begidx, endidx):
+        snapshot = self.registry.current()
+        args = line[:begidx].split()[1:]
+        if not args:
+            # A scale, or a value, which there is no completing
+            return [name for name in snapshot.scale_names if name.startswith(text)]
+        if args[0] in snapshot.scales:
+            return snapshot.units.complete(text, args[0]) if len(args) == 2 else []
+        return snapshot.units.complete(text) if len(args) == 1 else []
+
+    def do_exit(self, arg):
+        """Exit the interactive shell"""
+        print(f"{Fore.GREEN}Goodbye!{Style.RESET_ALL}")
+        return True
+
+    def do_quit(self, arg):
+        """Exit the interactive shell"""
+        return self.do_exit(arg)
+
+    def do_EOF(self, arg):
+        """Exit on Ctrl+D"""
+        print()
+        return self.do_exit(arg)
+
+    def emptyline(self):
+        """Do nothing on empty line"""
+        pass
@@ -0,0 +1,233 @@
+# src/python/compiled_scale.py
+import math
+from bisect import bisect_right
+
+from src.python.number_format import unit_format
+from src.python.scale_model import Scale
+
+THRESHOLD = 0.95
+
+class ContentKey:
+    """A scale's content as a dict key, hashed once rather than per lookup.
+
+    Equal for scales that convert identically. It holds the content
+    itself, so nothing outlives the scales that use it.
+    """
+
+    __slots__ = ("content", "_hash")
+
+    def __init__(self, content):
+        self.content = content
+        self._hash = hash(content)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, ContentKey):
+            return NotImplemented
+        return self is other or (self._hash == other._hash and self.content == other.content)
+
+
+class CompiledScale:
+    """A scale pre-indexed for repeated conversions.
+
+    Built once from a Scale, or from a raw scale dict (as found in
+    config.json) which is turned into one. Units are the Scale's Unit
+    objects; the raw dict is not kept.
+    """
+
+    def __init__(self, scale):
+        if not isinstance(scale, Scale):
+            scale = Scale.from_dict(scale)
+        self.scale = scale
+        self.name = scale.name
+        self.default_unit = scale.default_unit
+        self.units = scale.units
+        # Equal for scales that convert identically, e.g. to key result caches
+        content = (self.name, self.default_unit, tuple(
+            (u.name, u.plural, u.conversion_factor, u.decimal_places) for u in self.units
+        ))
+        self.key = ContentKey(content)
+
+        # Same ordering as sorted(..., reverse=True): ties keep config order
+        self.descending = tuple(
+            sorted(self.units, key=lambda u: u.conversion_factor, reverse=True)
+        )
+        self.descending_factors = tuple(u.conversion_factor for u in self.descending)
+
+        # Columns in config order, for batch conversion by unit index
+        self.factors = tuple(u.conversion_factor for u in self.units)
+        self.decimal_places = tuple(u.decimal_places for u in self.units)
+        self.formats = tuple(unit_format(dp) for dp in self.decimal_places)
+        positions = {u: i for i, u in enumerate(self.units)}
+        self.descending_index = tuple(positions[u] for u in self.descending)
+
+        # Names win over plurals, plurals over aliases; the first unit with a given key wins
+        self._names = {}
+        self._plurals = {}
+        self._aliases = {}
+        for u in self.units:
+            self._names.setdefault(u.name, u)
+            self._plurals.setdefault(u.plural, u)
+            for alias in u.aliases:
+                self._aliases.setdefault(alias, u)
+
+        self._smaller = self._next_smaller()
+        self._positions = positions
+        # Units hash by identity, so they key these dicts directly.
+        # Tables are built on first use, as a scale of n units needs O(n^2) entries in all
+        self._fits = None
+        self._breakpoints = {} if self._has_breakpoints() else None
+
+    def index_of(self, unit):
+        """Position of a Unit from this scale in config order."""
+        return self._positions[unit]
+
+    def format_for(self, unit):
+        """The UnitFormat for a Unit from this scale."""
+        return self.formats[self._positions[unit]]
+
+    def _next_smaller(self):
+        """{unit: largest unit strictly smaller than it, or None}."""
+        smaller = {}
+        descending = self.descending
+        below = None
+        end = len(descending)
+        # From the smallest factor up, a group of equal factors at a time
+        while end > 0:
+            start = end - 1
+            factor = descending[start].conversion_factor
+            while start > 0 and descending[start - 1].conversion_factor == factor:
+                start -= 1
+            for u in descending[start:end]:
+                smaller[u] = below
+            # The first in descending order is the one largest_fitting would pick
+            below = descending[start]
+            end = start
+        return smaller
+
+    def find_unit(self, unit):
+        """Look up a unit by name, plural or alias, e.g. 'second', 'seconds' or 's'."""
+        found = self._names.get(unit)
+        if found is None:
+            # Regular plurals work without a "plural" entry
+            found = self._names.get(unit.rstrip('s'))
+            if found is None:
+                found = self._plurals.get(unit)
+                if found is None:
+                    found = self._aliases.get(unit)
+        return found
+
+    def largest_fitting(self, base_value):
+        """Largest unit in which base_value is at least THRESHOLD, or None."""
+        # base_value / factor only shrinks as factor grows, so the units that
+        # fit form a suffix of the descending list: bisect for its start.
+        factors = self.descending_factors
+        lo, hi = 0, len(factors)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if base_value / factors[mid] >= THRESHOLD:
+                hi = mid
+            else:
+                lo = mid + 1
+        return self.descending[lo] if lo < len(factors) else None
+
+    def _has_breakpoints(self):
+        """Whether every factor is positive and finite, as the tables need."""
+        return all(
+            isinstance(f, (int, float)) and 0 < f < math.inf and f * THRESHOLD > 0
+            for f in self.factors
+        )
+
+    def _build_breakpoints(self, source):
+        """(bounds, targets) for a source unit, stored for next time.
+
+        The target for base_value is targets[bisect_right(bounds, base_value)]:
+        the same unit the scan in select_by_scan picks, float rounding included.
+        """
+        fits = self._fits
+        if fits is None:
+            # Ascending thresholds; among equal ones the unit largest_fitting prefers comes last
+            fits = self._fits = [(fit_threshold(u.conversion_factor), u) for u in reversed(self.descending)]
+        keep = source.conversion_factor * THRESHOLD
+        fallback = self.fallback_for(source)
+        # Below -keep nothing fits; between -keep and keep the source is kept
+        bounds = [math.nextafter(-keep, math.inf), keep]
+        targets = [fallback, source, fallback]
+        for threshold, unit in fits:
+            if threshold <= keep:
+                targets[-1] = unit
+            elif threshold == bounds[-1]:
+                targets[-1] = unit
+            else:
+                bounds.append(threshold)
+                targets.append(unit)
+        # Drop bounds between two intervals with the same target
+        merged_bounds, merged_targets = [], [targets[0]]
+        for bound, target in zip(bounds, targets[1:]):
+            if target is not merged_targets[-1]:
+                merged_bounds.append(bound)
+                merged_targets.append(target)
+        # Threads building the same table at once store equal ones
+        table = self._breakpoints[source] = (tuple(merged_bounds), tuple(merged_targets))
+        return table
+
+    def breakpoints(self, source_unit):
+        """(bounds, targets) for a Unit from this scale, or None; see _build_breakpoints."""
+        if self._breakpoints is None:
+            return None
+        table = self._breakpoints.get(source_unit)
+        return table if table is not None else self._build_breakpoints(source_unit)
+
+    def describe_breakpoints(self):
+        """Every unit's breakpoint table, in config order, with targets as unit indices."""
+        if self._breakpoints is None:
+            return None
+        return [
+            {
+                "unit": unit.name,
+                "bounds": list(bounds),
+                "targets": [self.index_of(target) for target in targets],
+            }
+            for unit, (bounds, targets) in ((u, self.breakpoints(u)) for u in self.units)
+        ]
+
+    def select_target(self, source_unit, base_value):
+        """Choose the unit a base value should be displayed in."""
+        # NaN fits nowhere, but would bisect to the last interval
+        if self._breakpoints is not None and base_value == base_value:
+            table = self._breakpoints.get(source_unit)
+            bounds, targets = table if table is not None else self._build_breakpoints(source_unit)
+            return targets[bisect_right(bounds, base_value)]
+        return self.select_by_scan(source_unit, base_value)
+
+    def select_by_scan(self, source_unit, base_value):
+        """select_target without the breakpoint tables."""
+        if abs(base_value) < source_unit.conversion_factor * THRESHOLD:
+            return source_unit
+        target = self.largest_fitting(base_value)
+        return target if target is not None else self.fallback_for(source_unit)
+
+    def fallback_for(self, source_unit):
+        """Unit used when no unit fits: the next smaller one, else the source."""
+        smaller = self._smaller.get(source_unit)
+        return smaller if smaller is not None else source_unit
+
+
+def fit_threshold(factor):
+    """Smallest float b for which b / factor >= THRESHOLD, for a positive factor."""
+    b = factor * THRESHOLD
+    # Rounding may put the product a few ulps either side of the true threshold
+    while b / factor >= THRESHOLD:
+        b = math.nextafter(b, -math.inf)
+    while b / factor < THRESHOLD:
+        b = math.nextafter(b, math.inf)
+    return b
+
+
+def compile_scales(config):
+    """Compile every scale in a config dict, or a sequence of Scales, keyed by scale name."""
+    scales = config["scales"] if isinstance(config, dict) else config
+    compiled = (CompiledScale(s) for s in scales)
+    return {c.name: c for c in compiled}
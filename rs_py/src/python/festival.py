@@ -0,0 +1,153 @@
+# src/python/festival.py
+"""The date of the spring festival (Easter) in a given year.
+
+festival(year, method) gives one date; festival_range() gives a run of
+years, working out the computus for all of them at once over NumPy
+arrays. Dates for years in YEAR_WINDOW are kept in a table per method,
+built on first use, so festival() is a list index for them.
+
+Methods, as in dateutil.easter:
+
+- FESTIVAL_JULIAN: the original method, as a date in the Julian calendar;
+- FESTIVAL_ORTHODOX: the original method, as a date in the Gregorian
+  calendar;
+- FESTIVAL_WESTERN: the revised method, in the Gregorian calendar.
+
+Each is a computus: a function from year to (month, day) using only
+integer + - * // and %, so the same function takes an int or an array of
+years. register_method() adds another.
+"""
+from datetime import date
+
+from src.python.number_format import load_numpy
+
+FESTIVAL_JULIAN = 1
+FESTIVAL_ORTHODOX = 2
+FESTIVAL_WESTERN = 3
+
+# Years whose dates are kept in a table, both included
+YEAR_WINDOW = (1583, 4099)
+
+# Years a date can be made for
+MIN_YEAR = 1
+MAX_YEAR = 9999
+
+# method: computus
+METHODS = {}
+
+# method: dates for each year of the window
+_tables = {}
+_window = YEAR_WINDOW
+
+
+def _julian_offsets(year):
+    """i (days from 21 March to the Paschal full moon) and j (its weekday) in the Julian calendar."""
+    golden = year % 19
+    i = (19 * golden + 15) % 30
+    j = (year + year // 4 + i) % 7
+    return i, j
+
+
+def _month_day(p):
+    """Month and day of the date p days after 28 March, up to the end of December."""
+    # Days after 1 March; months from March run 31, 30, 31, 30, 31, 31, ... days
+    q = p + 27
+    months_after_march = (5 * q + 2) // 153
+    return 3 + months_after_march, q - (153 * months_after_march + 2) // 5 + 1
+
+
+def julian(year):
+    """FESTIVAL_JULIAN: (month, day) in the Julian calendar."""
+    i, j = _julian_offsets(year)
+    return _month_day(i - j)
+
+
+def orthodox(year):
+    """FESTIVAL_ORTHODOX: the Julian date, as (month, day) in the Gregorian calendar."""
+    i, j = _julian_offsets(year)
+    # Days the Julian calendar is behind the Gregorian after February: 10 in 1600
+    century = year // 100
+    behind = century - century // 4 - 2
+    return _month_day(i - j + behind)
+
+
+def western(year):
+    """FESTIVAL_WESTERN: (month, day) by the Gregorian computus."""
+    golden = year % 19
+    century = year // 100
+    h = (century - century // 4 - (8 * century + 13) // 25 + 19 * golden + 15) % 30
+    i = h - (h // 28) * (1 - (h // 28) * (29 // (h + 1)) * ((21 - golden) // 11))
+    j = (year + year // 4 + i + 2 - century + century // 4) % 7
+    return _month_day(i - j)
+
+
+def register_method(method, computus):
+    """Make computus (year -> (month, day), as above) available as method."""
+    METHODS[method] = computus
+    _tables.pop(method, None)
+
+
+register_method(FESTIVAL_JULIAN, julian)
+register_method(FESTIVAL_ORTHODOX, orthodox)
+register_method(FESTIVAL_WESTERN, western)
+
+
+def _computus(method):
+    try:
+        return METHODS[method]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown festival method: {method!r}") from None
+
+
+def _check_years(first, last):
+    if first < MIN_YEAR or last > MAX_YEAR:
+        raise ValueError(f"Years must be from {MIN_YEAR} to {MAX_YEAR}")
+
+
+def set_year_window(first, last):
+    """Keep tables for the years first to last, both included; the tables are rebuilt on use."""
+    global _window
+    if first > last:
+        raise ValueError("The window must start no later than it ends")
+    _check_years(first, last)
+    _window = (first, last)
+    _tables.clear()
+
+
+def _table(method):
+    table = _tables.get(method)
+    if table is None:
+        table = _tables[method] = festival_range(*_window, method)
+    return table
+
+
+def festival(year, method=FESTIVAL_WESTERN):
+    """The festival date in year by method; ValueError for an unknown method or a year out of range."""
+    computus = _computus(method)
+    table = _tables.get(method) or _table(method)
+    offset = year - _window[0]
+    if 0 <= offset < len(table):
+        return table[offset]
+    _check_years(year, year)
+    return date(year, *computus(year))
+
+
+def festival_range(start_year, end_year, method=FESTIVAL_WESTERN):
+    """Festival dates for each year from start_year to end_year, both included.
+
+    The computus runs once over an array of the years; without NumPy it
+    runs once per year.
+    """
+    computus = _computus(method)
+    if end_year < start_year:
+        return []
+    _check_years(start_year, end_year)
+    np = load_numpy()
+    if np is None:
+        return [date(year, *computus(year)) for year in range(start_year, end_year + 1)]
+    years = np.arange(start_year, end_year + 1, dtype=np.int64)
+    months, days = computus(years)
+    return [
+        date(year, month, day)
+        for year, month, day in zip(years.tolist(), months.tolist(), days.tolist())
+    ]
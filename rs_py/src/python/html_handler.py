@@ -1,10 +1,18 @@
 # src/python/html_handler.py
 from flask import render_template, jsonify, request
+from src.python.compiled_scale import compile_scales
+from src.python.metrics import metrics
+
+# Largest number of items accepted by one batch conversion request
+MAX_BATCH_SIZE = 1000
 
 class HTMLHandler:
     def __init__(self, relative_sizes, config):
         self.relative_sizes = relative_sizes
         self.config = config
+        self.scales = compile_scales(config)
+        # The config's own scale dicts, which convert() compiles once by identity
+        self.config_scales = {s["name"]: s for s in config["scales"]}
         
     def render_index(self):
         """Render the main index page"""
@@ -16,17 +24,17 @@ class HTMLHandler:
     
     def get_units_for_scale(self, scale_name):
         """Get units for a specific scale"""
-        scale = next((s for s in self.config["scales"] if s["name"] == scale_name), None)
+        scale = self.scales.get(scale_name)
         if not scale:
             return jsonify({"error": "Scale not found"}), 404
-        return jsonify(scale["units"])
+        return jsonify([unit.to_dict() for unit in scale.units])
     
     def get_default_unit(self, scale_name):
         """Get default unit for a scale"""
-        scale = next((s for s in self.config["scales"] if s["name"] == scale_name), None)
+        scale = self.scales.get(scale_name)
         if not scale:
             return jsonify({"error": "Scale not found"}), 404
-        return jsonify({"defaultUnit": scale["defaultUnit"]})
+        return jsonify({"defaultUnit": scale.default_unit})
 
     def perform_conversion(self):
         """Handle conversion request"""
@@ -42,14 +50,97 @@ class HTMLHandler:
             if not scale_name:
                 return jsonify({"error": "Scale not provided"}), 400
                 
-            scale = next((s for s in self.config["scales"] if s["name"] == scale_name), None)
-            if not scale:
+            compiled = self.scales.get(scale_name) if isinstance(scale_name, str) else None
+            if not compiled:
                 return jsonify({"error": f"Unknown scale: {scale_name}"}), 400
                 
-            result = self.relative_sizes.convert(input_value, unit, scale)
+            result = self.relative_sizes.convert(input_value, unit, self.config_scales[scale_name])
+            metrics.count_conversion(self.scales, scale_name, unit, result)
             return jsonify({"result": result})
             
         except Exception as e:
+            metrics.count_exception("perform_conversion", e)
             return jsonify({"error": str(e)}), 500
 
+    def cache_report(self, clear=False):
+        """Result cache counters, optionally clearing the cache first"""
+        cache = self.relative_sizes.cache
+        if cache is None:
+            return {"enabled": False}
+        if clear:
+            cache.clear()
+        return {"enabled": True, **cache.stats()}
+    
+    def get_cache_stats(self):
+        """Return result cache counters; DELETE also clears the cache"""
+        return jsonify(self.cache_report(clear=request.method == "DELETE"))
+
+    def perform_batch_conversion(self, scales=None):
+        """Handle a batch conversion request.
+
+        Accepts {"items": [{inputValue, currentUnit, currentScale}, ...]}
+        or the columnar {"inputValues": [...], "currentUnit": ..., "currentScale": ...},
+        where unit and scale are either one value for all items or a list.
+        Results come back in order; a failing item gets an error entry.
+        scales, e.g. from a ConfigSnapshot, replaces the handler's own.
+        """
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+
+        try:
+            items = self.batch_items(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"Batch too large: at most {MAX_BATCH_SIZE} items"}), 400
+
+        return jsonify({"results": [self.convert_item(*item, scales) for item in items]})
+
+    def batch_items(self, data):
+        """Normalise a batch request body to (value, unit, scale) tuples."""
+        if isinstance(data, list):
+            data = {"items": data}
+        if not isinstance(data, dict):
+            raise ValueError("Batch must be an object or a list of items")
+
+        if "items" in data:
+            items = data["items"]
+            if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+                raise ValueError("items must be a list of objects")
+            return [
+                (i.get("inputValue"), i.get("currentUnit"), i.get("currentScale"))
+                for i in items
+            ]
+
+        values = data.get("inputValues")
+        if not isinstance(values, list):
+            raise ValueError("Provide items or inputValues")
+        columns = [values]
+        for key in ("currentUnit", "currentScale"):
+            column = data.get(key)
+            if isinstance(column, list):
+                if len(column) != len(values):
+                    raise ValueError(f"{key} must have one entry per input value")
+            else:
+                column = [column] * len(values)
+            columns.append(column)
+        return list(zip(*columns))
+
+    def convert_item(self, input_value, unit, scale_name, scales=None):
+        """Convert one batch item, returning a result or error entry."""
+        if not scale_name:
+            return {"error": "Scale not provided"}
+        scales = self.scales if scales is None else scales
+        scale = scales.get(scale_name) if isinstance(scale_name, str) else None
+        if scale is None:
+            return {"error": f"Unknown scale: {scale_name}"}
+        try:
+            result = self.relative_sizes.convert(input_value, unit, scale)
+        except Exception as e:
+            metrics.count_exception("convert_item", e)
+            return {"error": str(e)}
+        metrics.count_conversion(scales, scale_name, unit, result)
+        return {"result": result}
+
 # Note: We don't create an instance here because it needs config and relative_sizes
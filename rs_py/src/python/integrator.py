@@ -1,30 +1,90 @@
 # src/python/integrator.py
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, g, request, jsonify, render_template, send_from_directory
+import hmac
 import os
-import json
 import sys
+import time
 
 # Add the parent directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.python.main import main
 from src.python.html_handler import HTMLHandler
+from src.python import profiling
+from src.python.compiled_scale import THRESHOLD
+from src.python.metrics import CONTENT_TYPE, metrics
 from src.python.relative_sizes import relative_sizes
+from src.python.scale_registry import ScaleRegistry
 
 # Create Flask app
 app = Flask(__name__, 
             template_folder='../../templates',
             static_folder='../../static')
 
-# Load configuration
+# Load configuration, re-reading it when the file changes. RS_CONFIG_CHECK_INTERVAL
+# is how many seconds may pass before an edit is noticed
 config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'config.json')
-with open(config_path, 'r') as f:
-    config = json.load(f)
+registry = ScaleRegistry(config_path, float(os.environ.get('RS_CONFIG_CHECK_INTERVAL', 1.0)))
+config = registry.current().config
+
+# Cache up to RS_CACHE_SIZE conversion results (off by default); RS_CACHE_TTL is in seconds
+cache_size = int(os.environ.get('RS_CACHE_SIZE', 0))
+cache_ttl = os.environ.get('RS_CACHE_TTL')
+if cache_size > 0:
+    relative_sizes.enable_cache(cache_size, float(cache_ttl) if cache_ttl else None)
+
+def clear_result_cache(snapshot):
+    """Drop results for the old config; its scales will not be asked for again"""
+    if relative_sizes.cache is not None:
+        relative_sizes.cache.clear()
+
+registry.on_reload(clear_result_cache)
+
+# With several worker processes (gunicorn), RS_METRICS_DIR is where they share their metrics
+metrics_dir = os.environ.get('RS_METRICS_DIR')
+if metrics_dir:
+    metrics.enable_multiprocess(metrics_dir)
+
+# RS_PROFILE_DIR turns on phase timing and stack sampling. POST /admin/profile
+# with an X-Profile-Token header matching RS_PROFILE_TOKEN writes what has been
+# gathered to that directory, as does RS_PROFILE_SIGNAL (e.g. SIGRTMIN+1) if set;
+# there is no default signal, as gunicorn handles SIGUSR1 and SIGUSR2 itself
+profile_dir = os.environ.get('RS_PROFILE_DIR')
+profile_token = os.environ.get('RS_PROFILE_TOKEN')
+profiler = None
+if profile_dir:
+    profiler = profiling.SamplingProfiler(float(os.environ.get('RS_PROFILE_INTERVAL', profiling.SAMPLE_INTERVAL)))
+    profiling.enable(app, relative_sizes, profiler).start()
+    profile_signal = os.environ.get('RS_PROFILE_SIGNAL')
+    if profile_signal:
+        profiling.install_dump_signal(profiler, profile_dir, profiling.parse_signal(profile_signal))
 
 # Initialize components
 html_handler = HTMLHandler(relative_sizes, config)
 main.init(html_handler, relative_sizes, config)
 
+@app.before_request
+def use_current_config():
+    # One snapshot per request, so a reload mid-request cannot mix versions
+    g.snapshot = registry.current()
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def add_config_version(response):
+    snapshot = g.get('snapshot')
+    if snapshot is not None:
+        response.headers['X-Config-Version'] = str(snapshot.version)
+    return response
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        # Label by route pattern, not path, so /api/units/<scale> is one series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.record_request(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -35,37 +95,77 @@ def serve_css(filename):
 
 @app.route('/api/convert', methods=['POST'])
 def convert():
-    data = request.get_json()
-    
-    # Update main state
-    main.state["inputValue"] = data.get("inputValue", 1)
-    main.state["currentUnit"] = data.get("currentUnit", main.state["currentUnit"])
-    main.state["currentScale"] = data.get("currentScale", main.state["currentScale"])
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "No data provided"}), 400
     
-    # Perform conversion
-    result = main.update_conversion()
+    # Convert with request-scoped state so concurrent requests cannot clash
+    result = main.convert_request(data, g.snapshot)
     
     return jsonify({"result": result})
 
+@app.route('/api/convert/all', methods=['POST'])
+def convert_all():
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    try:
+        return jsonify(main.convert_all_request(data, g.snapshot))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/convert/batch', methods=['POST'])
+def convert_batch():
+    return html_handler.perform_batch_conversion(g.snapshot.scales)
+
+@app.route('/api/cache', methods=['GET', 'DELETE'])
+def cache_stats():
+    return html_handler.get_cache_stats()
+
 @app.route('/api/config')
 def get_config():
-    return jsonify(config)
+    return jsonify(g.snapshot.config)
 
 @app.route('/api/scales')
 def get_scales():
-    return jsonify({"scales": [s["name"] for s in config["scales"]]})
+    return jsonify({"scales": g.snapshot.scale_names})
 
 @app.route('/api/units/<scale>')
 def get_units_for_scale(scale):
-    scale_config = next((s for s in config["scales"] if s["name"] == scale), None)
+    scale_config = g.snapshot.scales.get(scale)
     if not scale_config:
         return jsonify({"error": "Scale not found"}), 404
     
     return jsonify({
-        "units": scale_config["units"],
-        "defaultUnit": scale_config["defaultUnit"]
+        "units": [unit.to_dict() for unit in scale_config.units],
+        "defaultUnit": scale_config.default_unit
     })
 
+@app.route('/api/breakpoints/<scale>')
+def get_breakpoints(scale):
+    scale_config = g.snapshot.scales.get(scale)
+    if not scale_config:
+        return jsonify({"error": "Scale not found"}), 404
+    breakpoints = scale_config.describe_breakpoints()
+    if breakpoints is None:
+        return jsonify({"error": "Scale has no breakpoint table"}), 404
+
+    return jsonify({"scale": scale, "threshold": THRESHOLD, "breakpoints": breakpoints})
+
+@app.route('/metrics')
+def get_metrics():
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+@app.route('/admin/profile', methods=['POST'])
+def dump_profile():
+    if profiler is None:
+        return jsonify({"error": "Profiling is not enabled; set RS_PROFILE_DIR"}), 404
+    if not profile_token:
+        return jsonify({"error": "Profile dumps over HTTP are off; set RS_PROFILE_TOKEN"}), 403
+    if not hmac.compare_digest(request.headers.get('X-Profile-Token', '').encode(), profile_token.encode()):
+        return jsonify({"error": "Missing or wrong X-Profile-Token"}), 403
+    return jsonify({"files": profiler.dump(profile_dir), "phases": profiler.summary()})
+
 def create_app():
     return app
 
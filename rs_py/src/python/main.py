@@ -1,14 +1,39 @@
 # src/python/main.py
+from src.python.compiled_scale import compile_scales
+from src.python.metrics import metrics
+from src.python.unit_index import AmbiguousUnitError, UnitIndex
+
+# Most values one /api/convert/all request may ask for
+MAX_ALL_VALUES = 1000
+
+def convert_state(relative_sizes, scales, state):
+    """Convert a state dict (inputValue, currentUnit, currentScale).
+
+    Reads only its arguments, so it is safe to call from many threads with
+    a state dict per request.
+    """
+    scale_name = state["currentScale"]
+    result = relative_sizes.convert(
+        state["inputValue"],
+        state["currentUnit"],
+        scales.get(scale_name) if isinstance(scale_name, str) else None
+    )
+    metrics.count_conversion(scales, scale_name, state["currentUnit"], result)
+    return result
+
 class Main:
     def __init__(self):
         self.html_handler = None
         self.relative_sizes = None
         self.config = None
-        self.state = {
+        self.scales = {}
+        self.units = UnitIndex({})
+        self.default_state = {
             "inputValue": 1,
             "currentUnit": "",
             "currentScale": ""
         }
+        self.state = dict(self.default_state)
 
     def init(self, html_handler, relative_sizes, config):
         if not html_handler:
@@ -21,10 +46,14 @@ class Main:
         self.html_handler = html_handler
         self.relative_sizes = relative_sizes
         self.config = config
+        self.scales = compile_scales(config)
+        self.units = UnitIndex(self.scales)
 
         # Initialize with first scale and its default unit
-        self.state["currentScale"] = self.config["scales"][0]["name"]
-        self.state["currentUnit"] = self.config["scales"][0]["defaultUnit"]
+        first = next(iter(self.scales.values()))
+        self.default_state["currentScale"] = first.name
+        self.default_state["currentUnit"] = first.default_unit
+        self.state = dict(self.default_state)
 
         return True
     
@@ -48,27 +77,82 @@ class Main:
     def set_current_scale(self, scale):
         self.state["currentScale"] = scale
         
-        # Find the scale configuration
-        scale_config = next((s for s in self.config["scales"] if s["name"] == scale), None)
-        
         # Reset to default unit for new scale
-        self.state["currentUnit"] = scale_config["defaultUnit"]
+        self.state["currentUnit"] = self.scales[scale].default_unit
         
         return self.update_conversion()
     
+    def request_state(self, data, defaults=None):
+        """Build a fresh state dict for one request, leaving self.state alone.
+
+        Missing values fall back to the initial defaults (or the given
+        ones), not to whatever an earlier request left behind.
+        """
+        state = dict(self.default_state if defaults is None else defaults)
+        for key in state:
+            if key in data:
+                state[key] = data[key]
+        return state
+    
+    def convert_request(self, data, snapshot=None):
+        """Convert the values in a request body without touching self.state.
+
+        With a ConfigSnapshot, its scales and defaults are used instead of
+        the ones given to init(). A unit without a scale is looked up in
+        every scale.
+        """
+        try:
+            scales, state = self.resolve_request(data, snapshot)
+        except AmbiguousUnitError as e:
+            return str(e)
+        return convert_state(self.relative_sizes, scales, state)
+
+    def resolve_request(self, data, snapshot=None):
+        """(scales, state) for a request body, as convert_request uses them.
+
+        Raises AmbiguousUnitError for a unit without a scale that is in
+        several scales.
+        """
+        if snapshot is None:
+            scales, units, state = self.scales, self.units, self.request_state(data)
+        else:
+            scales, units, state = snapshot.scales, snapshot.units, self.request_state(data, snapshot.default_state)
+        if isinstance(data, dict) and not data.get("currentScale") and data.get("currentUnit"):
+            # An unknown unit keeps the default scale and is reported by convert
+            state["currentScale"] = units.scale_for(state["currentUnit"]) or state["currentScale"]
+        return scales, state
+
+    def convert_all_request(self, data, snapshot=None):
+        """A request body's value in every unit of its scale.
+
+        Returns {"scale", "units", "results"}: results has one string per
+        unit, or with "inputValues" one such list per value, converted in
+        one pass. Raises ValueError with convert()'s error messages.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Request must be a JSON object")
+        try:
+            scales, state = self.resolve_request(data, snapshot)
+        except AmbiguousUnitError as e:
+            raise ValueError(str(e))
+        scale = scales.get(state["currentScale"]) if isinstance(state["currentScale"], str) else None
+        if scale is None:
+            raise ValueError("Invalid scale configuration")
+        values = data.get("inputValues")
+        if values is None:
+            results = self.relative_sizes.convert_all(state["inputValue"], state["currentUnit"], scale)
+        elif not isinstance(values, list) or len(values) > MAX_ALL_VALUES:
+            raise ValueError(f"inputValues must be a list of at most {MAX_ALL_VALUES} numbers")
+        else:
+            results = self.relative_sizes.convert_all_many(values, state["currentUnit"], scale)
+        return {
+            "scale": state["currentScale"],
+            "units": [unit.name for unit in scale.units],
+            "results": results
+        }
+    
     def update_conversion(self):
-        current_scale_config = next(
-            (s for s in self.config["scales"] if s["name"] == self.state["currentScale"]), 
-            None
-        )
-        
-        result = self.relative_sizes.convert(
-            self.state["inputValue"],
-            self.state["currentUnit"],
-            current_scale_config
-        )
-        
-        return result
+        return convert_state(self.relative_sizes, self.scales, self.state)
 
 # Main instance
 main = Main()
\ No newline at end of file
@@ -0,0 +1,349 @@
+# src/python/metrics.py
+"""Request and conversion metrics in the Prometheus text format.
+
+Each thread records into its own shard, so recording takes no lock; a
+lock is only taken when a thread records for the first time and when
+/metrics collects. Shards of threads that have exited are folded into
+one retired shard, so thread-per-request servers do not grow the list.
+
+Multiprocess mode (RS_METRICS_DIR, or enable_multiprocess()) is for
+servers with several worker processes such as gunicorn: every process
+writes its totals to its own file in the directory about once a second
+and at exit, and /metrics sums the files of every process. The files of
+processes that have exited are folded into one retired file when
+/metrics collects, so restarted workers do not grow the directory.
+Empty the directory before starting the server, e.g. from gunicorn's
+on_starting hook with clear_directory().
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: exited workers' files are kept, not retired
+    fcntl = None
+
+from src.python.relative_sizes import is_error
+
+# Upper bounds in seconds for the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUESTS = "rs_http_requests_total"
+ERRORS = "rs_http_request_errors_total"
+LATENCY = "rs_http_request_duration_seconds"
+CONVERSIONS = "rs_conversions_total"
+EXCEPTIONS = "rs_handler_exceptions_total"
+
+METRICS = {
+    REQUESTS: ("counter", "HTTP requests by route, method and status."),
+    ERRORS: ("counter", "HTTP requests that ended in a 5xx response, by route and method."),
+    LATENCY: ("histogram", "Time to handle an HTTP request, by route and method."),
+    CONVERSIONS: ("counter", "Conversions by scale, source unit and outcome."),
+    EXCEPTIONS: ("counter", "Exceptions caught by request handlers, by handler and type."),
+}
+
+# How often a worker writes its totals in multiprocess mode, in seconds
+FLUSH_INTERVAL = 1.0
+
+FILE_SUFFIX = ".metrics.json"
+
+# Totals of every process that has exited, in the metrics directory
+RETIRED_FILE = "retired" + FILE_SUFFIX
+
+# Held while /metrics collects, so two workers never retire the same file
+LOCK_FILE = "metrics.lock"
+
+
+class Shard:
+    """The samples recorded by one thread."""
+
+    def __init__(self, thread=None):
+        self.thread = thread
+        self.counters = {}
+        self.histograms = {}
+
+    def merge_into(self, counters, histograms):
+        for key, value in self.counters.copy().items():
+            counters[key] = counters.get(key, 0) + value
+        for key, buckets in self.histograms.copy().items():
+            total = histograms.get(key)
+            if total is None:
+                histograms[key] = list(buckets)
+            else:
+                for i, value in enumerate(buckets):
+                    total[i] += value
+
+
+class Metrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.directory = None
+        self._lock = threading.Lock()
+        self._reset()
+        # A forked worker inherits the parent's shards, thread-locals included,
+        # and must start from nothing, with a lock no parent thread can be holding
+        ref = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: ref() is not None and ref()._after_fork())
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = Shard()
+        self._pid = os.getpid()
+        self._file = None
+        self._flusher = None
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            pass
+        shard = Shard(threading.current_thread())
+        with self._lock:
+            for old in [s for s in self._shards if not s.thread.is_alive()]:
+                old.merge_into(self._retired.counters, self._retired.histograms)
+                self._shards.remove(old)
+            self._shards.append(shard)
+        self._local.shard = shard
+        if self.directory and self._flusher is None:
+            self._start_flusher()
+        return shard
+
+    def inc(self, name, labels, amount=1):
+        """Add to a counter; labels is a tuple of (name, value) pairs."""
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        """Record one histogram sample."""
+        histograms = self._shard().histograms
+        key = (name, labels)
+        buckets = histograms.get(key)
+        if buckets is None:
+            # One count per bucket plus +Inf, then the sum
+            buckets = histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        buckets[bisect_left(self.buckets, value)] += 1
+        buckets[-1] += value
+
+    def record_request(self, route, method, status, seconds):
+        labels = (("route", route), ("method", method))
+        self.inc(REQUESTS, labels + (("status", str(status)),))
+        if status >= 500:
+            self.inc(ERRORS, labels)
+        self.observe(LATENCY, labels, seconds)
+
+    def count_conversion(self, scales, scale_name, unit, result):
+        """Count one conversion, labelled by canonical names only.
+
+        Unknown scales and units are counted as "unknown" so user input
+        cannot create new series.
+        """
+        scale = scales.get(scale_name) if isinstance(scale_name, str) else None
+        source = scale.find_unit(unit) if scale is not None and isinstance(unit, str) and unit else None
+        self.inc(CONVERSIONS, (
+            ("scale", scale_name if scale is not None else "unknown"),
+            ("unit", source.name if source else "unknown"),
+            ("outcome", "error" if is_error(result) else "ok"),
+        ))
+
+    def count_exception(self, handler, exception):
+        self.inc(EXCEPTIONS, (("handler", handler), ("exception", type(exception).__name__)))
+
+    def totals(self):
+        """(counters, histograms) for this process."""
+        counters, histograms = {}, {}
+        with self._lock:
+            shards = [self._retired] + self._shards
+            for shard in shards:
+                shard.merge_into(counters, histograms)
+        return counters, histograms
+
+    # Multiprocess mode
+
+    def enable_multiprocess(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        atexit.register(self.flush)
+
+    def _start_flusher(self):
+        def flush_periodically():
+            while True:
+                time.sleep(FLUSH_INTERVAL)
+                self.flush()
+
+        self._flusher = threading.Thread(target=flush_periodically, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def flush(self):
+        """Write this process's totals to its file in the metrics directory."""
+        if not self.directory or os.getpid() != self._pid:
+            return
+        if self._file is None:
+            # pid plus a nonce, so a reused pid cannot overwrite an old worker's file
+            self._file = os.path.join(self.directory, f"{self._pid}-{uuid.uuid4().hex[:8]}{FILE_SUFFIX}")
+        counters, histograms = self.totals()
+        write_totals(self._file, counters, histograms, self.buckets)
+
+    def collect(self):
+        """(counters, histograms) for this process, or all processes in multiprocess mode."""
+        if not self.directory:
+            return self.totals()
+        self.flush()
+        counters, histograms = {}, {}
+        with lock_directory(self.directory) as locked:
+            if locked:
+                retire_exited(self.directory, self.buckets)
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(FILE_SUFFIX):
+                    read_totals(entry.path, self.buckets, counters, histograms)
+        return counters, histograms
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        counters, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                continue
+            for (metric, labels), buckets in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(buckets[-1])}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels) + "}"
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def write_totals(path, counters, histograms, buckets):
+    """Atomically replace the metrics file at path with these totals."""
+    document = {
+        "counters": [[name, labels, value] for (name, labels), value in counters.items()],
+        "histograms": [[name, labels, values] for (name, labels), values in histograms.items()],
+        "buckets": list(buckets),
+    }
+    # Per-thread temp file: the flusher and a /metrics request may both flush
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(document, f)
+    os.replace(temp_path, path)
+
+
+def read_totals(path, buckets, counters, histograms):
+    """Add the metrics file at path into counters and histograms, unless it cannot be read or uses other buckets."""
+    try:
+        with open(path) as f:
+            document = json.load(f)
+    except (OSError, ValueError):
+        return
+    if document.get("buckets") != list(buckets):
+        return
+    for name, labels, value in document["counters"]:
+        key = (name, tuple(map(tuple, labels)))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, values in document["histograms"]:
+        key = (name, tuple(map(tuple, labels)))
+        total = histograms.setdefault(key, [0] * len(values))
+        for i, value in enumerate(values):
+            total[i] += value
+
+
+@contextmanager
+def lock_directory(directory):
+    """Hold the metrics directory's lock; yields False where there is no fcntl."""
+    if fcntl is None:
+        yield False
+        return
+    with open(os.path.join(directory, LOCK_FILE), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def file_pid(name):
+    """The pid a worker's metrics file is named after, or None for the retired file."""
+    pid = name.split("-", 1)[0]
+    return int(pid) if pid.isdigit() else None
+
+
+def process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def retire_exited(directory, buckets):
+    """Fold the files of processes that have exited into the retired file.
+
+    Call with the directory locked. Sums are unchanged: the retired file
+    gains exactly what the removed files held.
+    """
+    exited = [
+        entry.path for entry in os.scandir(directory)
+        if entry.name.endswith(FILE_SUFFIX) and file_pid(entry.name) is not None
+        and not process_exists(file_pid(entry.name))
+    ]
+    if not exited:
+        return
+    retired_path = os.path.join(directory, RETIRED_FILE)
+    counters, histograms = {}, {}
+    read_totals(retired_path, buckets, counters, histograms)
+    for path in exited:
+        read_totals(path, buckets, counters, histograms)
+    write_totals(retired_path, counters, histograms, buckets)
+    for path in exited:
+        os.remove(path)
+
+
+def clear_directory(directory):
+    """Remove metric files left by an earlier server run."""
+    if not os.path.isdir(directory):
+        return
+    for entry in os.scandir(directory):
+        if entry.name.endswith(FILE_SUFFIX) or (FILE_SUFFIX in entry.name and entry.name.endswith(".tmp")):
+            os.remove(entry.path)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+metrics = Metrics()
@@ -0,0 +1,137 @@
+# src/python/number_format.py
+"""Round-half-up number formatting for conversion results.
+
+Halves round away from zero, unlike Python's round() and format(). Values
+less than an ulp below a half (1.005 * 100 is 100.49999999999999) count
+as halves, so results do not depend on binary representation error.
+Digits are built from an integer, so large magnitudes are exact too.
+"""
+import math
+from functools import lru_cache
+
+# Values less than this many of their own ulps below a half are treated as
+# halves: typing a half gives the float within half an ulp of it, and one
+# float operation after that is off by at most another half.
+TIE_ULPS = 1
+
+# From here on floats are spaced 1 or more apart, so value * 10**places has
+# already rounded any half to even; such values are rounded exactly instead
+MAX_EXACT_INTEGER = 2.0 ** 52
+
+
+@lru_cache(maxsize=None)
+def load_numpy():
+    """The numpy module, or None if it is not installed.
+
+    Only scaled_many, format_many and convert_many need NumPy, and it is
+    slow to import, so it is imported on first use rather than with us.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def exact_scaled(value, decimal_places, tie_ulps=0):
+    """value * 10**decimal_places rounded half-up using exact integers.
+
+    With tie_ulps, a value less than that many ulps below a half also
+    rounds up, unless it is exact at decimal_places.
+    """
+    numerator, denominator = value.as_integer_ratio()
+    multiplier = 10 ** decimal_places
+    quotient, remainder = divmod(abs(numerator) * multiplier, denominator)
+    if 2 * remainder >= denominator:
+        quotient += 1
+    elif tie_ulps and remainder:
+        # The half is (d - 2r) / 2d above, against a window of tie_ulps * ulp * multiplier
+        ulp_numerator, ulp_denominator = math.ulp(value).as_integer_ratio()
+        if (denominator - 2 * remainder) * ulp_denominator < 2 * denominator * tie_ulps * ulp_numerator * multiplier:
+            quotient += 1
+    return -quotient if numerator < 0 else quotient
+
+
+class UnitFormat:
+    """Precomputed formatting for one number of decimal places."""
+
+    def __init__(self, decimal_places):
+        self.decimal_places = decimal_places
+        self.multiplier = float(10 ** decimal_places)
+        self.zeros = "." + "0" * decimal_places if decimal_places else ""
+
+    def scaled(self, value):
+        """value * 10**decimal_places rounded half-up, as an int."""
+        scaled = value * self.multiplier
+        if not -MAX_EXACT_INTEGER < scaled < MAX_EXACT_INTEGER:
+            return exact_scaled(value, self.decimal_places)
+        whole = int(scaled)
+        # How far below the half scaled is; rounding scaled may be off by up
+        # to window, so values that close to the window are decided exactly
+        below_half = 0.5 - abs(scaled - whole)
+        window = TIE_ULPS * math.ulp(value) * self.multiplier
+        if below_half < 0:
+            whole += 1 if scaled > 0 else -1
+        elif below_half <= 2 * window:
+            return exact_scaled(value, self.decimal_places, TIE_ULPS)
+        return whole
+
+    def text(self, scaled):
+        """Format an int from scaled() with the decimal point put back."""
+        places = self.decimal_places
+        if not places:
+            return str(scaled)
+        digits = str(abs(scaled)).rjust(places + 1, "0")
+        sign = "-" if scaled < 0 else ""
+        return f"{sign}{digits[:-places]}.{digits[-places:]}"
+
+    def format(self, value):
+        value = float(value)
+        if value.is_integer():
+            return str(int(value)) + self.zeros
+        return self.text(self.scaled(value))
+
+
+@lru_cache(maxsize=None)
+def unit_format(decimal_places):
+    """The shared UnitFormat for a number of decimal places."""
+    return UnitFormat(decimal_places)
+
+
+def format_number(value, decimal_places):
+    """Format a number with decimal_places places using round-half-up."""
+    return unit_format(decimal_places).format(value)
+
+
+def scaled_many(values, decimal_places):
+    """Vectorised UnitFormat.scaled: returns a list of ints.
+
+    decimal_places may be a single int or an array with one entry per value.
+    """
+    np = load_numpy()
+    values = np.asarray(values, dtype=float)
+    decimal_places = np.broadcast_to(decimal_places, values.shape)
+    multiplier = np.power(10.0, decimal_places)
+    scaled = values * multiplier
+    fast = np.abs(scaled) < MAX_EXACT_INTEGER
+    scaled = np.where(fast, scaled, 0.0)
+    whole = np.trunc(scaled)
+    below_half = 0.5 - np.abs(scaled - whole)
+    window = TIE_ULPS * np.spacing(np.abs(values)) * multiplier
+    whole += np.where(below_half < 0, np.sign(scaled), 0.0)
+    result = whole.astype(np.int64).tolist()
+    for i in np.flatnonzero(~fast).tolist():
+        result[i] = exact_scaled(float(values[i]), int(decimal_places[i]))
+    for i in np.flatnonzero(fast & (below_half >= 0) & (below_half <= 2 * window)).tolist():
+        result[i] = exact_scaled(float(values[i]), int(decimal_places[i]), TIE_ULPS)
+    return result
+
+
+def format_many(values, decimal_places):
+    """Vectorised format_number: returns a list of strings."""
+    np = load_numpy()
+    decimal_places = np.broadcast_to(decimal_places, np.shape(values)).tolist()
+    return [
+        unit_format(places).text(scaled)
+        for scaled, places in zip(scaled_many(values, decimal_places), decimal_places)
+    ]
@@ -0,0 +1,256 @@
+# src/python/profiling.py
+"""Opt-in timing of the conversion hot path.
+
+An Instrumentation receives a span for each phase of a request: the whole
+WSGI request, JSON decode and encode, and inside RelativeSizes.convert
+validate, lookup, cache, select and format. Nothing is instrumented until
+enable() is called, and enable() swaps in instrumented code paths rather
+than adding checks to the normal ones. While it is off the only cost is
+that convert calls its phases as methods, under a microsecond a call.
+
+SamplingProfiler is the built-in Instrumentation: it adds up phase timings
+and, from a background thread, samples the stacks of threads that are in
+a span. dump() writes the timings as JSON and the stacks in the collapsed
+format read by flamegraph.pl and speedscope. Set RS_PROFILE_DIR to turn it
+on in integrator.py, then POST /admin/profile with RS_PROFILE_TOKEN, or set
+RS_PROFILE_SIGNAL and send that signal to a worker.
+"""
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import weakref
+
+from flask.json.provider import DefaultJSONProvider
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+
+class Span:
+    __slots__ = ("instrumentation", "phase", "started")
+
+    def __init__(self, instrumentation, phase):
+        self.instrumentation = instrumentation
+        self.phase = phase
+
+    def __enter__(self):
+        self.instrumentation.enter(self.phase)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(self.phase, time.perf_counter() - self.started)
+
+
+class Instrumentation:
+    """Hooks called around each phase; subclass and override enter() and record()."""
+
+    def span(self, phase):
+        return Span(self, phase)
+
+    def enter(self, phase):
+        """Called as a phase starts, on the thread running it."""
+
+    def record(self, phase, seconds):
+        """Called as a phase ends with the time it took."""
+
+
+class PhaseStats(Instrumentation):
+    """Count, total and worst time for each phase."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = {}
+
+    def record(self, phase, seconds):
+        with self._lock:
+            stats = self.phases.get(phase)
+            if stats is None:
+                self.phases[phase] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    def summary(self):
+        with self._lock:
+            return {
+                phase: {
+                    "count": count,
+                    "totalMs": total * 1e3,
+                    "meanUs": total / count * 1e6,
+                    "maxUs": worst * 1e6,
+                }
+                for phase, (count, total, worst) in sorted(self.phases.items())
+            }
+
+
+class SamplingProfiler(PhaseStats):
+    """Phase timings plus sampled stacks of the threads inside a span."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__()
+        self.interval = interval
+        self.stacks = {}
+        # Open phases per thread, innermost last; only the owning thread changes its list
+        self._open = {}
+        self._stopped = threading.Event()
+        self._thread = None
+        # The sampler thread does not survive a fork (gunicorn --preload); restart it
+        ref = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: ref() is not None and ref()._after_fork())
+
+    def _after_fork(self):
+        self._open = {}
+        if self._thread is not None:
+            self._thread = None
+            self.start()
+
+    def enter(self, phase):
+        self._open.setdefault(threading.get_ident(), []).append(phase)
+
+    def record(self, phase, seconds):
+        phases = self._open.get(threading.get_ident())
+        if phases:
+            phases.pop()
+        super().record(phase, seconds)
+
+    def start(self):
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Add one sample of every thread that is inside a span."""
+        frames = sys._current_frames()
+        for ident, phases in list(self._open.items()):
+            phases = tuple(phases)
+            frame = frames.get(ident)
+            if not phases or frame is None:
+                continue
+            # Phases go below the Python frames they ran in, as [phase]
+            stack = ";".join(collapse(frame) + [f"[{phase}]" for phase in phases])
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def folded(self):
+        """Sampled stacks in the collapsed format, one "frame;frame;... count" per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def dump(self, directory):
+        """Write phase timings and stacks to directory; returns their paths."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}")
+        paths = {"phases": base + ".phases.json", "stacks": base + ".folded"}
+        with open(paths["phases"], "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(paths["stacks"], "w") as f:
+            f.write(self.folded())
+        return paths
+
+
+def collapse(frame):
+    """Frames from outermost to frame, as "function (file:line)"."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+class InstrumentedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider with decode and encode spans."""
+
+    def __init__(self, app, instrumentation):
+        super().__init__(app)
+        self.instrumentation = instrumentation
+
+    def loads(self, s, **kwargs):
+        with self.instrumentation.span("decode"):
+            return super().loads(s, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        with self.instrumentation.span("encode"):
+            return super().dumps(obj, **kwargs)
+
+
+class InstrumentedWSGI:
+    """WSGI middleware putting each request in a "request" span."""
+
+    def __init__(self, wsgi_app, instrumentation):
+        self.wsgi_app = wsgi_app
+        self.instrumentation = instrumentation
+
+    def __call__(self, environ, start_response):
+        with self.instrumentation.span("request"):
+            return self.wsgi_app(environ, start_response)
+
+
+def enable(app, relative_sizes, instrumentation):
+    """Instrument a Flask app and a RelativeSizes; returns instrumentation."""
+    disable(app, relative_sizes)
+    app.json = InstrumentedJSONProvider(app, instrumentation)
+    app.wsgi_app = InstrumentedWSGI(app.wsgi_app, instrumentation)
+    relative_sizes.enable_instrumentation(instrumentation)
+    return instrumentation
+
+
+def disable(app, relative_sizes):
+    if isinstance(app.json, InstrumentedJSONProvider):
+        app.json = app.json_provider_class(app)
+    if isinstance(app.wsgi_app, InstrumentedWSGI):
+        app.wsgi_app = app.wsgi_app.wsgi_app
+    relative_sizes.disable_instrumentation()
+
+
+# Signals gunicorn handles in its arbiter or workers; taking one over would
+# stop, e.g., SIGUSR1 reopening the log files
+GUNICORN_SIGNALS = frozenset(
+    getattr(signal, name) for name in (
+        "SIGHUP", "SIGQUIT", "SIGINT", "SIGTERM", "SIGUSR1", "SIGUSR2",
+        "SIGTTIN", "SIGTTOU", "SIGWINCH", "SIGCHLD", "SIGABRT",
+    ) if hasattr(signal, name)
+)
+
+
+def parse_signal(name):
+    """A signal number from a name such as "SIGRTMIN+2" or "SIGPWR"; ValueError if unknown."""
+    base, plus, offset = name.strip().upper().partition("+")
+    try:
+        signum = int(getattr(signal, base)) + (int(offset) if plus else 0)
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError(f"Unknown signal: {name}") from None
+    if signum in GUNICORN_SIGNALS:
+        raise ValueError(f"{name} is used by gunicorn; pick another, e.g. SIGRTMIN+1")
+    return signum
+
+
+def install_dump_signal(profiler, directory, signum):
+    """Dump the profile to directory whenever this process gets signum."""
+    def dump(signum, frame):
+        # Off the signal handler, which may have interrupted a span on this thread
+        threading.Thread(target=profiler.dump, args=(directory,), daemon=True).start()
+
+    try:
+        signal.signal(signum, dump)
+    except ValueError:
+        # Not the main thread; POST /admin/profile still works
+        return False
+    return True
@@ -1,6 +1,63 @@
 #!/usr/bin/env python3
+import math
+
+from src.python.compiled_scale import CompiledScale, THRESHOLD
+from src.python.scale_model import Scale
+from src.python.number_format import format_number, load_numpy, scaled_many
+from src.python.result_cache import ResultCache
+
+# Raw scale dicts compiled lazily by convert(), keyed by identity
+COMPILED_CACHE_SIZE = 64
+
+# Methods timed by enable_instrumentation, and the phase each is timed as
+INSTRUMENTED_PHASES = {
+    'convert': 'convert',
+    '_validate': 'validate',
+    '_lookup': 'lookup',
+    '_cached': 'cache',
+    '_select': 'select',
+    '_format': 'format',
+}
+
+def spanned(instrumentation, phase, method):
+    """method, with each call in an instrumentation span for phase."""
+    def call(*args):
+        with instrumentation.span(phase):
+            return method(*args)
+    return call
 
 class RelativeSizes:
+    def __init__(self):
+        self._compiled = {}
+        self.cache = None
+        self.instrumentation = None
+
+    def enable_cache(self, maxsize=4096, ttl=None):
+        """Cache convert() results in a bounded LRU; returns the cache."""
+        self.cache = ResultCache(maxsize, ttl)
+        return self.cache
+
+    def disable_cache(self):
+        self.cache = None
+
+    def enable_instrumentation(self, instrumentation):
+        """Time convert() and each of its phases with instrumentation.span(phase).
+
+        convert and its phase methods are wrapped on this instance only, so
+        the code is the same either way and has no checks to make while
+        this is off. Calling the phases as methods costs convert under a
+        microsecond a call even then.
+        """
+        self.disable_instrumentation()
+        self.instrumentation = instrumentation
+        for name, phase in INSTRUMENTED_PHASES.items():
+            setattr(self, name, spanned(instrumentation, phase, getattr(self, name)))
+
+    def disable_instrumentation(self):
+        self.instrumentation = None
+        for name in INSTRUMENTED_PHASES:
+            self.__dict__.pop(name, None)
+
     def is_valid_number(self, value):
         """Check if a value can be converted to a valid number."""
         try:
@@ -9,8 +66,35 @@ class RelativeSizes:
         except (ValueError, TypeError):
             return False
 
+    def finite_value(self, value):
+        """value as a finite float; raises ValueError as convert_all reports otherwise."""
+        if not self.is_valid_number(value) or not math.isfinite(float(value)):
+            raise ValueError("Please provide a valid number")
+        return float(value)
+
+    def value_array(self, values):
+        """A flat list of numbers as a NumPy float array.
+
+        Each element is checked like convert_all's value, so a nested list
+        or None raises ValueError rather than being flattened or turned
+        into NaN by NumPy.
+        """
+        np = load_numpy()
+        if isinstance(values, np.ndarray) and values.ndim == 1 and values.dtype.kind in "iuf":
+            array = values.astype(float)
+            if not np.isfinite(array).all():
+                raise ValueError("Please provide a valid number")
+            return array
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+        if not isinstance(values, (list, tuple)):
+            raise ValueError("Please provide a list of numbers")
+        return np.array([self.finite_value(value) for value in values], dtype=float)
+
     def is_valid_scale(self, scale):
-        """Validate the scale configuration."""
+        """Validate the scale configuration: a Scale, or a raw scale dict."""
+        if isinstance(scale, Scale):
+            return bool(scale.units)
         if not isinstance(scale, dict):
             return False
         if 'units' not in scale or 'defaultUnit' not in scale:
@@ -23,85 +107,221 @@ class RelativeSizes:
         return True
 
     def find_best_unit(self, value, units):
-        """Find the most appropriate unit for the given value."""
+        """Find the most appropriate of some Units for the given value."""
         abs_value = abs(float(value))
         if abs_value == 0:
-            return min(units, key=lambda x: x['conversionFactor'])
+            return min(units, key=lambda x: x.conversion_factor)
 
-        sorted_units = sorted(units, key=lambda x: x['conversionFactor'], reverse=True)
+        sorted_units = sorted(units, key=lambda x: x.conversion_factor, reverse=True)
         
         for unit in sorted_units:
-            converted = abs_value / unit['conversionFactor']
+            converted = abs_value / unit.conversion_factor
             if converted >= 0.95:
                 return unit
         
-        return min(units, key=lambda x: x['conversionFactor'])
+        return min(units, key=lambda x: x.conversion_factor)
 
     def format_number(self, value, decimal_places):
         """Format a number with specified decimal places using round-half-up."""
-        if decimal_places == 0:
-            if value >= 0:
-                return str(int(value + 0.5))
-            return str(int(value - 0.5))
-        
-        multiplier = 10 ** decimal_places
-        if value >= 0:
-            rounded = int(value * multiplier + 0.5) / multiplier
-        else:
-            rounded = int(value * multiplier - 0.5) / multiplier
-        
-        return f"{rounded:.{decimal_places}f}"
+        return format_number(value, decimal_places)
+
+    def compile_scale(self, scale):
+        """Return a CompiledScale for scale, or None if it is not valid.
+
+        Scales and raw dicts are compiled on first use and cached by
+        identity, so the same one is only validated and indexed once.
+        """
+        if isinstance(scale, CompiledScale):
+            return scale
+
+        cached = self._compiled.get(id(scale))
+        if cached is not None and cached[0] is scale:
+            return cached[1]
 
-    def convert(self, value, unit, scale):
-        """Convert a value from one unit to the most appropriate unit."""
-        if not self.is_valid_number(value):
-            return "Please provide a valid number"
-        if not isinstance(unit, str) or not unit:
-            return "Please provide a valid unit"
         if not self.is_valid_scale(scale):
-            return "Invalid scale configuration"
+            return None
+        compiled = CompiledScale(scale)
+
+        if len(self._compiled) >= COMPILED_CACHE_SIZE:
+            self._compiled.clear()
+        # Keep a reference to scale so its id cannot be reused while cached
+        self._compiled[id(scale)] = (scale, compiled)
+        return compiled
 
-        source_unit = None
-        for u in scale['units']:
-            if unit.rstrip('s') == u['name']:
-                source_unit = u
-                break
+    def convert(self, value, unit, scale):
+        """Convert a value from one unit to the most appropriate unit.
+
+        scale may be a raw scale dict, a Scale or a CompiledScale.
+        """
+        compiled, error = self._validate(value, unit, scale)
+        if error:
+            return error
 
+        source_unit = self._lookup(compiled, unit)
         if not source_unit:
             return f"Unknown unit: {unit}"
 
-        base_value = float(value) * source_unit['conversionFactor']
-        
-        # For the same unit case
-        if abs(base_value) < source_unit['conversionFactor'] * 0.95:
-            target_unit = source_unit
-        else:
-            # Find best larger unit first
-            sorted_units = sorted(scale['units'], key=lambda x: x['conversionFactor'], reverse=True)
-            target_unit = None
-            for u in sorted_units:
-                if base_value / u['conversionFactor'] >= 0.95:
-                    target_unit = u
-                    break
-            
-            # If no larger unit found and source is not smallest, convert to next smaller unit
-            if not target_unit and source_unit['conversionFactor'] > min(u['conversionFactor'] for u in scale['units']):
-                smaller_units = [u for u in scale['units'] if u['conversionFactor'] < source_unit['conversionFactor']]
-                if smaller_units:
-                    target_unit = max(smaller_units, key=lambda x: x['conversionFactor'])
-            
-            # Default to source unit if no better unit found
-            if not target_unit:
-                target_unit = source_unit
-
-        target_value = base_value / target_unit['conversionFactor']
-
-        source_str = self.format_number(float(value), source_unit.get('decimalPlaces', 0))
-        source_name = source_unit['plural'] if abs(float(value)) != 1 else source_unit['name']
-        
-        target_str = self.format_number(target_value, target_unit.get('decimalPlaces', 0))
-        target_name = target_unit['plural'] if abs(target_value) != 1 else target_unit['name']
+        # Results depend only on the scale's content, the unit and float(value)
+        cache = self.cache
+        if cache is not None:
+            key = (compiled.key, source_unit.name, float(value))
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+
+        target_unit, target_value = self._select(compiled, source_unit, float(value))
+        result = self._format(compiled, source_unit, float(value), target_unit, target_value)
+        if cache is not None:
+            cache.put(key, result)
+        return result
+
+    # The phases of convert(); enable_instrumentation wraps each in a span
+
+    def _validate(self, value, unit, scale):
+        """(CompiledScale, None), or (None, convert()'s error message)."""
+        if not self.is_valid_number(value):
+            return None, "Please provide a valid number"
+        if not isinstance(unit, str) or not unit:
+            return None, "Please provide a valid unit"
+        compiled = self.compile_scale(scale)
+        if compiled is None:
+            return None, "Invalid scale configuration"
+        return compiled, None
 
+    def _lookup(self, compiled, unit):
+        return compiled.find_unit(unit)
+
+    def _cached(self, key):
+        return self.cache.get(key)
+
+    def _select(self, compiled, source_unit, value):
+        """(target Unit, value in it) for a value in source_unit."""
+        base_value = value * source_unit.conversion_factor
+        target_unit = compiled.select_target(source_unit, base_value)
+        return target_unit, base_value / target_unit.conversion_factor
+
+    def _format(self, compiled, source_unit, value, target_unit, target_value):
+        source_str = compiled.format_for(source_unit).format(value)
+        source_name = source_unit.plural if abs(value) != 1 else source_unit.name
+        target_str = compiled.format_for(target_unit).format(target_value)
+        target_name = target_unit.plural if abs(target_value) != 1 else target_unit.name
         return f"{source_str} {source_name} is {target_str} {target_name}"
 
+    def source_unit(self, unit, scale):
+        """(CompiledScale, Unit) for a unit name; raises ValueError as convert() reports."""
+        if not isinstance(unit, str) or not unit:
+            raise ValueError("Please provide a valid unit")
+        compiled = self.compile_scale(scale)
+        if compiled is None:
+            raise ValueError("Invalid scale configuration")
+        source_unit = compiled.find_unit(unit)
+        if not source_unit:
+            raise ValueError(f"Unknown unit: {unit}")
+        return compiled, source_unit
+
+    def convert_all(self, value, unit, scale):
+        """A value in every unit of its scale, from one base value.
+
+        Returns one string per unit in the scale's order, each formatted
+        as convert() formats its target, e.g. "1500.0 minutes". Raises
+        ValueError where convert() would return an error message.
+        """
+        value = self.finite_value(value)
+        compiled, source_unit = self.source_unit(unit, scale)
+        base_value = value * source_unit.conversion_factor
+        results = []
+        for target_unit, factor, target_format in zip(compiled.units, compiled.factors, compiled.formats):
+            target_value = self.finite_value(base_value / factor)
+            target_name = target_unit.plural if abs(target_value) != 1 else target_unit.name
+            results.append(f"{target_format.format(target_value)} {target_name}")
+        return results
+
+    def convert_all_many(self, values, unit, scale):
+        """convert_all for each of many values: a list of lists of strings.
+
+        All values are divided by all factors in one NumPy pass; without
+        NumPy each value goes through convert_all.
+        """
+        np = load_numpy()
+        if np is None:
+            return [self.convert_all(value, unit, scale) for value in values]
+        compiled, source_unit = self.source_unit(unit, scale)
+        values = self.value_array(values)
+        with np.errstate(over="ignore"):
+            exact_values = (values * source_unit.conversion_factor)[:, None] / np.asarray(compiled.factors)
+        if not np.isfinite(exact_values).all():
+            raise ValueError("Please provide a valid number")
+        scaled = scaled_many(exact_values.ravel(), np.tile(compiled.decimal_places, len(values)))
+        width = len(compiled.units)
+        singular = (np.abs(exact_values) == 1).ravel().tolist()
+        results = []
+        for row in range(len(values)):
+            start = row * width
+            results.append([
+                f"{target_format.text(scaled[start + i])} "
+                f"{target_unit.name if singular[start + i] else target_unit.plural}"
+                for i, (target_unit, target_format) in enumerate(zip(compiled.units, compiled.formats))
+            ])
+        return results
+
+    def convert_many(self, values, unit, scale, as_strings=False):
+        """Convert an array of values from one unit in a single pass.
+
+        Returns (target_values, unit_indices): target values rounded
+        half-up to their unit's decimal places as format_number does, and
+        the index of each target unit in the scale's units. With as_strings=True returns the
+        list of strings convert() would give for each value instead.
+        Raises ValueError where convert() would return an error message.
+        """
+        # NumPy is only needed for batch conversion
+        np = load_numpy()
+        if np is None:
+            raise ImportError("convert_many requires NumPy")
+        compiled, source_unit = self.source_unit(unit, scale)
+        values = self.value_array(values)
+
+        source_index = compiled.index_of(source_unit)
+        source_factor = source_unit.conversion_factor
+        with np.errstate(over="ignore"):
+            base_values = values * source_factor
+        if not np.isfinite(base_values).all():
+            raise ValueError("Please provide a valid number")
+
+        # Largest unit each value fits in, as in CompiledScale.largest_fitting
+        fits = base_values[:, None] / np.asarray(compiled.descending_factors) >= THRESHOLD
+        fitting = np.asarray(compiled.descending_index)[fits.argmax(axis=1)]
+        fallback = compiled.index_of(compiled.fallback_for(source_unit))
+        unit_indices = np.where(fits.any(axis=1), fitting, fallback)
+        keep_source = np.abs(base_values) < source_factor * THRESHOLD
+        unit_indices = np.where(keep_source, source_index, unit_indices)
+
+        exact_values = base_values / np.asarray(compiled.factors)[unit_indices]
+        decimal_places = np.asarray(compiled.decimal_places)[unit_indices]
+        target_scaled = scaled_many(exact_values, decimal_places)
+        if not as_strings:
+            target_values = np.asarray(target_scaled, dtype=float) / np.power(10.0, decimal_places) + 0.0
+            return target_values, unit_indices
+
+        source_format = compiled.formats[source_index]
+        source_scaled = scaled_many(values, source_format.decimal_places)
+        results = []
+        for value, source_int, exact, target_int, index in zip(
+                values.tolist(), source_scaled, exact_values.tolist(),
+                target_scaled, unit_indices.tolist()):
+            target_unit = compiled.units[index]
+            source_name = source_unit.plural if abs(value) != 1 else source_unit.name
+            target_name = target_unit.plural if abs(exact) != 1 else target_unit.name
+            results.append(
+                f"{source_format.text(source_int)} {source_name} is "
+                f"{compiled.formats[index].text(target_int)} {target_name}"
+            )
+        return results
+
+# Results that start like this are problems with the input, not conversions
+ERROR_PREFIXES = ("Please provide", "Invalid scale", "Unknown unit", "Ambiguous unit")
+
+def is_error(result):
+    """True if a convert() result is an error message."""
+    return result.startswith(ERROR_PREFIXES)
+
 relative_sizes = RelativeSizes()
@@ -0,0 +1,572 @@
+# src/python/routeFinder.py
+"""Routes between points joined by two-way legs.
+
+makep2p() makes a leg; findRoute() answers one query over a list of legs.
+Both report problems as "ERROR: ..." strings rather than raising.
+
+A LegTable holds many legs in columns: points interned to ints, and
+typed arrays of start, end, distance and duration, with no object per
+leg. It can be read from CSV, and findRoute and RouteGraph take one
+wherever they take a list of legs.
+
+A RouteGraph indexes the legs once, so many queries over the same legs
+should build one and call find() on it. Node names are interned to ints
+and each node keeps a list of (neighbour, distance, duration), so:
+
+- minDistance and minDuration are Dijkstra searches, O(E log V);
+- fewestStops is a breadth-first search, O(V + E);
+- k_shortest() yields simple routes cheapest first (Yen's algorithm),
+  one Dijkstra search per point of the previous route, so the top few
+  of a dense graph's exponentially many routes cost little. allRoutes
+  is a RouteList over it: routes are only found as they are read, and
+  it stops at MAX_ROUTES (or the limits given to find()). Its truncated
+  is True when routes were left out by that cap; pass max_routes=None
+  for every route.
+"""
+import csv
+import heapq
+import itertools
+from array import array
+from collections.abc import Sequence
+
+DEFAULT_DISTANCE = 1
+DEFAULT_DURATION = 60
+
+# Most routes allRoutes lists unless find() is given other limits
+MAX_ROUTES = 1000
+
+# Marks the end of an iterator in RouteList
+_END = object()
+
+
+class Leg:
+    """A two-way leg between two points."""
+
+    __slots__ = ("step", "distance", "duration")
+
+    def __init__(self, start, end, distance=None, duration=None):
+        self.step = (start, end)
+        self.distance = DEFAULT_DISTANCE if distance is None else distance
+        self.duration = DEFAULT_DURATION if duration is None else duration
+
+    def same_as(self, other):
+        """Whether other joins the same points (either way round) at the same cost."""
+        return (
+            (other.step == self.step or other.step == self.step[::-1])
+            and (other.distance, other.duration) == (self.distance, self.duration)
+        )
+
+    def __repr__(self):
+        return f"makep2p({self.step[0]!r}, {self.step[1]!r}, {self.distance!r}, {self.duration!r})"
+
+
+def makep2p(start, end=None, distance=None, duration=None):
+    """A leg from start to end; distance defaults to 1 and duration to 60."""
+    if not start:
+        return "ERROR: no routes supplied to makep2p"
+    return Leg(start, end, distance, duration)
+
+
+def as_leg(leg):
+    """A Leg from a Leg or a (start, end) pair; ValueError for anything else."""
+    if isinstance(leg, Leg):
+        return leg
+    if isinstance(leg, (tuple, list)) and len(leg) == 2:
+        return Leg(*leg)
+    raise ValueError(f"not a leg: {leg!r}")
+
+
+class LegTable:
+    """Legs stored by column rather than one object each.
+
+    Points are interned to ints as they are added: names[i] is point i and
+    ids maps back. start and end are arrays of those ints, distance and
+    duration arrays of floats. Indexing or iterating gives Leg objects,
+    made on demand, so a LegTable can stand in for a list of legs.
+    """
+
+    def __init__(self, legs=()):
+        self.names = []
+        self.ids = {}
+        self.start = array("i")
+        self.end = array("i")
+        self.distance = array("d")
+        self.duration = array("d")
+        for leg in legs:
+            self.append(leg)
+
+    def intern(self, point):
+        """The int id of a point, adding it if new."""
+        node = self.ids.get(point)
+        if node is None:
+            node = self.ids[point] = len(self.names)
+            self.names.append(point)
+        return node
+
+    def add(self, start, end, distance=None, duration=None):
+        """Add a leg as makep2p would make it; distance defaults to 1 and duration to 60."""
+        self.start.append(self.intern(start))
+        self.end.append(self.intern(end))
+        self.distance.append(DEFAULT_DISTANCE if distance is None else distance)
+        self.duration.append(DEFAULT_DURATION if duration is None else duration)
+
+    def append(self, leg):
+        """Add a Leg or a (start, end) pair; ValueError for anything else."""
+        leg = as_leg(leg)
+        self.add(*leg.step, leg.distance, leg.duration)
+
+    @classmethod
+    def from_csv(cls, source):
+        """A LegTable from CSV with start and end columns and, optionally, distance and duration.
+
+        source is a path or an open text file. Empty distance or duration
+        cells take the defaults. ValueError, naming the line, for a missing
+        column or a cost that is not a number.
+        """
+        if not hasattr(source, "read"):
+            with open(source, newline="") as f:
+                return cls.from_csv(f)
+        reader = csv.DictReader(source)
+        missing = {"start", "end"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"CSV has no {' or '.join(sorted(missing))} column")
+        table = cls()
+        for row in reader:
+            try:
+                distance, duration = (
+                    float(row[column]) if row.get(column) not in (None, "") else None
+                    for column in ("distance", "duration")
+                )
+            except ValueError:
+                raise ValueError(f"line {reader.line_num}: distance and duration must be numbers") from None
+            table.add(row["start"], row["end"], distance, duration)
+        return table
+
+    def __len__(self):
+        return len(self.start)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Leg(
+            self.names[self.start[index]], self.names[self.end[index]],
+            self.distance[index], self.duration[index],
+        )
+
+    def __delitem__(self, index):
+        """Remove a leg; its points stay interned."""
+        for column in (self.start, self.end, self.distance, self.duration):
+            del column[index]
+
+    def __iter__(self):
+        names = self.names
+        for a, b, distance, duration in zip(self.start, self.end, self.distance, self.duration):
+            yield Leg(names[a], names[b], distance, duration)
+
+    def __repr__(self):
+        return f"LegTable({len(self)} legs, {len(self.names)} points)"
+
+
+class Route:
+    """One way from start to end: the points passed, in order, and their totals."""
+
+    __slots__ = ("route", "distance", "duration")
+
+    def __init__(self, route, distance, duration):
+        self.route = route
+        self.distance = distance
+        self.duration = duration
+
+    @property
+    def stops(self):
+        """Legs travelled."""
+        return len(self.route) - 1
+
+    def __eq__(self, other):
+        if not isinstance(other, Route):
+            return NotImplemented
+        return (self.route, self.distance, self.duration) == (other.route, other.distance, other.duration)
+
+    def __repr__(self):
+        return f"Route({self.route!r}, distance={self.distance!r}, duration={self.duration!r})"
+
+
+class RouteGraph:
+    """An adjacency index over legs, built once and queried many times.
+
+    names are interned first, in order, so a graph can be given the same
+    ids as one saved earlier.
+    """
+
+    def __init__(self, legs, names=()):
+        # The graph's points are its LegTable's, so both use the same ids
+        self.legs = LegTable()
+        self.names = self.legs.names
+        self.ids = self.legs.ids
+        self.adjacency = []
+        self._cost_tables = {}
+        for point in names:
+            self.intern(point)
+        if isinstance(legs, LegTable):
+            self._add_table(legs)
+        else:
+            for leg in legs:
+                self.add_leg(leg)
+
+    def _add_table(self, table):
+        """Add every leg of a LegTable, straight from its columns, making no Leg objects."""
+        node_of = [self.intern(point) for point in table.names]
+        for a, b, distance, duration in zip(table.start, table.end, table.distance, table.duration):
+            if distance < 0 or duration < 0:
+                raise ValueError(f"negative distance or duration: {Leg(table.names[a], table.names[b], distance, duration)!r}")
+            a, b = node_of[a], node_of[b]
+            self.adjacency[a].append((b, distance, duration))
+            if b != a:
+                self.adjacency[b].append((a, distance, duration))
+            self.legs.start.append(a)
+            self.legs.end.append(b)
+        self.legs.distance.extend(table.distance)
+        self.legs.duration.extend(table.duration)
+
+    def add_leg(self, leg):
+        """Add a leg (a Leg or a (start, end) pair); ValueError if it is not one."""
+        leg = as_leg(leg)
+        if leg.distance < 0 or leg.duration < 0:
+            raise ValueError(f"negative distance or duration: {leg!r}")
+        a, b = (self.intern(point) for point in leg.step)
+        self.adjacency[a].append((b, leg.distance, leg.duration))
+        if b != a:
+            self.adjacency[b].append((a, leg.distance, leg.duration))
+        self.legs.add(*leg.step, leg.distance, leg.duration)
+        self._cost_tables.clear()
+        return leg
+
+    def remove_leg(self, leg):
+        """Remove one leg the same as leg; ValueError if there is none. Points stay."""
+        leg = as_leg(leg)
+        for i, known in enumerate(self.legs):
+            if known.same_as(leg):
+                del self.legs[i]
+                break
+        else:
+            raise ValueError(f"no such leg: {leg!r}")
+        a, b = (self.ids[point] for point in known.step)
+        self.adjacency[a].remove((b, known.distance, known.duration))
+        if b != a:
+            self.adjacency[b].remove((a, known.distance, known.duration))
+        self._cost_tables.clear()
+        return known
+
+    def intern(self, point):
+        """The int id of a point, adding it if new."""
+        node = self.legs.intern(point)
+        if node == len(self.adjacency):
+            self.adjacency.append([])
+        return node
+
+    def __contains__(self, point):
+        return point in self.ids
+
+    def find(self, start, end, max_routes=MAX_ROUTES, max_stops=None):
+        """A RouteResult, or an "ERROR: ..." string as findRoute gives.
+
+        max_routes and max_stops (legs per route) limit allRoutes; None is
+        no limit.
+        """
+        if start == end:
+            return "ERROR: same start and end points"
+        if start not in self.ids:
+            return "ERROR: start point is not in routes"
+        if end not in self.ids:
+            return "ERROR: end point is not in routes"
+        fewest = self.fewest_stops(start, end)
+        if fewest is None:
+            return "ERROR: there is no connection between start and end"
+        return RouteResult(self, start, end, fewest, max_routes, max_stops)
+
+    def _route(self, nodes, distance, duration):
+        return Route([self.names[n] for n in nodes], distance, duration)
+
+    def fewest_stops(self, start, end):
+        """Route with the fewest legs, shortest first among those; None if unreachable.
+
+        Breadth-first, one hop count at a time: a node keeps the cheapest of
+        the paths that reach it in its fewest hops.
+        """
+        source, target = self.ids[start], self.ids[end]
+        hops = {source: 0}
+        cost = {source: (0, 0)}
+        previous = {}
+        frontier = [source]
+        while frontier and target not in hops:
+            next_frontier = []
+            for node in frontier:
+                distance, duration = cost[node]
+                for neighbour, leg_distance, leg_duration in self.adjacency[node]:
+                    reached = (distance + leg_distance, duration + leg_duration)
+                    if neighbour not in hops:
+                        hops[neighbour] = hops[node] + 1
+                        next_frontier.append(neighbour)
+                    elif hops[neighbour] != hops[node] + 1 or reached >= cost[neighbour]:
+                        continue
+                    cost[neighbour] = reached
+                    previous[neighbour] = node
+            frontier = next_frontier
+        if target not in hops:
+            return None
+        return self._route(self._path(previous, source, target), *cost[target])
+
+    def shortest(self, start, end, by="distance"):
+        """Route with the least total distance (or duration); None if unreachable.
+
+        Dijkstra over (by, the other, legs), so ties go to the cheaper other
+        total and then to fewer legs.
+        """
+        costs = self.cost_table(by)
+        found = self._search(costs, self.ids[start], self.ids[end])
+        return None if found is None else self._priced(found[0], costs, by)
+
+    def k_shortest(self, start, end, by="distance", max_stops=None):
+        """Simple routes from start to end, cheapest by distance (or duration) first.
+
+        A generator, so taking the first few routes costs only those: Yen's
+        algorithm finds each next route with one Dijkstra search per point
+        of the route before it. max_stops leaves out routes of more legs.
+        """
+        costs = self.cost_table(by)
+        source, target = self.ids[start], self.ids[end]
+        first = self._search(costs, source, target, max_stops=max_stops)
+        if first is None:
+            return
+        found = [first[0]]
+        yield self._priced(first[0], costs, by)
+
+        # (primary, secondary, legs, tie, nodes) for routes not yet yielded
+        candidates = []
+        queued = {tuple(first[0])}
+        tie = itertools.count()
+        while True:
+            last = found[-1]
+            root_cost = (0, 0)
+            for i in range(len(last) - 1):
+                # Leave last at its i-th point, by a leg no found route with the same start took
+                root = last[:i + 1]
+                banned_legs = {(route[i], route[i + 1]) for route in found if route[:i + 1] == root}
+                spur = self._search(
+                    costs, last[i], target, set(root[:-1]), banned_legs,
+                    None if max_stops is None else max_stops - i
+                )
+                if spur is not None:
+                    nodes = root[:-1] + spur[0]
+                    if tuple(nodes) not in queued:
+                        queued.add(tuple(nodes))
+                        primary, secondary = spur[1]
+                        heapq.heappush(candidates, (
+                            root_cost[0] + primary, root_cost[1] + secondary, len(nodes) - 1, next(tie), nodes
+                        ))
+                step = costs[last[i]][last[i + 1]]
+                root_cost = (root_cost[0] + step[0], root_cost[1] + step[1])
+            if not candidates:
+                return
+            nodes = heapq.heappop(candidates)[-1]
+            found.append(nodes)
+            yield self._priced(nodes, costs, by)
+
+    def cost_table(self, by):
+        """Per node, {neighbour: (by, the other)} over the cheapest leg between them."""
+        table = self._cost_tables.get(by)
+        if table is not None:
+            return table
+        if by not in ("distance", "duration"):
+            raise ValueError(f"Unknown cost: {by}")
+        first = 1 if by == "distance" else 2
+        second = 3 - first
+        table = []
+        for legs in self.adjacency:
+            cheapest = {}
+            for leg in legs:
+                cost = (leg[first], leg[second])
+                known = cheapest.get(leg[0])
+                if known is None or cost < known:
+                    cheapest[leg[0]] = cost
+            table.append(cheapest)
+        self._cost_tables[by] = table
+        return table
+
+    @staticmethod
+    def _search(costs, source, target, banned_nodes=(), banned_legs=(), max_stops=None):
+        """(nodes, (primary, secondary)) of the cheapest path, or None.
+
+        Dijkstra over (primary, secondary, legs), never entering banned_nodes
+        or taking a banned (from, to) leg. With max_stops each node is
+        searched once per leg count, so the best path within it is found.
+        """
+        best = {source if max_stops is None else (source, 0): (0, 0, 0)}
+        previous = {}
+        heap = [(0, 0, 0, source)]
+        while heap:
+            primary, secondary, legs, node = heapq.heappop(heap)
+            state = node if max_stops is None else (node, legs)
+            if (primary, secondary, legs) > best[state]:
+                continue
+            if node == target:
+                path = [node]
+                while state in previous:
+                    state = previous[state]
+                    path.append(state if max_stops is None else state[0])
+                path.reverse()
+                return path, (primary, secondary)
+            if max_stops is not None and legs >= max_stops:
+                continue
+            for neighbour, (step_primary, step_secondary) in costs[node].items():
+                if neighbour in banned_nodes or (node, neighbour) in banned_legs:
+                    continue
+                reached = (primary + step_primary, secondary + step_secondary, legs + 1)
+                next_state = neighbour if max_stops is None else (neighbour, legs + 1)
+                known = best.get(next_state)
+                if known is None or reached < known:
+                    best[next_state] = reached
+                    previous[next_state] = state
+                    heapq.heappush(heap, (*reached, neighbour))
+        return None
+
+    def _priced(self, nodes, costs, by):
+        """The Route through nodes, over the legs costs picked."""
+        primary = secondary = 0
+        for a, b in zip(nodes, nodes[1:]):
+            step = costs[a][b]
+            primary += step[0]
+            secondary += step[1]
+        if by == "distance":
+            return self._route(nodes, primary, secondary)
+        return self._route(nodes, secondary, primary)
+
+    @staticmethod
+    def _path(previous, source, target):
+        path = [target]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        path.reverse()
+        return path
+
+    def all_routes(self, start, end, max_routes=MAX_ROUTES, max_stops=None):
+        """Simple paths from start to end as lists of points, shortest first.
+
+        A RouteList: routes are found as they are read, up to max_routes.
+        """
+        return RouteList((r.route for r in self.k_shortest(start, end, "distance", max_stops)), max_routes)
+
+
+class RouteList(Sequence):
+    """A read-only list whose items are drawn from an iterator as they are needed.
+
+    Indexing, iterating and `in` stop drawing once they have their answer;
+    len(), slices, negative indices and == draw everything (up to limit).
+    """
+
+    def __init__(self, items, limit=None):
+        self._source = iter(items)
+        self._limit = limit
+        self._items = []
+        # An item drawn past the limit by truncated, never listed
+        self._extra = None
+
+    def _draw(self, count=None):
+        """Draw until there are count items, or all of them; False if the source ran out."""
+        if self._limit is not None and (count is None or count > self._limit):
+            count, ran_out = self._limit, True
+        else:
+            ran_out = False
+        while count is None or len(self._items) < count:
+            item = next(self._source, _END)
+            if item is _END:
+                return False
+            self._items.append(item)
+        return not ran_out
+
+    @property
+    def truncated(self):
+        """True if the limit left out items; draws everything, plus one more to tell."""
+        self._draw()
+        if self._limit is None or len(self._items) < self._limit:
+            return False
+        if self._extra is None:
+            self._extra = next(self._source, _END)
+        return self._extra is not _END
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) or index < 0:
+            self._draw()
+        else:
+            self._draw(index + 1)
+        return self._items[index]
+
+    def __len__(self):
+        self._draw()
+        return len(self._items)
+
+    def __iter__(self):
+        index = 0
+        while index < len(self._items) or self._draw(index + 1):
+            yield self._items[index]
+            index += 1
+
+    def __eq__(self, other):
+        if isinstance(other, (list, RouteList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        more = "" if self._draw(len(self._items) + 1) is False else ", ..."
+        return f"RouteList({self._items!r}{more})"
+
+
+class RouteResult:
+    """What findRoute finds; each answer is worked out the first time it is read."""
+
+    def __init__(self, graph, start, end, fewest_stops=None, max_routes=MAX_ROUTES, max_stops=None):
+        self.graph = graph
+        self.start = start
+        self.end = end
+        if fewest_stops is not None:
+            self.fewestStops = fewest_stops
+        self.max_routes = max_routes
+        self.max_stops = max_stops
+
+    def __getattr__(self, name):
+        # Only called for attributes not yet set: compute, then keep
+        if name == "fewestStops":
+            value = self.graph.fewest_stops(self.start, self.end)
+        elif name == "minDistance":
+            value = self.graph.shortest(self.start, self.end, "distance")
+        elif name == "minDuration":
+            value = self.graph.shortest(self.start, self.end, "duration")
+        elif name == "allRoutes":
+            value = self.graph.all_routes(self.start, self.end, self.max_routes, self.max_stops)
+        else:
+            raise AttributeError(name)
+        setattr(self, name, value)
+        return value
+
+    def alternatives(self, by="distance", max_stops=None):
+        """Routes cheapest first, as a generator; see RouteGraph.k_shortest."""
+        return self.graph.k_shortest(self.start, self.end, by, max_stops)
+
+
+def findRoute(routes, start, end, max_routes=MAX_ROUTES, max_stops=None):
+    """Routes from start to end over a list of legs (makep2p or (start, end) pairs).
+
+    Returns a RouteResult with allRoutes, fewestStops, minDistance and
+    minDuration, or an "ERROR: ..." string.
+    """
+    if start == end:
+        return "ERROR: same start and end points"
+    if not routes:
+        return "ERROR: no routes supplied"
+    try:
+        graph = RouteGraph(routes)
+    except (ValueError, TypeError) as e:
+        return f"ERROR: {e}"
+    return graph.find(start, end, max_routes, max_stops)
@@ -0,0 +1,270 @@
+# src/python/route_index.py
+"""All-pairs route tables for repeated findRoute queries over the same legs.
+
+A RouteIndex holds, for distance and for duration, one row per point: the
+best totals from that point to every other point and the next point to
+go to. minDistance and minDuration for any start and end are then read
+from the rows along the route, with no search.
+
+Rows come from one Dijkstra search per point, run in a process pool with
+jobs > 1. Adding or removing a leg only clears the rows it can change,
+and a cleared row is searched again the next time it is read. A new
+point clears every row, as each row gains a column.
+
+An index is keyed by a hash of its legs that does not depend on their
+order and is kept up to date as legs change. save() and load() keep it
+on disk under that key; cached_index() builds one only if none is saved.
+"""
+import hashlib
+import heapq
+import marshal
+import os
+from array import array
+
+from src.python.routeFinder import LegTable, Route, RouteGraph, RouteResult, as_leg
+
+CRITERIA = ("distance", "duration")
+
+# Bump when the layout of saved indexes changes
+INDEX_FORMAT = 1
+
+# next-hop entry for a point that cannot be reached
+UNREACHABLE = -1
+
+# Legs hash to 256-bit ints; a set of legs hashes to their sum modulo this
+_HASH_MODULUS = 1 << 256
+
+# A row whose best total to a point is within this fraction of what a
+# changed leg gives is cleared, as float sums need not agree to the last bit
+TOLERANCE = 1e-9
+
+
+def leg_hash(leg):
+    """A 256-bit hash of a leg that is the same whichever way round it is given."""
+    a, b = sorted(repr(point) for point in leg.step)
+    # Costs as floats, so a leg hashes the same read back from a LegTable
+    digest = hashlib.sha256(repr((a, b, float(leg.distance), float(leg.duration))).encode()).digest()
+    return int.from_bytes(digest, "big")
+
+
+def legs_key(legs):
+    """Hex content hash of some legs, in any order."""
+    return format(sum(leg_hash(as_leg(leg)) for leg in legs) % _HASH_MODULUS, "064x")
+
+
+def single_source(costs, source):
+    """One row: arrays of primary and secondary totals, legs and next point from source.
+
+    costs is a RouteGraph cost table. The search is the one RouteGraph
+    uses, over (primary, secondary, legs), run until every point is done.
+    """
+    size = len(costs)
+    primary = array("d", [float("inf")]) * size
+    secondary = array("d", [float("inf")]) * size
+    legs = array("i", [0]) * size
+    next_hop = array("i", [UNREACHABLE]) * size
+    best = {source: (0, 0, 0)}
+    # (primary, secondary, legs, point, first point after source)
+    heap = [(0, 0, 0, source, source)]
+    while heap:
+        total_primary, total_secondary, total_legs, node, hop = heapq.heappop(heap)
+        if next_hop[node] != UNREACHABLE or (total_primary, total_secondary, total_legs) > best[node]:
+            continue
+        primary[node], secondary[node], legs[node], next_hop[node] = total_primary, total_secondary, total_legs, hop
+        for neighbour, (step_primary, step_secondary) in costs[node].items():
+            reached = (total_primary + step_primary, total_secondary + step_secondary, total_legs + 1)
+            known = best.get(neighbour)
+            if known is None or reached < known:
+                best[neighbour] = reached
+                heapq.heappush(heap, (*reached, neighbour, neighbour if node == source else hop))
+    return primary, secondary, legs, next_hop
+
+
+# Each pool worker gets the cost tables once, in _init_worker
+_worker_costs = None
+
+
+def _init_worker(costs):
+    global _worker_costs
+    _worker_costs = costs
+
+
+def _rows_in_worker(criterion, sources):
+    return [single_source(_worker_costs[criterion], source) for source in sources]
+
+
+class RouteIndex:
+    """Precomputed best routes between every pair of points of some legs."""
+
+    def __init__(self, legs, jobs=1, names=(), build=True):
+        """Index legs (a RouteGraph, or legs as findRoute takes them).
+
+        With build=False rows are only searched when first read.
+        """
+        self.graph = legs if isinstance(legs, RouteGraph) else RouteGraph(legs, names)
+        self._hash = sum(leg_hash(leg) for leg in self.graph.legs) % _HASH_MODULUS
+        self.rows = {criterion: [None] * len(self.graph.names) for criterion in CRITERIA}
+        if build:
+            self.build(jobs)
+
+    @property
+    def key(self):
+        """Content hash of the legs, as legs_key gives."""
+        return format(self._hash, "064x")
+
+    def build(self, jobs=1):
+        """Search every row that is not up to date, in a pool of jobs processes if more than one."""
+        missing = {
+            criterion: [node for node, row in enumerate(rows) if row is None]
+            for criterion, rows in self.rows.items()
+        }
+        if jobs <= 1 or sum(len(nodes) for nodes in missing.values()) < 2:
+            for criterion, nodes in missing.items():
+                costs = self.graph.cost_table(criterion)
+                for node in nodes:
+                    self.rows[criterion][node] = single_source(costs, node)
+            return self
+
+        # Only the pool needs multiprocessing, which is slow to import
+        import multiprocessing
+        costs = {criterion: self.graph.cost_table(criterion) for criterion in CRITERIA}
+        with multiprocessing.Pool(jobs, _init_worker, (costs,)) as pool:
+            pending = []
+            for criterion, nodes in missing.items():
+                size = max(len(nodes) // (4 * jobs), 1)
+                for i in range(0, len(nodes), size):
+                    chunk = nodes[i:i + size]
+                    pending.append((criterion, chunk, pool.apply_async(_rows_in_worker, (criterion, chunk))))
+            for criterion, chunk, result in pending:
+                for node, row in zip(chunk, result.get()):
+                    self.rows[criterion][node] = row
+        return self
+
+    def _row(self, criterion, node):
+        row = self.rows[criterion][node]
+        if row is None:
+            row = self.rows[criterion][node] = single_source(self.graph.cost_table(criterion), node)
+        return row
+
+    def route(self, start, end, by="distance"):
+        """The Route with the least total distance (or duration); None if unreachable.
+
+        KeyError for a point not in the legs.
+        """
+        if by not in self.rows:
+            raise ValueError(f"Unknown cost: {by}")
+        source, target = self.graph.ids[start], self.graph.ids[end]
+        primary, secondary, _, next_hop = self._row(by, source)
+        if next_hop[target] == UNREACHABLE:
+            return None
+        nodes = [source]
+        while nodes[-1] != target:
+            if len(nodes) > len(self.graph.names):
+                raise RuntimeError(f"route tables loop between {start!r} and {end!r}")
+            nodes.append(self._row(by, nodes[-1])[3][target])
+        names = [self.graph.names[node] for node in nodes]
+        if by == "distance":
+            return Route(names, primary[target], secondary[target])
+        return Route(names, secondary[target], primary[target])
+
+    def find(self, start, end):
+        """A RouteResult with minDistance and minDuration from the tables, or an "ERROR: ..." string."""
+        if start == end:
+            return "ERROR: same start and end points"
+        if start not in self.graph:
+            return "ERROR: start point is not in routes"
+        if end not in self.graph:
+            return "ERROR: end point is not in routes"
+        shortest = self.route(start, end, "distance")
+        if shortest is None:
+            return "ERROR: there is no connection between start and end"
+        result = RouteResult(self.graph, start, end)
+        result.minDistance = shortest
+        result.minDuration = self.route(start, end, "duration")
+        return result
+
+    def add_leg(self, leg):
+        """Add a leg, clearing the rows it could make cheaper."""
+        new_point = any(point not in self.graph for point in as_leg(leg).step)
+        leg = self.graph.add_leg(leg)
+        self._hash = (self._hash + leg_hash(leg)) % _HASH_MODULUS
+        if new_point:
+            self.rows = {criterion: [None] * len(self.graph.names) for criterion in CRITERIA}
+            return leg
+        self._clear_rows_through(leg)
+        return leg
+
+    def remove_leg(self, leg):
+        """Remove a leg, clearing the rows whose routes could have used it."""
+        leg = self.graph.remove_leg(leg)
+        self._hash = (self._hash - leg_hash(leg)) % _HASH_MODULUS
+        self._clear_rows_through(leg)
+        return leg
+
+    def _clear_rows_through(self, leg):
+        """Clear rows in which leg, either way round, is as cheap as the best route to its far end.
+
+        Those are the rows a new leg can improve and a removed one can have
+        been on the route of; every other row stays correct either way.
+        """
+        a, b = (self.graph.ids[point] for point in leg.step)
+        for criterion, rows in self.rows.items():
+            step = leg.distance if criterion == "distance" else leg.duration
+            for node, row in enumerate(rows):
+                if row is not None and (reaches(row[0], a, b, step) or reaches(row[0], b, a, step)):
+                    rows[node] = None
+
+    def save(self, path):
+        """Write the index to path, searching any rows not yet up to date first."""
+        self.build()
+        entry = (INDEX_FORMAT, self.key, list(self.graph.names), {
+            criterion: [tuple(column.tobytes() for column in row) for row in rows]
+            for criterion, rows in self.rows.items()
+        })
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                marshal.dump(entry, f)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @classmethod
+    def load(cls, path, legs):
+        """The index saved at path if it was saved for these legs, else None."""
+        try:
+            with open(path, "rb") as f:
+                index_format, key, names, rows = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if index_format != INDEX_FORMAT:
+            return None
+        index = cls(legs, names=names, build=False)
+        if index.key != key or index.graph.names != names:
+            return None
+        for criterion, saved in rows.items():
+            index.rows[criterion] = [
+                tuple(array(code, column) for code, column in zip("ddii", row)) for row in saved
+            ]
+        return index
+
+
+def reaches(totals, a, b, step):
+    """Whether going to a and then a step further is about as cheap as the best total to b."""
+    via = totals[a] + step
+    best = totals[b]
+    return via <= best + TOLERANCE * max(abs(best), 1) if best != float("inf") else via != float("inf")
+
+
+def cached_index(legs, directory, jobs=1):
+    """The RouteIndex for legs saved in directory, building and saving it if there is none."""
+    if not isinstance(legs, LegTable):
+        legs = [as_leg(leg) for leg in legs]
+    path = os.path.join(directory, f"{legs_key(legs)}.routes")
+    index = RouteIndex.load(path, legs)
+    if index is None:
+        index = RouteIndex(legs, jobs)
+        os.makedirs(directory, exist_ok=True)
+        index.save(path)
+    return index
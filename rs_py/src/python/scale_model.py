@@ -0,0 +1,100 @@
+# src/python/scale_model.py
+"""Immutable Unit and Scale objects built from config.json.
+
+The config is plain JSON: scales of units, each unit a dict with name,
+plural, conversionFactor, decimalPlaces and aliases. Everything past
+loading works on Unit and Scale instead, which have __slots__ (so no
+per-instance dict, and an attribute read rather than a key lookup per
+field) and cannot be changed once built. to_dict() gives back the JSON
+shape for the API.
+"""
+
+
+class Frozen:
+    """Base for slotted objects whose attributes are set once, in __init__."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _set(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+
+class Unit(Frozen):
+    __slots__ = ("name", "plural", "conversion_factor", "decimal_places", "aliases")
+
+    def __init__(self, name, conversion_factor, plural=None, decimal_places=0, aliases=()):
+        # A unit without a plural is pluralised regularly, as find_unit accepts
+        self._set(
+            name=name,
+            plural=plural if plural is not None else name + "s",
+            conversion_factor=conversion_factor,
+            decimal_places=decimal_places,
+            aliases=tuple(aliases),
+        )
+
+    @classmethod
+    def from_dict(cls, unit):
+        """A Unit from its config.json dict; aliases that are not names are dropped."""
+        aliases = unit.get("aliases")
+        return cls(
+            unit["name"],
+            unit["conversionFactor"],
+            unit.get("plural"),
+            unit.get("decimalPlaces", 0),
+            [a for a in aliases if isinstance(a, str) and a] if isinstance(aliases, list) else (),
+        )
+
+    def to_dict(self):
+        """The unit as config.json has it."""
+        unit = {
+            "name": self.name,
+            "plural": self.plural,
+            "conversionFactor": self.conversion_factor,
+            "decimalPlaces": self.decimal_places,
+        }
+        if self.aliases:
+            unit["aliases"] = list(self.aliases)
+        return unit
+
+    def __repr__(self):
+        return f"Unit({self.name!r}, {self.conversion_factor!r})"
+
+
+class Scale(Frozen):
+    __slots__ = ("name", "default_unit", "units")
+
+    def __init__(self, name, default_unit, units):
+        self._set(name=name, default_unit=default_unit, units=tuple(units))
+
+    @classmethod
+    def from_dict(cls, scale):
+        """A Scale from its config.json dict, which is not kept."""
+        return cls(scale.get("name"), scale["defaultUnit"], [Unit.from_dict(u) for u in scale["units"]])
+
+    def to_dict(self):
+        """The scale as config.json has it."""
+        return {
+            "name": self.name,
+            "defaultUnit": self.default_unit,
+            "units": [unit.to_dict() for unit in self.units],
+        }
+
+    def __repr__(self):
+        return f"Scale({self.name!r}, {len(self.units)} units)"
+
+
+def load_scales(config):
+    """A Scale for each scale in a config dict, in config order."""
+    return tuple(Scale.from_dict(s) for s in config["scales"])
+
+
+def to_config(scales):
+    """The config dict for some Scales: what /api/config serves."""
+    return {"scales": [scale.to_dict() for scale in scales]}
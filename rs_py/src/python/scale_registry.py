@@ -0,0 +1,242 @@
+# src/python/scale_registry.py
+import hashlib
+import marshal
+import os
+import threading
+import time
+import warnings
+
+from src.python.compiled_scale import CompiledScale, compile_scales
+from src.python.relative_sizes import relative_sizes
+from src.python.scale_model import load_scales, to_config
+from src.python.unit_index import UnitIndex
+
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'config.json')
+
+# Bump when the layout of cache files changes
+CACHE_FORMAT = 1
+
+
+class ConfigError(ValueError):
+    """The config file is missing, not JSON, or not a valid scale config."""
+
+
+class ConfigWarning(UserWarning):
+    """The config loaded, but something in it is probably a mistake."""
+
+
+def validate_config(config):
+    """Raise ConfigError unless every scale passes is_valid_scale and can be indexed."""
+    if not isinstance(config, dict) or not isinstance(config.get("scales"), list) or not config["scales"]:
+        raise ConfigError("Config must have a non-empty 'scales' list")
+    names = set()
+    for scale in config["scales"]:
+        if not relative_sizes.is_valid_scale(scale):
+            raise ConfigError(f"Invalid scale configuration: {scale!r:.60}")
+        name = scale.get("name")
+        if not isinstance(name, str) or not name:
+            raise ConfigError("Every scale needs a name")
+        if name in names:
+            raise ConfigError(f"Duplicate scale: {name}")
+        names.add(name)
+        for unit in scale["units"]:
+            factor = unit.get("conversionFactor")
+            if not isinstance(unit.get("name"), str) or not isinstance(factor, (int, float)) or factor <= 0:
+                raise ConfigError(f"Invalid unit in scale {name}: {unit!r:.60}")
+            aliases = unit.get("aliases", [])
+            if not isinstance(aliases, list) or not all(isinstance(a, str) and a for a in aliases):
+                raise ConfigError(f"Aliases of {unit['name']} in scale {name} must be a list of names")
+        compiled = CompiledScale(scale)
+        if compiled.find_unit(compiled.default_unit) is None:
+            raise ConfigError(f"Default unit of scale {name} is not one of its units")
+
+
+class ConfigSnapshot:
+    """One version of a config that passed validate_config, indexed by scale name.
+
+    Snapshots are never changed after construction, so a request can hold
+    one for its whole lifetime while a newer version is swapped in. The
+    config dict is turned into Scales and not kept; config rebuilds it.
+    """
+
+    def __init__(self, config, version, stamp=None):
+        self.version = version
+        self.stamp = stamp
+        self.scales = compile_scales(load_scales(config))
+        self.scale_names = list(self.scales)
+        self.units = UnitIndex(self.scales)
+        first = self.scales[self.scale_names[0]]
+        self.default_state = {
+            "inputValue": 1,
+            "currentUnit": first.default_unit,
+            "currentScale": first.name
+        }
+
+    @property
+    def config(self):
+        """The config in config.json's shape, as /api/config serves it."""
+        return to_config(scale.scale for scale in self.scales.values())
+
+
+def config_version(config):
+    """A short hash of config's content, the same in every process that loads it.
+
+    Workers behind a load balancer each load the file themselves, so a
+    counter would differ between them; identical content gives one version.
+    """
+    return hashlib.sha256(repr(config).encode()).hexdigest()[:12]
+
+
+def file_stamp(path):
+    """What we compare to notice a changed file: (mtime in ns, size)."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def default_cache_path(path):
+    """Where the config cache for path goes, next to Python's bytecode cache."""
+    return os.path.join(os.path.dirname(path), '__pycache__', os.path.basename(path) + '.marshal')
+
+
+def read_config(path, cache_path=None):
+    """Load and validate the config at path, returning (config, stamp).
+
+    With a cache_path, a config cached for the file's current stamp is
+    used without parsing or validating it again; otherwise the parsed
+    config is cached for next time. marshal only holds plain data, loads
+    several times faster than json and keeps json out of CLI startup.
+    """
+    try:
+        stamp = file_stamp(path)
+    except FileNotFoundError:
+        raise ConfigError(f"Config file not found at {path}")
+
+    if cache_path:
+        try:
+            with open(cache_path, 'rb') as f:
+                cache_format, cached_path, cached_stamp, config = marshal.load(f)
+            if (cache_format, cached_path, cached_stamp) == (CACHE_FORMAT, path, stamp):
+                return config, stamp
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    import json
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        raise ConfigError(f"Config file not found at {path}")
+    except json.JSONDecodeError:
+        raise ConfigError("Config file contains invalid JSON")
+    validate_config(config)
+
+    if cache_path:
+        write_cache(cache_path, (CACHE_FORMAT, path, stamp, config))
+    return config, stamp
+
+
+def write_cache(cache_path, entry):
+    """Atomically replace the cache file; a read-only tree just goes uncached."""
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            marshal.dump(entry, f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def cached_registry(path=DEFAULT_CONFIG_PATH):
+    """A ScaleRegistry backed by the config cache, for short-lived processes.
+
+    RS_CONFIG_CACHE names a different cache file; set it empty to turn the
+    cache off.
+    """
+    cache_path = os.environ.get('RS_CONFIG_CACHE', default_cache_path(path))
+    return ScaleRegistry(path, cache_path=cache_path or None)
+
+
+class ScaleRegistry:
+    """Loads the config file and swaps in a new snapshot when it changes.
+
+    current() never waits: it returns the latest snapshot, and the caller
+    that first notices a changed file (checked at most every check_interval
+    seconds) loads it while everyone else keeps using the old version. A
+    file that fails to load or validate is skipped, leaving the previous
+    version current and the reason in last_error. cache_path is passed to
+    read_config.
+    """
+
+    def __init__(self, path=DEFAULT_CONFIG_PATH, check_interval=1.0, clock=time.monotonic, cache_path=None):
+        self.path = path
+        self.check_interval = check_interval
+        self.clock = clock
+        self.cache_path = cache_path
+        self.last_error = None
+        self._reload_lock = threading.Lock()
+        self._on_reload = []
+        self._snapshot = self._load()
+        self._stamp = self._snapshot.stamp
+        self._next_check = clock() + check_interval
+
+    def _load(self):
+        config, stamp = read_config(self.path, self.cache_path)
+        snapshot = ConfigSnapshot(config, config_version(config), stamp)
+        for key, units in snapshot.units.ambiguous().items():
+            found = ", ".join(f"{unit} ({scale})" for scale, unit in units)
+            warnings.warn(f"{self.path}: unit name '{key}' matches {found}", ConfigWarning, stacklevel=2)
+        return snapshot
+
+    def on_reload(self, callback):
+        """Call callback(snapshot) after each successful reload."""
+        self._on_reload.append(callback)
+
+    def current(self):
+        """The latest snapshot, reloading first if the file has changed."""
+        if self.clock() >= self._next_check and self._reload_lock.acquire(blocking=False):
+            try:
+                self._next_check = self.clock() + self.check_interval
+                if self._changed():
+                    self._reload()
+            finally:
+                self._reload_lock.release()
+        return self._snapshot
+
+    def reload(self):
+        """Reload the file now; returns the snapshot that is then current."""
+        with self._reload_lock:
+            self._reload()
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def _changed(self):
+        try:
+            return file_stamp(self.path) != self._stamp
+        except OSError:
+            return False
+
+    def _reload(self):
+        try:
+            snapshot = self._load()
+        except ConfigError as e:
+            # Keep the old version and wait for the file to change again
+            # rather than re-reading a broken file on every check
+            self.last_error = str(e)
+            try:
+                self._stamp = file_stamp(self.path)
+            except OSError:
+                pass
+            return
+        self.last_error = None
+        self._stamp = snapshot.stamp
+        self._snapshot = snapshot
+        for callback in self._on_reload:
+            callback(snapshot)
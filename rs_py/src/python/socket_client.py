@@ -0,0 +1,87 @@
+# src/python/socket_client.py
+"""Client for the converter daemon (`cli.py serve --socket PATH`).
+
+Messages both ways are a 4-byte big-endian length followed by that many
+bytes of UTF-8 JSON. Requests are {"scale", "value", "unit"} plus an
+optional "id"; each gets one response, {"result": ...} or {"error": ...}
+with the id and the configVersion used, in request order. Clients may
+send many requests before reading any responses.
+
+This module only needs the standard library's socket layer, so a CLI
+client starts without loading the converter.
+"""
+import json
+import socket
+import struct
+
+HEADER = struct.Struct(">I")
+
+# Largest message either side accepts
+MAX_MESSAGE_SIZE = 1 << 20
+
+# Requests a client sends ahead of reading their responses
+PIPELINE_WINDOW = 256
+
+
+def encode_message(message):
+    body = json.dumps(message).encode()
+    return HEADER.pack(len(body)) + body
+
+
+def receive_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError("Converter daemon closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class SocketClient:
+    """A blocking connection to the converter daemon."""
+
+    def __init__(self, path, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def send(self, request):
+        self.sock.sendall(encode_message(request))
+
+    def receive(self):
+        (size,) = HEADER.unpack(receive_exactly(self.sock, HEADER.size))
+        if size > MAX_MESSAGE_SIZE:
+            raise ConnectionError("Converter daemon sent an oversized message")
+        return json.loads(receive_exactly(self.sock, size))
+
+    def convert(self, scale, value, unit):
+        """One conversion: the daemon's response dict."""
+        self.send({"scale": scale, "value": value, "unit": unit})
+        return self.receive()
+
+    def convert_many(self, requests, window=PIPELINE_WINDOW):
+        """Pipeline an iterable of request dicts, yielding responses in order.
+
+        At most window requests are outstanding, so neither side's socket
+        buffer fills up while the other is still writing.
+        """
+        outstanding = 0
+        for request in requests:
+            if outstanding == window:
+                yield self.receive()
+                outstanding -= 1
+            self.send(request)
+            outstanding += 1
+        for _ in range(outstanding):
+            yield self.receive()
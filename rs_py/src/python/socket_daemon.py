@@ -0,0 +1,131 @@
+# src/python/socket_daemon.py
+"""Converter daemon for `cli.py serve --socket PATH`.
+
+Keeps the converter and indexed config loaded and answers conversion
+requests over a Unix domain socket, using the protocol described in
+socket_client.py. Each connection is served by its own task, so many
+clients can be connected at once. SIGHUP reloads the config; SIGTERM and
+SIGINT stop the daemon and remove the socket file.
+"""
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+
+from src.python.bulk_convert import convert_record
+from src.python.socket_client import HEADER, MAX_MESSAGE_SIZE, encode_message
+
+
+class ConverterDaemon:
+    """Answers requests with the registry's current config."""
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def reload(self):
+        """Re-read the config file, keeping the old version if it is broken."""
+        snapshot = self.registry.reload()
+        if self.registry.last_error:
+            print(f"Config not reloaded: {self.registry.last_error}", file=sys.stderr)
+        else:
+            print(f"Config version {snapshot.version} loaded", file=sys.stderr)
+
+    def respond(self, body):
+        """The response to one request body."""
+        snapshot = self.registry.current()
+        try:
+            request = json.loads(body)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            return {"error": "Request must be a JSON object", "configVersion": snapshot.version}
+
+        try:
+            row = convert_record(snapshot.scales, request.get("scale"), request.get("value"), request.get("unit"),
+                                 snapshot.units)
+        except (ArithmeticError, ValueError, TypeError) as e:
+            # Answer this request with the error; the connection and the
+            # requests pipelined behind it carry on
+            row = {"error": f"Request could not be converted: {e}"}
+        response = {key: row[key] for key in ("result", "error") if key in row}
+        if "id" in request:
+            response["id"] = request["id"]
+        response["configVersion"] = snapshot.version
+        return response
+
+    async def handle(self, reader, writer):
+        """Serve one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                (size,) = HEADER.unpack(header)
+                if size > MAX_MESSAGE_SIZE:
+                    break
+                body = await reader.readexactly(size)
+                writer.write(encode_message(self.respond(body)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path, started=None):
+        """Listen on path until cancelled, then remove the socket file.
+
+        started, if given, is an asyncio.Event set once clients can connect.
+        """
+        remove_stale_socket(path)
+        server = await asyncio.start_unix_server(self.handle, path)
+        try:
+            if started is not None:
+                started.set()
+            async with server:
+                await server.serve_forever()
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def remove_stale_socket(path):
+    """Remove a socket file left by a daemon that is no longer running."""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise OSError(f"{path} exists and is not a socket")
+    except FileNotFoundError:
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.remove(path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"A converter daemon is already listening on {path}")
+
+
+def run(path, registry):
+    """Run the daemon in the foreground until SIGTERM or SIGINT."""
+    daemon = ConverterDaemon(registry)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        loop.add_signal_handler(signal.SIGHUP, daemon.reload)
+        for stop_signal in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(stop_signal, task.cancel)
+        print(f"Converter daemon listening on {path}", file=sys.stderr)
+        await daemon.serve(path)
+
+    try:
+        asyncio.run(main())
+    except asyncio.CancelledError:
+        pass
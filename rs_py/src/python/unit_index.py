@@ -0,0 +1,81 @@
+# src/python/unit_index.py
+"""Every unit of every scale, by name, plural and alias.
+
+Lets a caller give just a unit ("km", "feet", "seconds") and find its
+scale with two dict lookups, and lists completions for a prefix by
+bisecting the sorted keys.
+"""
+from bisect import bisect_left
+
+
+class AmbiguousUnitError(LookupError):
+    """A unit name that belongs to more than one scale."""
+
+    def __init__(self, unit, scale_names):
+        self.unit = unit
+        self.scale_names = scale_names
+        super().__init__(f"Ambiguous unit: {unit} is in {', '.join(scale_names)}; give a scale")
+
+
+class UnitIndex:
+    def __init__(self, scales):
+        """Index compiled scales, given as {name: CompiledScale} in config order."""
+        # Key -> ((scale name, Unit), ...) in config order. Most keys find
+        # one unit, so each unit's keys share one tuple until they do not.
+        self._keys = {}
+        self._names = {}
+        for scale_name, scale in scales.items():
+            for unit in scale.units:
+                only = ((scale_name, unit),)
+                self._add(self._names, unit.name, only)
+                for key in dict.fromkeys((unit.name, unit.plural) + unit.aliases):
+                    self._add(self._keys, key, only)
+        self.keys = sorted(self._keys)
+
+    @staticmethod
+    def _add(index, key, only):
+        entries = index.get(key)
+        if entries is None:
+            index[key] = only
+        elif only[0] not in entries:
+            index[key] = entries + only
+
+    def matches(self, unit):
+        """(scale name, Unit) pairs whose scale's find_unit accepts unit."""
+        if not isinstance(unit, str) or not unit:
+            return []
+        found = list(self._keys.get(unit, ()))
+        # As in CompiledScale.find_unit, "meterss" still finds meter
+        for entry in self._names.get(unit.rstrip('s'), ()):
+            if entry not in found:
+                found.append(entry)
+        return found
+
+    def scale_for(self, unit):
+        """Name of the one scale that has unit, or None if none has it.
+
+        Raises AmbiguousUnitError if several scales have it.
+        """
+        scale_names = list(dict.fromkeys(scale_name for scale_name, _ in self.matches(unit)))
+        if len(scale_names) > 1:
+            raise AmbiguousUnitError(unit, scale_names)
+        return scale_names[0] if scale_names else None
+
+    def ambiguous(self):
+        """{key: [(scale name, unit name)]} for keys that find more than one unit."""
+        report = {}
+        for key in self.keys:
+            found = self.matches(key)
+            if len(found) > 1:
+                report[key] = [(scale_name, unit.name) for scale_name, unit in found]
+        return report
+
+    def complete(self, prefix, scale_name=None):
+        """Sorted keys that start with prefix, only those of one scale if given."""
+        start = bisect_left(self.keys, prefix)
+        end = start
+        while end < len(self.keys) and self.keys[end].startswith(prefix):
+            end += 1
+        if scale_name is None:
+            return self.keys[start:end]
+        return [key for key in self.keys[start:end] if any(s == scale_name for s, _ in self._keys[key])]
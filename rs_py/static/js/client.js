@@ -1,8 +1,14 @@
 // static/js/client.js
+import { convert as convertLocally, isError } from './relative_sizes.js';
+
 document.addEventListener('DOMContentLoaded', async function() {
     // Fetch configuration from backend
     const configResponse = await fetch('./api/config');
     const config = await configResponse.json();
+    const configVersion = configResponse.headers.get('X-Config-Version');
+    
+    // Unit-switch tables by scale name; units are scanned until one arrives
+    const breakpoints = {};
     
     // Elements
     const elements = {
@@ -33,11 +39,18 @@ document.addEventListener('DOMContentLoaded', async function() {
     state.currentScale = initialScale.name;
     updateUnitDropdown(initialScale);
     state.currentUnit = initialScale.defaultUnit;
+    loadBreakpoints(initialScale.name);
     
     // Set initial values
     elements.input_value.value = "1";
     elements.input_slider.value = "1";
     
+    // Streaming channel; null whenever conversions should go over HTTP
+    let channel = null;
+    let sentState = {};
+    let awaitingServer = false;
+    openChannel();
+    
     // Perform initial conversion
     await performConversion();
     
@@ -67,10 +80,93 @@ document.addEventListener('DOMContentLoaded', async function() {
         return config.scales.find(scale => scale.name === scaleName);
     }
     
+    function loadBreakpoints(scaleName) {
+        if (scaleName in breakpoints) {
+            return;
+        }
+        breakpoints[scaleName] = null;
+        fetch(`./api/breakpoints/${encodeURIComponent(scaleName)}`)
+            .then(response => {
+                // Tables from a newer config would not match our units
+                const current = response.headers.get('X-Config-Version') === configVersion;
+                return response.ok && current ? response.json() : null;
+            })
+            .then(data => {
+                if (data) {
+                    breakpoints[scaleName] = data.breakpoints;
+                }
+            })
+            .catch(() => {});
+    }
+    
+    function openChannel() {
+        if (typeof WebSocket === 'undefined') {
+            return;
+        }
+        const url = new URL('./ws/convert', window.location.href);
+        url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:';
+        
+        let socket;
+        try {
+            socket = new WebSocket(url);
+        } catch (error) {
+            return;
+        }
+        socket.addEventListener('open', () => {
+            channel = socket;
+            sentState = {};
+        });
+        // The server only converts the latest state, so results arrive in order;
+        // a late one is dropped if the browser has converted since
+        socket.addEventListener('message', event => {
+            if (awaitingServer) {
+                showResult(JSON.parse(event.data));
+            }
+        });
+        // Fall back to HTTP; an unavailable endpoint lands here too
+        socket.addEventListener('close', () => {
+            channel = null;
+        });
+    }
+    
+    function showResult(data) {
+        if (data.result) {
+            elements.output_info.textContent = data.result;
+        } else if (data.error) {
+            elements.output_info.textContent = data.error;
+        }
+    }
+    
+    function sendState() {
+        // The server keeps state per connection: only send what changed
+        const delta = {};
+        Object.keys(state).forEach(key => {
+            if (state[key] !== sentState[key]) {
+                delta[key] = state[key];
+            }
+        });
+        sentState = { ...state };
+        channel.send(JSON.stringify(delta));
+    }
+    
     async function performConversion() {
         const value = Number(elements.input_value.value) || 1;
         state.inputValue = value;
         
+        // Convert in the browser; the server only answers what we cannot
+        const scale = config.scales.find(s => s.name === state.currentScale);
+        const local = convertLocally(value, state.currentUnit, scale, breakpoints[scale.name] || undefined);
+        awaitingServer = isError(local);
+        if (!awaitingServer) {
+            elements.output_info.textContent = local;
+            return;
+        }
+        
+        if (channel && channel.readyState === WebSocket.OPEN) {
+            sendState();
+            return;
+        }
+        
         try {
             const response = await fetch('./api/convert', {
                 method: 'POST',
@@ -80,12 +176,7 @@ document.addEventListener('DOMContentLoaded', async function() {
                 body: JSON.stringify(state),
             });
             
-            const data = await response.json();
-            if (data.result) {
-                elements.output_info.textContent = data.result;
-            } else if (data.error) {
-                elements.output_info.textContent = data.error;
-            }
+            showResult(await response.json());
         } catch (error) {
             elements.output_info.textContent = 'Error: ' + error.message;
         }
@@ -107,6 +198,7 @@ document.addEventListener('DOMContentLoaded', async function() {
         const newScale = getCurrentScale();
         state.currentScale = newScale.name;
         updateUnitDropdown(newScale);
+        loadBreakpoints(newScale.name);
         elements.input_value.value = "1";
         elements.input_slider.value = "1";
         state.inputValue = 1;
@@ -0,0 +1,214 @@
+// static/js/relative_sizes.js
+// Browser port of src/python/relative_sizes.py so the page can convert
+// without a server round trip. It must give exactly the strings the Python
+// version gives: tests/golden/convert_vectors.json holds the shared cases.
+
+const THRESHOLD = 0.95;
+
+// Decimal strings Python's float() accepts (not nan, inf or underscores)
+const NUMBER_PATTERN = /^\s*[+-]?(\d+\.?\d*|\.\d+)(e[+-]?\d+)?\s*$/i;
+
+export function isValidNumber(value) {
+    if (typeof value === 'number') {
+        return Number.isFinite(value);
+    }
+    return typeof value === 'string' && NUMBER_PATTERN.test(value);
+}
+
+export function isValidScale(scale) {
+    return scale !== null &&
+        typeof scale === 'object' &&
+        !Array.isArray(scale) &&
+        'units' in scale &&
+        'defaultUnit' in scale &&
+        Array.isArray(scale.units) &&
+        scale.units.length > 0 &&
+        scale.units.every(unit => unit !== null && typeof unit === 'object' && !Array.isArray(unit));
+}
+
+// Rounding constants shared with src/python/number_format.py
+const TIE_ULPS = 1;
+const MAX_EXACT_INTEGER = 2 ** 52;
+
+const floatView = new DataView(new ArrayBuffer(8));
+
+// Distance from |value| to the next float up, like Python's math.ulp
+function ulp(value) {
+    floatView.setFloat64(0, Math.abs(value));
+    floatView.setBigUint64(0, floatView.getBigUint64(0) + 1n);
+    return floatView.getFloat64(0) - Math.abs(value);
+}
+
+// value * 10^d rounded half-up with exact BigInt arithmetic; with tieUlps,
+// a value less than that many ulps below a half also rounds up
+function exactScaled(value, decimalPlaces, tieUlps = 0) {
+    floatView.setFloat64(0, value);
+    const bits = floatView.getBigUint64(0);
+    const exponent = Number((bits >> 52n) & 0x7ffn);
+    let mantissa = bits & ((1n << 52n) - 1n);
+    if (exponent !== 0) {
+        mantissa |= 1n << 52n;
+    }
+    // value is mantissa * 2^shift, and its ulp is 2^shift
+    const shift = (exponent === 0 ? 1 : exponent) - 1075;
+
+    const multiplier = 10n ** BigInt(decimalPlaces);
+    let numerator = mantissa * multiplier;
+    let denominator = 1n;
+    if (shift >= 0) {
+        numerator <<= BigInt(shift);
+    } else {
+        denominator <<= BigInt(-shift);
+    }
+    let quotient = numerator / denominator;
+    const remainder = numerator % denominator;
+    if (2n * remainder >= denominator) {
+        quotient += 1n;
+    } else if (tieUlps && remainder && denominator - 2n * remainder < 2n * BigInt(tieUlps) * multiplier) {
+        // The half is (d - 2r) / 2d above, against a window of tieUlps * multiplier / d
+        quotient += 1n;
+    }
+    return bits >> 63n ? -quotient : quotient;
+}
+
+// value * 10^d rounded half-up; values just below a half count as halves
+function scaled(value, decimalPlaces) {
+    const multiplier = 10 ** decimalPlaces;
+    const scaledValue = value * multiplier;
+    if (!(Math.abs(scaledValue) < MAX_EXACT_INTEGER)) {
+        return exactScaled(value, decimalPlaces);
+    }
+    let whole = Math.trunc(scaledValue);
+    // Rounding scaledValue may be off by up to window, so values that close
+    // to the window are decided exactly
+    const belowHalf = 0.5 - Math.abs(scaledValue - whole);
+    const window = TIE_ULPS * ulp(value) * multiplier;
+    if (belowHalf < 0) {
+        whole += scaledValue > 0 ? 1 : -1;
+    } else if (belowHalf <= 2 * window) {
+        return Number(exactScaled(value, decimalPlaces, TIE_ULPS));
+    }
+    return whole;
+}
+
+// Put the decimal point back into an integer from scaled()
+function text(scaledValue, decimalPlaces) {
+    const negative = scaledValue < 0;
+    const digits = String(negative ? -scaledValue : scaledValue);
+    if (decimalPlaces === 0) {
+        return (negative ? '-' : '') + digits;
+    }
+    const padded = digits.padStart(decimalPlaces + 1, '0');
+    return (negative ? '-' : '') + padded.slice(0, -decimalPlaces) + '.' + padded.slice(-decimalPlaces);
+}
+
+export function formatNumber(value, decimalPlaces) {
+    if (Number.isInteger(value)) {
+        const digits = Math.abs(value) < MAX_EXACT_INTEGER ? String(value + 0) : BigInt(value).toString();
+        return decimalPlaces ? digits + '.' + '0'.repeat(decimalPlaces) : digits;
+    }
+    return text(scaled(value, decimalPlaces), decimalPlaces);
+}
+
+export function compileScale(scale) {
+    const units = scale.units;
+    const descending = [...units].sort((a, b) => b.conversionFactor - a.conversionFactor);
+    const minFactor = Math.min(...units.map(u => u.conversionFactor));
+    const names = new Map();
+    const plurals = new Map();
+    const aliases = new Map();
+    units.forEach(u => {
+        if (!names.has(u.name)) names.set(u.name, u);
+        if ('plural' in u && !plurals.has(u.plural)) plurals.set(u.plural, u);
+        if (Array.isArray(u.aliases)) {
+            u.aliases.forEach(alias => {
+                if (typeof alias === 'string' && alias && !aliases.has(alias)) aliases.set(alias, u);
+            });
+        }
+    });
+
+    function findUnit(unit) {
+        return names.get(unit) || names.get(unit.replace(/s+$/, '')) ||
+            plurals.get(unit) || aliases.get(unit) || null;
+    }
+
+    function fallbackFor(sourceUnit) {
+        if (sourceUnit.conversionFactor > minFactor) {
+            const smaller = descending.find(u => u.conversionFactor < sourceUnit.conversionFactor);
+            if (smaller) return smaller;
+        }
+        return sourceUnit;
+    }
+
+    function selectTarget(sourceUnit, baseValue) {
+        if (Math.abs(baseValue) < sourceUnit.conversionFactor * THRESHOLD) {
+            return sourceUnit;
+        }
+        const fitting = descending.find(u => baseValue / u.conversionFactor >= THRESHOLD);
+        return fitting || fallbackFor(sourceUnit);
+    }
+
+    return { findUnit, selectTarget };
+}
+
+// Target for baseValue from one unit's table in /api/breakpoints/<scale>
+function tableTarget(units, table, baseValue) {
+    const { bounds, targets } = table;
+    let lo = 0;
+    let hi = bounds.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (baseValue < bounds[mid]) {
+            hi = mid;
+        } else {
+            lo = mid + 1;
+        }
+    }
+    return units[targets[lo]];
+}
+
+const compiled = new WeakMap();
+
+// breakpoints, if given, is the "breakpoints" list /api/breakpoints/<scale>
+// returned for this scale; without it the units are scanned as in Python
+export function convert(value, unit, scale, breakpoints) {
+    if (!isValidNumber(value)) {
+        return 'Please provide a valid number';
+    }
+    if (typeof unit !== 'string' || !unit) {
+        return 'Please provide a valid unit';
+    }
+    if (!isValidScale(scale)) {
+        return 'Invalid scale configuration';
+    }
+    if (!compiled.has(scale)) {
+        compiled.set(scale, compileScale(scale));
+    }
+    const { findUnit, selectTarget } = compiled.get(scale);
+
+    const sourceUnit = findUnit(unit);
+    if (!sourceUnit) {
+        return `Unknown unit: ${unit}`;
+    }
+
+    const number = typeof value === 'number' ? value : Number(value);
+    const baseValue = number * sourceUnit.conversionFactor;
+    const table = breakpoints && breakpoints[scale.units.indexOf(sourceUnit)];
+    const targetUnit = table ? tableTarget(scale.units, table, baseValue) : selectTarget(sourceUnit, baseValue);
+    const targetValue = baseValue / targetUnit.conversionFactor;
+
+    const sourceStr = formatNumber(number, sourceUnit.decimalPlaces ?? 0);
+    const sourceName = Math.abs(number) !== 1 ? sourceUnit.plural : sourceUnit.name;
+
+    const targetStr = formatNumber(targetValue, targetUnit.decimalPlaces ?? 0);
+    const targetName = Math.abs(targetValue) !== 1 ? targetUnit.plural : targetUnit.name;
+
+    return `${sourceStr} ${sourceName} is ${targetStr} ${targetName}`;
+}
+
+// Results that start like this are problems with the input, not conversions
+const ERROR_PREFIXES = ['Please provide', 'Invalid scale', 'Unknown unit', 'Ambiguous unit'];
+
+export function isError(result) {
+    return ERROR_PREFIXES.some(prefix => result.startsWith(prefix));
+}
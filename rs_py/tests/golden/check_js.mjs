@@ -0,0 +1,13 @@
+// tests/golden/check_js.mjs
+// Prints, as JSON, what static/js/relative_sizes.js gives for every golden
+// vector. Used by tests/test_golden_vectors.py; run from rs_py. An optional
+// argument names a JSON file of breakpoint tables by scale to convert with.
+import { readFileSync } from 'node:fs';
+
+const source = readFileSync(new URL('../../static/js/relative_sizes.js', import.meta.url));
+const { convert } = await import('data:text/javascript;base64,' + source.toString('base64'));
+
+const { scales, vectors } = JSON.parse(readFileSync(new URL('./convert_vectors.json', import.meta.url)));
+const breakpoints = process.argv[2] ? JSON.parse(readFileSync(process.argv[2])) : {};
+const results = vectors.map(v => convert(v.value, v.unit, scales[v.scale], breakpoints[v.scale]));
+process.stdout.write(JSON.stringify(results));
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# tests/golden/make_convert_vectors.py
+"""Regenerate convert_vectors.json from the Python RelativeSizes.convert.
+
+The vectors are the shared contract for the Python engine and the browser
+port in static/js/relative_sizes.js. Run from rs_py after changing either:
+
+    python -m tests.golden.make_convert_vectors
+"""
+import json
+import os
+import random
+
+from src.python.relative_sizes import relative_sizes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+VECTORS_PATH = os.path.join(HERE, 'convert_vectors.json')
+
+EXTRA_SCALES = [
+    {
+        "name": "simple",
+        "defaultUnit": "one",
+        "units": [
+            {"name": "thousandth", "plural": "thousandths", "conversionFactor": 0.001, "decimalPlaces": 0},
+            {"name": "one", "plural": "ones", "conversionFactor": 1, "decimalPlaces": 1},
+            {"name": "hundred", "plural": "hundreds", "conversionFactor": 100, "decimalPlaces": 2}
+        ]
+    },
+    {
+        "name": "irregular",
+        "defaultUnit": "foot",
+        "units": [
+            {"name": "inch", "plural": "inches", "conversionFactor": 0.0254},
+            {"name": "foot", "plural": "feet", "conversionFactor": 0.3048, "decimalPlaces": 2},
+            {"name": "yard", "plural": "yards", "conversionFactor": 0.9144, "decimalPlaces": 3}
+        ]
+    },
+    {
+        # Singular names ending in s, and aliases
+        "name": "drinks",
+        "defaultUnit": "glass",
+        "units": [
+            {"name": "glass", "plural": "glasses", "aliases": ["gl"], "conversionFactor": 1},
+            {"name": "bus", "plural": "buses", "conversionFactor": 50, "decimalPlaces": 1}
+        ]
+    }
+]
+
+EDGE_VALUES = [
+    0, 1, -1, 0.5, -0.5, 0.04, -0.04, 0.95, 9.84, 9.85, 9.86, 59, 60, 949, 950,
+    3.001, 1e3, 212000, -100, -2000, 1e15, 1e21, 1e25, -1e25, 1e-9, 2 ** 53 + 1,
+    # A half that value * 10 rounds to even, above 2 ** 52
+    500000000000000.25, -500000000000000.25,
+    # Not a half, but within 2 ** -10 of one once scaled
+    208504064229.94995, -208504064229.94995,
+    "12", " 7.5 ", "1e3", "-3",
+]
+
+ALIAS_VALUES = [1, -1, 60, 950, 1e6]
+
+ERROR_CASES = [
+    ("not_a_number", "seconds", "time"),
+    (None, "seconds", "time"),
+    ("", "seconds", "time"),
+    (10, "", "time"),
+    (10, None, "time"),
+    (10, "fortnights", "time"),
+]
+
+
+def generate(seed=20250604):
+    rng = random.Random(seed)
+    with open(os.path.join(ROOT, 'src', 'config', 'config.json')) as f:
+        scales = json.load(f)["scales"] + EXTRA_SCALES
+    by_name = {s["name"]: s for s in scales}
+
+    cases = []
+    for scale in scales:
+        for unit in scale["units"]:
+            values = EDGE_VALUES + [rng.randint(-100, 100) for _ in range(10)]
+            values += [round(rng.uniform(0, 1000), rng.randint(0, 4)) for _ in range(10)]
+            values += [10 ** rng.uniform(-4, 10) for _ in range(10)]
+            for value in values:
+                for unit_name in (unit["name"], unit["plural"]):
+                    cases.append((value, unit_name, scale["name"]))
+            for alias in unit.get("aliases", []):
+                cases += [(value, alias, scale["name"]) for value in ALIAS_VALUES]
+    cases += ERROR_CASES
+
+    vectors = [
+        {"value": value, "unit": unit, "scale": scale_name,
+         "expected": relative_sizes.convert(value, unit, by_name[scale_name])}
+        for value, unit, scale_name in cases
+    ]
+    return {"scales": by_name, "vectors": vectors}
+
+
+if __name__ == "__main__":
+    with open(VECTORS_PATH, 'w') as f:
+        json.dump(generate(), f, indent=1)
+        f.write("\n")
+    print(f"Wrote {VECTORS_PATH}")
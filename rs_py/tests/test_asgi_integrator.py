@@ -0,0 +1,161 @@
+# test_asgi_integrator.py
+import asyncio
+import json
+import pytest
+from src.python.asgi_integrator import create_asgi_app
+from src.python.integrator import app as wsgi_app, registry
+from src.python.metrics import CONTENT_TYPE
+
+def call(app, method, path, body=None):
+    """Drive an ASGI app through one HTTP request, returning (status, json)."""
+    status, _, content = call_raw(app, method, path, body)
+    return status, json.loads(content)
+
+def call_raw(app, method, path, body=None):
+    """Drive an ASGI app through one HTTP request, returning (status, headers, body bytes)."""
+    payload = b"" if body is None else json.dumps(body).encode()
+    scope = {"type": "http", "method": method, "path": path, "headers": []}
+    received = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return received.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], dict(sent[0]["headers"]), b"".join(m.get("body", b"") for m in sent[1:])
+
+@pytest.fixture
+def asgi_app():
+    return create_asgi_app()
+
+@pytest.fixture
+def wsgi_client():
+    return wsgi_app.test_client()
+
+class TestRoutesMatchWSGI:
+    @pytest.mark.parametrize("path", ["/api/config", "/api/scales", "/api/units/time", "/api/units/nonexistent",
+                                      "/api/breakpoints/time", "/api/breakpoints/nonexistent"])
+    def test_get_routes(self, asgi_app, wsgi_client, path):
+        expected = wsgi_client.get(path)
+        status, body = call(asgi_app, "GET", path)
+        assert status == expected.status_code
+        assert body == expected.get_json()
+
+    @pytest.mark.parametrize("path, body", [
+        ("/api/convert", {"inputValue": 90000, "currentUnit": "seconds", "currentScale": "time"}),
+        ("/api/convert", {"inputValue": 60}),
+        ("/api/convert", [1]),
+        ("/api/convert", {"inputValue": 60, "currentUnit": "seconds", "currentScale": ["time"]}),
+        ("/api/convert/all", {"inputValue": 90000, "currentUnit": "seconds"}),
+        ("/api/convert/all", {"inputValues": [1, 60], "currentUnit": "seconds", "currentScale": "time"}),
+        ("/api/convert/all", {"inputValue": 1, "currentUnit": "furlongs"}),
+        ("/api/convert/batch", {"inputValues": [1, 60, "x"], "currentUnit": "seconds", "currentScale": "time"}),
+        ("/api/convert/batch", {"items": "not_a_list"}),
+    ])
+    def test_post_routes(self, asgi_app, wsgi_client, path, body):
+        expected = wsgi_client.post(path, json=body)
+        status, result = call(asgi_app, "POST", path, body)
+        assert status == expected.status_code
+        assert result == expected.get_json()
+
+class TestPage:
+    @pytest.mark.parametrize("path", ["/", "/static/js/client.js", "/static/css/styles.css", "/css/styles.css"])
+    def test_serves_what_flask_serves(self, asgi_app, wsgi_client, path):
+        expected = wsgi_client.get(path)
+        status, headers, body = call_raw(asgi_app, "GET", path)
+        assert (status, body) == (200, expected.data)
+        assert headers[b"content-type"].split(b";")[0] == expected.content_type.split(";")[0].encode()
+
+    @pytest.mark.parametrize("path, content_type", [
+        ("/metrics", CONTENT_TYPE), ("/api/scales", "application/json"), ("/api/nothing", "application/json"),
+    ])
+    def test_each_route_names_its_content_type(self, asgi_app, path, content_type):
+        assert call_raw(asgi_app, "GET", path)[1][b"content-type"] == content_type.encode()
+
+    @pytest.mark.parametrize("path", ["/static/nothing.js", "/static/../src/python/main.py", "/css/../../asgi.py"])
+    def test_missing_and_outside_files_are_not_found(self, asgi_app, path):
+        assert call_raw(asgi_app, "GET", path)[0] == 404
+
+class TestConfigVersion:
+    def test_responses_carry_config_version(self, asgi_app):
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(asgi_app({"type": "http", "method": "GET", "path": "/api/nothing", "headers": []}, receive, send))
+        headers = dict(sent[0]["headers"])
+        assert headers[b"x-config-version"] == str(registry.version).encode()
+
+class TestErrors:
+    def test_unknown_route(self, asgi_app):
+        assert call(asgi_app, "GET", "/api/nothing")[0] == 404
+
+    def test_wrong_method(self, asgi_app):
+        assert call(asgi_app, "GET", "/api/convert")[0] == 405
+
+    def test_missing_body(self, asgi_app):
+        assert call(asgi_app, "POST", "/api/convert")[0] == 400
+
+def stream(app, messages, path="/ws/convert"):
+    """Drive a WebSocket session: queue all messages, then disconnect once
+    the app has answered or gone idle. Returns everything the app sent."""
+    async def session():
+        incoming = asyncio.Queue()
+        for message in [{"type": "websocket.connect"}] + messages:
+            incoming.put_nowait(message)
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        task = asyncio.ensure_future(app({"type": "websocket", "path": path}, incoming.get, send))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(task, 1)
+        return sent
+
+    return asyncio.run(session())
+
+def text(delta):
+    return {"type": "websocket.receive", "text": json.dumps(delta)}
+
+class TestConvertStream:
+    def test_deltas_are_applied_to_session_state(self, asgi_app):
+        sent = stream(asgi_app, [text({"currentScale": "distance", "currentUnit": "meters", "inputValue": 5000})])
+        assert sent[0] == {"type": "websocket.accept"}
+        assert json.loads(sent[1]["text"]) == {
+            "result": "5000.0 meters is 5.0 kilometers", "configVersion": registry.version
+        }
+
+    def test_queued_deltas_are_coalesced(self, asgi_app):
+        sent = stream(asgi_app, [
+            text({"inputValue": 1, "seq": 1}),
+            text({"currentUnit": "minutes", "seq": 2}),
+            text({"inputValue": 120, "seq": 3}),
+        ])
+        results = [json.loads(m["text"]) for m in sent if m["type"] == "websocket.send"]
+        assert results == [{"result": "120.0 minutes is 2.0 hours", "seq": 3, "configVersion": registry.version}]
+
+    def test_failed_conversion_is_an_error_frame(self, asgi_app):
+        sent = stream(asgi_app, [
+            text({"currentScale": "time", "currentUnit": "seconds", "inputValue": float("inf"), "seq": 1}),
+        ])
+        [error] = [json.loads(m["text"]) for m in sent if m["type"] == "websocket.send"]
+        assert error["error"].startswith("Could not convert") and error["seq"] == 1
+        assert not any(m["type"] == "websocket.close" for m in sent)
+
+    def test_bad_messages_are_ignored(self, asgi_app):
+        sent = stream(asgi_app, [{"type": "websocket.receive", "text": "not json"}])
+        assert sent == [{"type": "websocket.accept"}]
+
+    def test_unknown_path_is_closed(self, asgi_app):
+        sent = stream(asgi_app, [], path="/ws/nothing")
+        assert sent[0]["type"] == "websocket.close"
@@ -0,0 +1,75 @@
+# test_benchmarks.py
+import json
+import pytest
+from benchmarks import api, memory, micro
+from benchmarks.__main__ import main
+from benchmarks.harness import QUICK, compare, load, result, save
+
+def document(**medians):
+    return {"meta": {}, "results": [result("micro", name, [median]) for name, median in medians.items()]}
+
+class TestCompare:
+    def test_statuses(self):
+        rows = compare(
+            document(same=10.0, slower=10.0, faster=10.0, gone=1.0),
+            document(same=10.5, slower=12.0, faster=5.0, added=1.0),
+            threshold=0.10,
+        )
+        statuses = {key[1]: status for key, *_, status in rows}
+        assert statuses == {"same": "ok", "slower": "regression", "faster": "improvement",
+                            "gone": "missing", "added": "new"}
+
+    def test_ratio(self):
+        [(key, old, new, ratio, status)] = compare(document(a=4.0), document(a=5.0))
+        assert (key, old, new, ratio) == (("micro", "a"), 4.0, 5.0, 1.25)
+
+class TestSuites:
+    @pytest.mark.parametrize("suite", [micro, api, memory])
+    def test_results_have_the_documented_fields(self, suite):
+        results = suite.run(QUICK)
+        assert results
+        for r in results:
+            assert set(r) == {"suite", "name", "unit", "median", "best", "stdev", "number", "repeat"}
+            assert r["median"] > 0
+
+    def test_api_suite_restores_result_cache(self):
+        from src.python.relative_sizes import relative_sizes
+        cache = relative_sizes.cache
+        api.run(QUICK)
+        assert relative_sizes.cache is cache
+
+class TestCommandLine:
+    def test_run_saves_json(self, tmp_path):
+        path = tmp_path / "results.json"
+        assert main(["run", "--quick", "--suite", "micro", "-o", str(path)]) == 0
+        saved = load(path)
+        assert saved["meta"]["python"]
+        assert {r["suite"] for r in saved["results"]} == {"micro"}
+
+    def test_compare_exit_status(self, tmp_path):
+        baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+        baseline.write_text(json.dumps(document(a=1.0)))
+        current.write_text(json.dumps(document(a=1.05)))
+        assert main(["compare", str(baseline), str(current)]) == 0
+        current.write_text(json.dumps(document(a=2.0)))
+        assert main(["compare", str(baseline), str(current)]) == 1
+        assert main(["compare", "--threshold", "1.5", str(baseline), str(current)]) == 0
+
+    def test_compare_without_a_baseline_says_how_to_record_one(self, tmp_path, monkeypatch, capsys):
+        import benchmarks.__main__ as cli
+        current = tmp_path / "current.json"
+        current.write_text(json.dumps(document(a=1.0)))
+        monkeypatch.setattr(cli, "DEFAULT_BASELINE", str(tmp_path / "baseline.json"))
+        with pytest.raises(SystemExit) as exit_info:
+            main(["compare", str(current)])
+        assert exit_info.value.code == 2
+        assert "--save-baseline" in capsys.readouterr().err
+        with pytest.raises(SystemExit):
+            main(["compare", str(current), str(tmp_path / "missing.json")])
+        assert "no results at" in capsys.readouterr().err
+
+    def test_save_round_trip(self, tmp_path):
+        path = tmp_path / "r.json"
+        results = document(a=1.0)["results"]
+        save(results, path)
+        assert load(path)["results"] == results
@@ -0,0 +1,122 @@
+# test_bulk_convert.py
+import io
+import json
+import pytest
+from src.python.bulk_convert import convert_lines, convert_stream, parse_record
+from src.python.relative_sizes import relative_sizes
+from src.python.scale_registry import ScaleRegistry
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return ScaleRegistry().current()
+
+def jsonl(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+class TestParseRecord:
+    @pytest.mark.parametrize("line, expected", [
+        ("time,60,seconds", ("time", "60", "seconds")),
+        (" time , 60 , seconds ", ("time", "60", "seconds")),
+        ('{"scale": "time", "value": 60, "unit": "seconds"}', ("time", 60, "seconds")),
+    ])
+    def test_formats_are_detected(self, line, expected):
+        assert parse_record(line) == expected
+
+    @pytest.mark.parametrize("line, input_format", [
+        ("time,60", "auto"),
+        ("[1, 2, 3]", "jsonl"),
+        ("time,60,seconds", "jsonl"),
+    ])
+    def test_malformed_records(self, line, input_format):
+        with pytest.raises(ValueError):
+            parse_record(line, input_format)
+
+class TestConvertLines:
+    def test_results_match_convert(self, snapshot):
+        rows = jsonl(convert_lines(["time,90000,seconds\n"], snapshot.scales))
+        expected = relative_sizes.convert(90000.0, "seconds", snapshot.scales["time"])
+        assert rows == [{"scale": "time", "value": "90000", "unit": "seconds", "result": expected}]
+
+    @pytest.mark.parametrize("line, error", [
+        ("nope,1,seconds", "Scale 'nope' not found"),
+        ("time,abc,seconds", "'abc' is not a valid number"),
+        ('{"scale": "time", "value": true, "unit": "seconds"}', "'True' is not a valid number"),
+        ("time,5,parsecs", "Unknown unit: parsecs"),
+        ("time,5", "Expected scale,value,unit: time,5"),
+        ("time,inf,seconds", "'inf' cannot be converted"),
+        ("time,nan,seconds", "'nan' cannot be converted"),
+        ("time,1e308,years", "'1e308' cannot be converted"),
+    ])
+    def test_errors_are_rows(self, snapshot, line, error):
+        [row] = jsonl(convert_lines([line], snapshot.scales))
+        assert row["error"] == error
+        assert "result" not in row
+
+    def test_records_without_a_scale_use_the_unit_index(self, snapshot):
+        line = '{"value": 60, "unit": "seconds"}'
+        [row] = jsonl(convert_lines([line], snapshot.scales, units=snapshot.units))
+        assert (row["scale"], row["result"]) == ("time", "60 seconds is 1.0 minute")
+
+    def test_blank_lines_and_header_are_skipped(self, snapshot):
+        output = convert_lines(["scale,value,unit\n", "\n", "time,60,seconds\n"], snapshot.scales)
+        assert len(output.splitlines()) == 1
+
+    def test_csv_output(self, snapshot):
+        output = convert_lines(["time,60,seconds", "nope,1,x"], snapshot.scales, output_format="csv")
+        assert output == "time,60,seconds,60 seconds is 1.0 minute,\nnope,1,x,,Scale 'nope' not found\n"
+        assert "\x1b" not in output
+
+class TestConvertStream:
+    LINES = [f"time,{value},seconds\n" for value in range(1, 2001)]
+
+    def test_csv_output_has_header(self, snapshot):
+        out = io.StringIO()
+        convert_stream(["time,60,seconds"], out, snapshot, output_format="csv")
+        assert out.getvalue().splitlines()[0] == "scale,value,unit,result,error"
+
+    def test_output_is_written_before_input_is_exhausted(self, snapshot):
+        out = io.StringIO()
+        consumed = []
+
+        def lines():
+            for line in self.LINES:
+                if len(consumed) == len(self.LINES) - 1:
+                    # By now earlier chunks must already be written out
+                    assert out.getvalue()
+                consumed.append(line)
+                yield line
+
+        convert_stream(lines(), out, snapshot, chunk_size=100)
+        assert len(out.getvalue().splitlines()) == len(self.LINES)
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_bad_values_do_not_stop_the_stream(self, snapshot, jobs):
+        lines = ["time,60,seconds", "time,inf,seconds", '{"value": 120, "unit": "seconds"}']
+        out = io.StringIO()
+        convert_stream(lines, out, snapshot, jobs=jobs, chunk_size=3)
+        rows = jsonl(out.getvalue())
+        assert [row.get("result") for row in rows] == [
+            "60 seconds is 1.0 minute", None, "120 seconds is 2.0 minutes"
+        ]
+        assert rows[1]["error"] == "'inf' cannot be converted"
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_flush_after_every_record(self, snapshot, jobs):
+        class Recorder(io.StringIO):
+            def __init__(self):
+                super().__init__()
+                self.flushed = []
+
+            def flush(self):
+                self.flushed.append(len(self.getvalue().splitlines()))
+
+        out = Recorder()
+        convert_stream(self.LINES[:10], out, snapshot, jobs=jobs, flush=True)
+        # Including the records drained once input runs out
+        assert out.flushed[-10:] == list(range(1, 11))
+
+    def test_process_pool_keeps_order(self, snapshot):
+        sequential, parallel = io.StringIO(), io.StringIO()
+        convert_stream(self.LINES, sequential, snapshot)
+        convert_stream(iter(self.LINES), parallel, snapshot, jobs=2, chunk_size=100)
+        assert parallel.getvalue() == sequential.getvalue()
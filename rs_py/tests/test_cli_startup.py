@@ -0,0 +1,62 @@
+# test_cli_startup.py
+"""Startup benchmark for cli.py, from `python -X importtime`.
+
+Each command must import only what it needs, and everything it imports
+must fit within an import-time budget (RS_STARTUP_BUDGET_MS overrides it
+on slow machines). Failures print the slowest imports.
+"""
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_BUDGET_MS = float(os.environ.get("RS_STARTUP_BUDGET_MS", 100))
+
+# Modules that only some commands need
+HEAVY = {"numpy", "multiprocessing", "cmd", "json", "csv", "colorama",
+         "src.python.cli_commands", "src.python.bulk_convert", "src.python.cli_shell"}
+HUMAN = {"colorama", "src.python.cli_commands"}
+
+def import_times(args, env):
+    """{module: (self_us, cumulative_us)} for one run of cli.py."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "cli.py", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def report(times, count=10):
+    slowest = sorted(times.items(), key=lambda item: -item[1][1])[:count]
+    return "\n".join(f"{cumulative / 1000:8.1f} ms  {name}" for name, (_, cumulative) in slowest)
+
+@pytest.fixture
+def env(tmp_path):
+    env = dict(os.environ, RS_CONFIG_CACHE=str(tmp_path / "config.marshal"))
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+@pytest.mark.parametrize("args, allowed", [
+    (["scales"], HUMAN),
+    (["units", "time"], HUMAN),
+    (["convert", "time", "60", "seconds"], HUMAN),
+    (["convert", "60", "s"], HUMAN),
+    (["stream", os.devnull], {"json", "csv", "src.python.bulk_convert"}),
+])
+def test_commands_import_only_what_they_need(env, args, allowed):
+    import_times(["scales"], env)  # warm the config cache
+    times = import_times(args, env)
+    assert HEAVY & set(times) <= allowed, report(times)
+
+@pytest.mark.parametrize("args", [["scales"], ["convert", "time", "60", "seconds"]])
+def test_import_time_budget(env, args):
+    import_times(["scales"], env)
+    times = import_times(args, env)
+    total_ms = sum(self_us for self_us, _ in times.values()) / 1000
+    assert total_ms < STARTUP_BUDGET_MS, f"{total_ms:.1f} ms of imports:\n{report(times)}"
@@ -22,3 +22,83 @@ def test_festival_western(festival_date):
 def test_festival_bad_method():
 	with pytest.raises(ValueError):
 		festival(1975, 4)
+
+
+def anonymous_gregorian(year):
+	# The "Anonymous Gregorian algorithm" (Meeus/Jones/Butcher), worked separately
+	a, b, c = year % 19, year // 100, year % 100
+	d, e = b // 4, b % 4
+	g = (8 * b + 13) // 25
+	h = (19 * a + b - d - g + 15) % 30
+	i, k = c // 4, c % 4
+	l = (32 + 2 * e + 2 * i - h - k) % 7
+	m = (a + 11 * h + 19 * l) // 433
+	return date(year, (h + l - 7 * m + 90) // 25, (h + l - 7 * m + 33 * ((h + l - 7 * m + 90) // 25) + 19) % 32)
+
+
+def test_festival_matches_anonymous_gregorian():
+	from src.python.festival import festival_range
+	years = range(1583, 10000)
+	assert festival_range(1583, 9999) == [anonymous_gregorian(y) for y in years]
+	assert [festival(y, FESTIVAL_WESTERN) for y in years] == [anonymous_gregorian(y) for y in years]
+
+
+@pytest.mark.parametrize("method, expected", [
+	("FESTIVAL_ORTHODOX", [date(2021, 5, 2), date(2022, 4, 24), date(2023, 4, 16), date(2024, 5, 5)]),
+	("FESTIVAL_JULIAN", [date(2021, 4, 19), date(2022, 4, 11), date(2023, 4, 3), date(2024, 4, 22)]),
+])
+def test_festival_other_methods(method, expected):
+	from src.python import festival as module
+	method = getattr(module, method)
+	assert module.festival_range(2021, 2024, method) == expected
+	assert [festival(d.year, method) for d in expected] == expected
+
+
+def test_festival_range_matches_festival_outside_the_window():
+	from src.python.festival import FESTIVAL_JULIAN, FESTIVAL_ORTHODOX, festival_range
+	for method in (FESTIVAL_JULIAN, FESTIVAL_ORTHODOX, FESTIVAL_WESTERN):
+		assert festival_range(1, 2000, method) == [festival(y, method) for y in range(1, 2001)]
+	assert festival_range(2001, 2000) == []
+	with pytest.raises(ValueError):
+		festival_range(2000, 2001, 4)
+	with pytest.raises(ValueError):
+		festival(10000, FESTIVAL_WESTERN)
+
+
+@pytest.mark.parametrize("method", [4, None, [FESTIVAL_WESTERN], {}])
+def test_unknown_methods_are_value_errors(method):
+	with pytest.raises(ValueError, match="Unknown festival method"):
+		festival(2000, method)
+	with pytest.raises(ValueError, match="Unknown festival method"):
+		festival(100, method)
+
+
+def test_festival_year_window_and_methods_are_configurable():
+	from src.python import festival as module
+	try:
+		module.set_year_window(1900, 1999)
+		assert festival(1950, FESTIVAL_WESTERN) == date(1950, 4, 9)
+		assert len(module._tables[FESTIVAL_WESTERN]) == 100
+		# A method that keeps the festival on a fixed day
+		module.register_method("fixed", lambda year: (4 + 0 * year, 1 + 0 * year))
+		assert module.festival_range(2000, 2002, "fixed") == [date(y, 4, 1) for y in (2000, 2001, 2002)]
+		assert festival(1950, "fixed") == date(1950, 4, 1)
+		with pytest.raises(ValueError):
+			module.set_year_window(2000, 1999)
+	finally:
+		module.METHODS.pop("fixed", None)
+		module.set_year_window(*module.YEAR_WINDOW)
+
+
+def test_orthodox_is_the_julian_date_in_the_gregorian_calendar():
+	from src.python.festival import FESTIVAL_JULIAN, FESTIVAL_ORTHODOX, festival_range
+
+	def julian_day_number(day):
+		a = (14 - day.month) // 12
+		y, m = day.year + 4800 - a, day.month + 12 * a - 3
+		return day.day + (153 * m + 2) // 5 + 365 * y + y // 4 - 32083
+
+	# Julian day number of 1 January 1 in the proleptic Gregorian calendar
+	offset = julian_day_number(date(1, 1, 3)) - 1
+	for julian, orthodox in zip(festival_range(1, 9999, FESTIVAL_JULIAN), festival_range(1, 9999, FESTIVAL_ORTHODOX)):
+		assert orthodox.toordinal() == julian_day_number(julian) - offset
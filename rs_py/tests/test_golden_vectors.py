@@ -0,0 +1,38 @@
+# test_golden_vectors.py
+import json
+import os
+import shutil
+import subprocess
+import pytest
+from src.python.compiled_scale import CompiledScale
+from src.python.relative_sizes import RelativeSizes
+from tests.golden.make_convert_vectors import VECTORS_PATH, generate
+
+GOLDEN_DIR = os.path.dirname(VECTORS_PATH)
+
+@pytest.fixture(scope="module")
+def golden():
+    with open(VECTORS_PATH) as f:
+        return json.load(f)
+
+def test_vectors_are_up_to_date(golden):
+    """Regenerate with `python -m tests.golden.make_convert_vectors` if this fails"""
+    assert golden == json.loads(json.dumps(generate()))
+
+def test_python_engine_matches_vectors(golden):
+    rs = RelativeSizes()
+    for v in golden["vectors"]:
+        assert rs.convert(v["value"], v["unit"], golden["scales"][v["scale"]]) == v["expected"], v
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+@pytest.mark.parametrize("with_breakpoints", [False, True])
+def test_js_engine_matches_vectors(golden, tmp_path, with_breakpoints):
+    command = ["node", os.path.join(GOLDEN_DIR, "check_js.mjs")]
+    if with_breakpoints:
+        tables = {name: CompiledScale(scale).describe_breakpoints() for name, scale in golden["scales"].items()}
+        path = tmp_path / "breakpoints.json"
+        path.write_text(json.dumps(tables))
+        command.append(str(path))
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    for v, result in zip(golden["vectors"], json.loads(output)):
+        assert result == v["expected"], v
@@ -119,6 +119,10 @@ def registered_app(app, handler):
     def convert():
         return handler.perform_conversion()
     
+    @app.route('/api/convert/batch', methods=['POST'])
+    def convert_batch():
+        return handler.perform_batch_conversion()
+    
     return app
 
 class TestHTMLHandlerAPI:
@@ -242,6 +246,80 @@ class TestConversionAPI:
             assert response.status_code == 500
             assert 'error' in response.get_json()
 
+class TestBatchConversionAPI:
+    """Test the batch conversion endpoint"""
+    
+    @pytest.fixture(autouse=True)
+    def echo_conversion(self, mock_relative_sizes):
+        mock_relative_sizes.convert.side_effect = lambda value, unit, scale: \
+            f"Converted {value} {unit} in {scale.name} scale"
+    
+    def test_items_are_converted_in_order(self, registered_app):
+        """Test that each item gets its own result, in request order"""
+        with registered_app.test_client() as client:
+            response = client.post('/api/convert/batch', json={"items": [
+                {"inputValue": 60, "currentUnit": "second", "currentScale": "time"},
+                {"inputValue": 1000, "currentUnit": "meter", "currentScale": "distance"}
+            ]})
+            
+            assert response.status_code == 200
+            assert response.get_json()["results"] == [
+                {"result": "Converted 60 second in time scale"},
+                {"result": "Converted 1000 meter in distance scale"}
+            ]
+    
+    def test_columnar_form(self, registered_app):
+        """Test the columnar form with a shared scale and per-item units"""
+        with registered_app.test_client() as client:
+            response = client.post('/api/convert/batch', json={
+                "inputValues": [1, 2],
+                "currentUnit": ["second", "minute"],
+                "currentScale": "time"
+            })
+            
+            assert response.status_code == 200
+            assert response.get_json()["results"] == [
+                {"result": "Converted 1 second in time scale"},
+                {"result": "Converted 2 minute in time scale"}
+            ]
+    
+    def test_item_errors_do_not_fail_the_batch(self, registered_app, mock_relative_sizes):
+        """Test that bad items get error entries and good items still convert"""
+        def convert(value, unit, scale):
+            if value == "boom":
+                raise ValueError("Test error")
+            return "ok"
+        mock_relative_sizes.convert.side_effect = convert
+        
+        with registered_app.test_client() as client:
+            response = client.post('/api/convert/batch', json=[
+                {"inputValue": 1, "currentUnit": "second", "currentScale": "nonexistent"},
+                {"inputValue": 1, "currentUnit": "second"},
+                {"inputValue": "boom", "currentUnit": "second", "currentScale": "time"},
+                {"inputValue": 1, "currentUnit": "second", "currentScale": "time"}
+            ])
+            
+            assert response.status_code == 200
+            assert response.get_json()["results"] == [
+                {"error": "Unknown scale: nonexistent"},
+                {"error": "Scale not provided"},
+                {"error": "Test error"},
+                {"result": "ok"}
+            ]
+    
+    @pytest.mark.parametrize("body", [
+        {},
+        {"items": "not_a_list"},
+        {"inputValues": [1, 2], "currentUnit": ["second"], "currentScale": "time"},
+        {"inputValues": [1] * 1001, "currentUnit": "second", "currentScale": "time"},
+    ])
+    def test_malformed_batches_are_rejected(self, registered_app, body):
+        """Test that malformed batch bodies fail as a whole"""
+        with registered_app.test_client() as client:
+            response = client.post('/api/convert/batch', json=body)
+            assert response.status_code == 400
+            assert 'error' in response.get_json()
+
 class TestTemplateRendering:
     """Test template rendering functionality"""
     
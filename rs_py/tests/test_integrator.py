@@ -0,0 +1,214 @@
+# test_integrator.py
+import json
+import random
+import sys
+import threading
+import time
+import pytest
+from src.python import integrator
+from src.python.integrator import app, config, registry
+from src.python.main import main
+from src.python.relative_sizes import relative_sizes
+from src.python.scale_registry import ScaleRegistry, config_version
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    return app.test_client()
+
+class TestConvertRoute:
+    def test_convert(self, client):
+        response = client.post('/api/convert', json={
+            "inputValue": 60, "currentUnit": "seconds", "currentScale": "time"
+        })
+        assert response.status_code == 200
+        assert response.get_json()["result"] == "60 seconds is 1.0 minute"
+
+    def test_missing_values_use_defaults_not_previous_request(self, client):
+        client.post('/api/convert', json={
+            "inputValue": 5, "currentUnit": "kilometers", "currentScale": "distance"
+        })
+        response = client.post('/api/convert', json={"inputValue": 60})
+        assert response.get_json()["result"] == "60 seconds is 1.0 minute"
+
+    @pytest.mark.parametrize("unit, result", [
+        ("km", "5.0 kilometers is 5.0 kilometers"),
+        ("lbs", "5.0 pounds is 2.3 kilograms"),
+        ("hr", "5.0 hours is 5.0 hours"),
+        ("furlongs", "Unknown unit: furlongs"),
+    ])
+    def test_scale_can_be_left_out(self, client, unit, result):
+        response = client.post('/api/convert', json={"inputValue": 5, "currentUnit": unit})
+        assert response.get_json()["result"] == result
+
+    @pytest.mark.parametrize("scale", [["time"], {"name": "time"}, 3])
+    def test_scale_that_is_not_a_name(self, client, scale):
+        response = client.post('/api/convert', json={"inputValue": 5, "currentUnit": "seconds", "currentScale": scale})
+        assert response.status_code == 200
+        assert response.get_json()["result"] == "Invalid scale configuration"
+
+    @pytest.mark.parametrize("body", [[1], "x", None])
+    def test_body_that_is_not_an_object(self, client, body):
+        response = client.post('/api/convert', data=json.dumps(body), content_type='application/json')
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "No data provided"}
+
+    def test_request_does_not_change_main_state(self, client):
+        before = dict(main.state)
+        client.post('/api/convert', json={
+            "inputValue": 5, "currentUnit": "kilometers", "currentScale": "distance"
+        })
+        assert main.state == before
+
+class YieldingDict(dict):
+    """A dict that lets other threads run on every read and write."""
+
+    def __getitem__(self, key):
+        time.sleep(0)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        time.sleep(0)
+        super().__setitem__(key, value)
+
+class TestConcurrency:
+    THREADS = 16
+    REQUESTS_PER_THREAD = 50
+
+    @pytest.fixture(autouse=True)
+    def interleave(self, monkeypatch):
+        # Switch threads as often as possible, and between every access to
+        # Main's own state, so a route that shares it is caught every run
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        monkeypatch.setattr(main, "state", YieldingDict(main.state))
+        try:
+            yield
+        finally:
+            sys.setswitchinterval(interval)
+
+    def test_concurrent_requests_get_their_own_results(self):
+        """Every response must match its own input, whatever else is in flight"""
+        app.config['TESTING'] = True
+        units = [(s["name"], u["plural"]) for s in config["scales"] for u in s["units"]]
+        start = threading.Barrier(self.THREADS)
+        failures = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            client = app.test_client()
+            start.wait()
+            for _ in range(self.REQUESTS_PER_THREAD):
+                scale_name, unit = rng.choice(units)
+                value = rng.randint(1, 100000)
+                response = client.post('/api/convert', json={
+                    "inputValue": value, "currentUnit": unit, "currentScale": scale_name
+                })
+                scale = next(s for s in config["scales"] if s["name"] == scale_name)
+                expected = relative_sizes.convert(value, unit, scale)
+                actual = response.get_json()["result"]
+                if actual != expected:
+                    failures.append((value, unit, scale_name, actual))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert failures == []
+
+class TestCacheRoute:
+    @pytest.fixture
+    def cache(self):
+        yield relative_sizes.enable_cache()
+        relative_sizes.disable_cache()
+
+    def test_off_unless_configured(self, client):
+        assert client.get('/api/cache').get_json() == {"enabled": False}
+
+    def test_stats_and_clear(self, client, cache):
+        client.post('/api/convert', json={"inputValue": 7, "currentUnit": "seconds", "currentScale": "time"})
+        client.post('/api/convert', json={"inputValue": 7, "currentUnit": "seconds", "currentScale": "time"})
+        stats = client.get('/api/cache').get_json()
+        assert stats["enabled"] is True
+        assert stats["hits"] >= 1
+        assert stats["size"] >= 1
+
+        cleared = client.delete('/api/cache').get_json()
+        assert cleared["size"] == 0
+
+class TestBreakpointsRoute:
+    def test_table_picks_the_unit_convert_shows(self, client):
+        from bisect import bisect_right
+        data = client.get('/api/breakpoints/time').get_json()
+        assert data["threshold"] == 0.95
+        units = config["scales"][0]["units"]
+        second = next(t for t in data["breakpoints"] if t["unit"] == "second")
+        for value in (30, 57, 3600, 90000, 1e9):
+            target = units[second["targets"][bisect_right(second["bounds"], value)]]
+            result = relative_sizes.convert(value, "seconds", config["scales"][0])
+            assert result.endswith((" " + target["name"], " " + target["plural"])), (value, result)
+
+    def test_unknown_scale(self, client):
+        assert client.get('/api/breakpoints/nonexistent').status_code == 404
+
+class TestConvertAllRoute:
+    def test_value_in_every_unit(self, client):
+        response = client.post('/api/convert/all', json={"inputValue": 90000, "currentUnit": "seconds"})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["scale"] == "time"
+        assert data["units"] == [unit["name"] for unit in config["scales"][0]["units"]]
+        assert "1500.0 minutes" in data["results"]
+        assert relative_sizes.convert(90000, "seconds", config["scales"][0]).split(" is ")[1] in data["results"]
+
+    def test_many_values(self, client):
+        data = client.post('/api/convert/all', json={
+            "inputValues": [60, 90000], "currentUnit": "seconds", "currentScale": "time"
+        }).get_json()
+        single = [client.post('/api/convert/all', json={"inputValue": v, "currentUnit": "seconds"}).get_json()["results"]
+                  for v in (60, 90000)]
+        assert data["results"] == single
+
+    @pytest.mark.parametrize("body, error", [
+        ({"inputValue": "x", "currentUnit": "seconds"}, "Please provide a valid number"),
+        ({"inputValue": "inf", "currentUnit": "seconds"}, "Please provide a valid number"),
+        ({"inputValue": "nan", "currentUnit": "seconds"}, "Please provide a valid number"),
+        ({"inputValues": [1, "-inf"], "currentUnit": "seconds"}, "Please provide a valid number"),
+        ({"inputValues": [[1, 2], 3], "currentUnit": "seconds"}, "Please provide a valid number"),
+        ({"inputValues": [None], "currentUnit": "seconds"}, "Please provide a valid number"),
+        ({"inputValue": 1, "currentUnit": "furlongs", "currentScale": "time"}, "Unknown unit: furlongs"),
+        ({"inputValue": 1, "currentUnit": "seconds", "currentScale": "nonexistent"}, "Invalid scale configuration"),
+        ({"inputValues": "1", "currentUnit": "seconds"}, "inputValues must be a list"),
+        ([1], "Request must be a JSON object"),
+        ({}, "No data provided"),
+    ])
+    def test_errors(self, client, body, error):
+        response = client.post('/api/convert/all', json=body)
+        assert response.status_code == 400
+        assert response.get_json()["error"].startswith(error)
+
+class TestConfigReload:
+    def test_responses_carry_config_version(self, client):
+        response = client.get('/api/scales')
+        assert response.headers['X-Config-Version'] == str(registry.version)
+
+    # The copied scale's units are in two scales
+    @pytest.mark.filterwarnings("ignore::src.python.scale_registry.ConfigWarning")
+    def test_new_scale_is_served_without_restart(self, client, tmp_path, monkeypatch):
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps(config))
+        reloadable = ScaleRegistry(str(path), check_interval=0)
+        monkeypatch.setattr(integrator, 'registry', reloadable)
+
+        scales = config["scales"] + [dict(config["scales"][0], name="duration")]
+        path.write_text(json.dumps({"scales": scales}))
+        reloadable.reload()
+
+        response = client.post('/api/convert', json={
+            "inputValue": 60, "currentUnit": "seconds", "currentScale": "duration"
+        })
+        assert response.get_json()["result"] == "60 seconds is 1.0 minute"
+        assert response.headers['X-Config-Version'] == reloadable.version != config_version(config)
+        assert client.get('/api/scales').get_json()["scales"][-1] == "duration"
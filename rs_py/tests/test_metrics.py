@@ -0,0 +1,175 @@
+# test_metrics.py
+import os
+import threading
+import pytest
+from unittest.mock import MagicMock
+from flask import Flask
+from src.python.asgi_integrator import create_asgi_app
+from src.python.html_handler import HTMLHandler
+from src.python.integrator import app
+from src.python.metrics import (
+    CONVERSIONS, EXCEPTIONS, FILE_SUFFIX, LATENCY, REQUESTS, RETIRED_FILE, Metrics, clear_directory, metrics
+)
+from tests.test_asgi_integrator import call
+
+TIME_CONFIG = {"scales": [{
+    "name": "time", "defaultUnit": "second",
+    "units": [{"name": "second", "conversionFactor": 1}, {"name": "minute", "conversionFactor": 60}]
+}]}
+
+def counter(m, name, labels):
+    return m.collect()[0].get((name, labels), 0)
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    return app.test_client()
+
+class TestRecording:
+    def test_counters_add_up(self):
+        m = Metrics()
+        m.inc(REQUESTS, (("route", "/a"),))
+        m.inc(REQUESTS, (("route", "/a"),), 2)
+        assert counter(m, REQUESTS, (("route", "/a"),)) == 3
+
+    def test_histogram_buckets_are_cumulative(self):
+        m = Metrics(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.5, 0.7, 5.0):
+            m.observe(LATENCY, (("route", "/a"),), seconds)
+        text = m.render()
+        assert f'{LATENCY}_bucket{{route="/a",le="0.1"}} 1' in text
+        assert f'{LATENCY}_bucket{{route="/a",le="1.0"}} 3' in text
+        assert f'{LATENCY}_bucket{{route="/a",le="+Inf"}} 4' in text
+        assert f'{LATENCY}_count{{route="/a"}} 4' in text
+        assert f'{LATENCY}_sum{{route="/a"}} 6.25' in text
+
+    def test_render_lists_every_metric_and_escapes_labels(self):
+        m = Metrics()
+        m.inc(EXCEPTIONS, (("handler", 'say "hi"\n'),))
+        text = m.render()
+        for name in (REQUESTS, LATENCY, CONVERSIONS, EXCEPTIONS):
+            assert f"# TYPE {name} " in text
+        assert f'{EXCEPTIONS}{{handler="say \\"hi\\"\\n"}} 1' in text
+
+    def test_threads_record_into_their_own_shards(self):
+        m = Metrics()
+        labels = (("route", "/a"),)
+
+        def record():
+            for _ in range(1000):
+                m.inc(REQUESTS, labels)
+
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert counter(m, REQUESTS, labels) == 8000
+
+    def test_shards_of_finished_threads_are_retired(self):
+        m = Metrics()
+        for _ in range(5):
+            t = threading.Thread(target=m.inc, args=(REQUESTS, ()))
+            t.start()
+            t.join()
+        m.inc(REQUESTS, ())
+        assert len(m._shards) <= 2
+        assert counter(m, REQUESTS, ()) == 6
+
+    def test_unknown_scales_and_units_share_one_series(self):
+        from src.python.compiled_scale import compile_scales
+        m = Metrics()
+        scales = compile_scales(TIME_CONFIG)
+        m.count_conversion(scales, "time", "minutes", "1 minute is 60 seconds")
+        m.count_conversion(scales, "made-up", "x", "Invalid scale")
+        m.count_conversion(scales, "time", "furlongs", "Unknown unit: furlongs")
+        counters = m.collect()[0]
+        assert counters[(CONVERSIONS, (("scale", "time"), ("unit", "minute"), ("outcome", "ok")))] == 1
+        assert counters[(CONVERSIONS, (("scale", "unknown"), ("unit", "unknown"), ("outcome", "error")))] == 1
+        assert counters[(CONVERSIONS, (("scale", "time"), ("unit", "unknown"), ("outcome", "error")))] == 1
+
+def run_workers(m, count, amount):
+    """Fork count workers that each record amount requests and exit."""
+    pids = []
+    for _ in range(count):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                m.inc(REQUESTS, (), amount)
+                m.observe(LATENCY, (), 0.002)
+                m.flush()
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        assert os.waitpid(pid, 0)[1] == 0
+
+def metric_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(FILE_SUFFIX))
+
+class TestMultiprocess:
+    def test_forked_workers_are_summed(self, tmp_path):
+        m = Metrics()
+        m.enable_multiprocess(str(tmp_path))
+        m.inc(REQUESTS, ())
+        m.flush()
+        run_workers(m, 3, 10)
+        # The parent's own sample is not copied into the workers' files
+        assert counter(m, REQUESTS, ()) == 31
+
+    def test_exited_workers_are_folded_into_one_file(self, tmp_path):
+        m = Metrics()
+        m.enable_multiprocess(str(tmp_path))
+        m.inc(REQUESTS, ())
+        for round_ in range(1, 4):
+            run_workers(m, 3, 10)
+            counters, histograms = m.collect()
+            assert counters[(REQUESTS, ())] == 1 + 30 * round_
+            assert histograms[(LATENCY, ())][-1] == pytest.approx(0.002 * 3 * round_)
+            assert metric_files(tmp_path) == sorted([RETIRED_FILE, os.path.basename(m._file)])
+        # Collecting again retires nothing more and counts nothing twice
+        assert counter(m, REQUESTS, ()) == 91
+
+    def test_clear_directory(self, tmp_path):
+        m = Metrics()
+        m.enable_multiprocess(str(tmp_path))
+        m.inc(REQUESTS, ())
+        m.flush()
+        (tmp_path / "keep.txt").write_text("")
+        clear_directory(str(tmp_path))
+        assert os.listdir(tmp_path) == ["keep.txt"]
+
+class TestInstrumentation:
+    def test_exception_in_perform_conversion_is_counted(self):
+        relative_sizes = MagicMock()
+        relative_sizes.convert.side_effect = ValueError("boom")
+        handler = HTMLHandler(relative_sizes, TIME_CONFIG)
+        labels = (("handler", "perform_conversion"), ("exception", "ValueError"))
+        before = counter(metrics, EXCEPTIONS, labels)
+        body = {"inputValue": 1, "currentUnit": "seconds", "currentScale": "time"}
+        with Flask(__name__).test_request_context(json=body):
+            assert handler.perform_conversion()[1] == 500
+        assert counter(metrics, EXCEPTIONS, labels) == before + 1
+
+    def test_flask_requests_are_labelled_by_route(self, client):
+        labels = (("route", "/api/units/<scale>"), ("method", "GET"), ("status", "404"))
+        before = counter(metrics, REQUESTS, labels)
+        client.get('/api/units/nope')
+        client.get('/api/units/also-nope')
+        assert counter(metrics, REQUESTS, labels) == before + 2
+
+    def test_flask_metrics_endpoint(self, client):
+        client.post('/api/convert', json={"inputValue": 60, "currentUnit": "seconds", "currentScale": "time"})
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain")
+        text = response.get_data(as_text=True)
+        assert f'{REQUESTS}{{route="/api/convert",method="POST",status="200"}}' in text
+        assert f'{CONVERSIONS}{{scale="time",unit="second",outcome="ok"}}' in text
+
+    def test_asgi_requests_are_recorded(self):
+        asgi_app = create_asgi_app()
+        labels = (("route", "/api/units/<scale>"), ("method", "GET"), ("status", "200"))
+        before = counter(metrics, REQUESTS, labels)
+        assert call(asgi_app, "GET", "/api/units/time")[0] == 200
+        assert counter(metrics, REQUESTS, labels) == before + 1
@@ -0,0 +1,78 @@
+# test_number_format.py
+import pytest
+from src.python.number_format import UnitFormat, format_number, unit_format
+
+class TestFormatNumber:
+    @pytest.mark.parametrize("value, decimal_places, expected", [
+        # Round half up, not Python's round-half-even
+        (9.85, 1, "9.9"),
+        (2.5, 0, "3"),
+        (0.125, 2, "0.13"),
+        (-2.5, 0, "-3"),
+        (-9.85, 1, "-9.9"),
+        (9.84, 1, "9.8"),
+        # Halves that float multiplication lands just below
+        (1.005, 2, "1.01"),
+        (1.8499999999999999, 1, "1.9"),
+        # Integers take the fast path and keep their padding
+        (60, 1, "60.0"),
+        (60.0, 0, "60"),
+        (-0.0, 1, "0.0"),
+        # Rounding to zero does not leave a sign behind
+        (-0.04, 1, "0.0"),
+        (0.004, 2, "0.00"),
+        # Large magnitudes print the exact value, without rounding to even
+        (2.0 ** 52 + 1, 0, "4503599627370497"),
+        (2.0 ** 49 + 0.5, 1, "562949953421312.5"),
+        (1e25, 1, "10000000000000000905969664.0"),
+        (589521666971910.4, 1, "589521666971910.4"),
+        # Scaled past 2**52, where the multiply itself rounds halves to even
+        (500000000000000.25, 1, "500000000000000.3"),
+        (-500000000000000.25, 1, "-500000000000000.3"),
+        # Digits beyond float precision are not rounded up as if they were halves
+        (299650540618.31726, 0, "299650540618"),
+        (208504064229.94995, 1, "208504064229.9"),
+        (-208504064229.94995, 1, "-208504064229.9"),
+        # One ulp below the half once converted: exactly a week-to-year ratio away
+        (9007199254740992 * 604800 / 31536000, 1, "172740807625169.7"),
+    ])
+    def test_format_number(self, value, decimal_places, expected):
+        assert format_number(value, decimal_places) == expected
+
+    def test_formats_are_shared(self):
+        assert unit_format(2) is unit_format(2)
+        assert isinstance(unit_format(2), UnitFormat)
+
+class TestFormatMany:
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+
+    def test_matches_format_number(self):
+        from src.python.number_format import format_many
+        values = [9.85, 1.005, -2.5, 60, 1e25, 2.0 ** 49 + 0.5, -0.04, 0.125, 299650540618.31726, 500000000000000.25,
+                  208504064229.94995, 9007199254740992 * 604800 / 31536000]
+        for decimal_places in range(4):
+            expected = [format_number(v, decimal_places) for v in values]
+            assert format_many(values, decimal_places) == expected
+
+    def test_near_halves_match_exact_rounding(self):
+        import math
+        import random
+        from src.python.number_format import TIE_ULPS, exact_scaled, scaled_many
+        rng = random.Random(8)
+        values, places = [], []
+        for _ in range(5000):
+            decimal_places = rng.randint(0, 4)
+            value = (rng.randint(0, 10 ** rng.randint(1, 15)) + 0.5) / 10 ** decimal_places
+            for _ in range(rng.randint(0, 3)):
+                value = math.nextafter(value, rng.choice([0, math.inf]))
+            values.append(value * rng.choice([1, -1]))
+            places.append(decimal_places)
+        expected = [exact_scaled(v, p, TIE_ULPS) for v, p in zip(values, places)]
+        assert scaled_many(values, places) == expected
+        assert [unit_format(p).scaled(v) for v, p in zip(values, places)] == expected
+
+    def test_per_value_decimal_places(self):
+        from src.python.number_format import format_many
+        assert format_many([1.25, 1.25, 1.25], [0, 1, 2]) == ["1", "1.3", "1.25"]
@@ -0,0 +1,172 @@
+# test_profiling.py
+import json
+import os
+import signal
+import threading
+import time
+import pytest
+from src.python import integrator, profiling
+from src.python.integrator import app, config
+from src.python.profiling import PhaseStats, SamplingProfiler
+from src.python.relative_sizes import RelativeSizes, relative_sizes
+
+TIME_SCALE = config["scales"][0]
+
+@pytest.fixture
+def instrumented():
+    stats = profiling.enable(app, relative_sizes, PhaseStats())
+    yield stats
+    profiling.disable(app, relative_sizes)
+
+class TestConvertPhases:
+    CASES = [
+        (60, "seconds", TIME_SCALE),
+        (1, "day", TIME_SCALE),
+        (0.5, "minute", TIME_SCALE),
+        ("x", "seconds", TIME_SCALE),
+        (1, "", TIME_SCALE),
+        (1, "seconds", {"units": []}),
+        (1, "furlongs", TIME_SCALE),
+    ]
+
+    @pytest.mark.parametrize("cache", [False, True])
+    def test_instrumented_convert_gives_the_same_results(self, cache):
+        plain, timed = RelativeSizes(), RelativeSizes()
+        if cache:
+            plain.enable_cache()
+            timed.enable_cache()
+        timed.enable_instrumentation(PhaseStats())
+        for _ in range(2):
+            for value, unit, scale in self.CASES:
+                assert timed.convert(value, unit, scale) == plain.convert(value, unit, scale)
+
+    def test_phases_are_timed(self):
+        rs = RelativeSizes()
+        stats = PhaseStats()
+        rs.enable_instrumentation(stats)
+        rs.convert(60, "seconds", TIME_SCALE)
+        rs.convert(1, "furlongs", TIME_SCALE)
+        summary = stats.summary()
+        assert summary["convert"]["count"] == 2
+        assert summary["lookup"]["count"] == 2
+        assert summary["format"]["count"] == 1
+        assert "cache" not in summary
+
+    def test_disable_restores_the_plain_convert(self):
+        rs = RelativeSizes()
+        rs.enable_instrumentation(PhaseStats())
+        rs.disable_instrumentation()
+        assert "convert" not in vars(rs) and "_select" not in vars(rs)
+        assert rs.convert.__func__ is RelativeSizes.convert
+
+    def test_enabling_twice_does_not_nest_spans(self):
+        rs = RelativeSizes()
+        rs.enable_instrumentation(PhaseStats())
+        stats = PhaseStats()
+        rs.enable_instrumentation(stats)
+        rs.convert(60, "seconds", TIME_SCALE)
+        assert stats.summary()["select"]["count"] == 1
+
+class TestFlaskSpans:
+    def test_request_decode_and_encode_are_timed(self, instrumented):
+        response = app.test_client().post('/api/convert', json={
+            "inputValue": 60, "currentUnit": "seconds", "currentScale": "time"
+        })
+        assert response.get_json()["result"] == "60 seconds is 1.0 minute"
+        assert {"request", "decode", "encode", "convert", "lookup"} <= set(instrumented.summary())
+
+    def test_disable_restores_the_app(self, instrumented):
+        wsgi_app = app.wsgi_app.wsgi_app
+        profiling.disable(app, relative_sizes)
+        assert app.wsgi_app is wsgi_app
+        assert not isinstance(app.json, profiling.InstrumentedJSONProvider)
+
+class TestSamplingProfiler:
+    def test_samples_only_threads_inside_spans(self):
+        profiler = SamplingProfiler()
+        inside = threading.Event()
+        done = threading.Event()
+
+        def busy():
+            with profiler.span("work"):
+                inside.set()
+                done.wait()
+
+        worker = threading.Thread(target=busy)
+        worker.start()
+        inside.wait()
+        profiler.sample()
+        done.set()
+        worker.join()
+        profiler.sample()
+        [(stack, count)] = profiler.stacks.items()
+        assert count == 1
+        assert stack.endswith(";[work]")
+        assert "busy (test_profiling.py:" in stack
+
+    def test_dump_writes_phases_and_folded_stacks(self, tmp_path):
+        profiler = SamplingProfiler(interval=0.001).start()
+        try:
+            rs = RelativeSizes()
+            rs.enable_instrumentation(profiler)
+            deadline = time.monotonic() + 0.2
+            while time.monotonic() < deadline:
+                rs.convert(60, "seconds", TIME_SCALE)
+        finally:
+            profiler.stop()
+        paths = profiler.dump(str(tmp_path))
+        with open(paths["phases"]) as f:
+            assert json.load(f)["convert"]["count"] > 0
+        with open(paths["stacks"]) as f:
+            lines = f.read().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert "[convert]" in stack and int(count) > 0
+
+    def test_signal_dumps_profile(self, tmp_path):
+        profiler = SamplingProfiler()
+        profiler.record("convert", 0.001)
+        signum = profiling.parse_signal("SIGRTMIN+1")
+        previous = signal.getsignal(signum)
+        try:
+            assert profiling.install_dump_signal(profiler, str(tmp_path), signum)
+            os.kill(os.getpid(), signum)
+            deadline = time.monotonic() + 5
+            while len(os.listdir(tmp_path)) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            signal.signal(signum, previous)
+        assert sorted(name.rsplit(".", 1)[1] for name in os.listdir(tmp_path)) == ["folded", "json"]
+
+    @pytest.mark.parametrize("name", ["SIGUSR1", "sigusr2", "SIGHUP", "SIGNOPE", "SIGRTMIN+x"])
+    def test_gunicorn_and_unknown_signals_are_refused(self, name):
+        with pytest.raises(ValueError):
+            profiling.parse_signal(name)
+
+class TestAdminEndpoint:
+    @pytest.fixture
+    def profiler(self, tmp_path, monkeypatch):
+        profiler = SamplingProfiler()
+        profiler.record("convert", 0.002)
+        monkeypatch.setattr(integrator, 'profiler', profiler)
+        monkeypatch.setattr(integrator, 'profile_dir', str(tmp_path))
+        monkeypatch.setattr(integrator, 'profile_token', "secret")
+        return profiler
+
+    def test_not_found_when_profiling_is_off(self):
+        assert app.test_client().post('/admin/profile').status_code == 404
+
+    def test_dump(self, profiler):
+        data = app.test_client().post('/admin/profile', headers={"X-Profile-Token": "secret"}).get_json()
+        assert data["phases"]["convert"]["count"] == 1
+        assert os.path.exists(data["files"]["stacks"])
+
+    @pytest.mark.parametrize("headers", [{}, {"X-Profile-Token": "guess"}])
+    def test_token_is_required(self, profiler, headers):
+        assert app.test_client().post('/admin/profile', headers=headers).status_code == 403
+
+    def test_off_without_a_token_configured(self, profiler, monkeypatch):
+        monkeypatch.setattr(integrator, 'profile_token', None)
+        response = app.test_client().post('/admin/profile', headers={"X-Profile-Token": ""})
+        assert response.status_code == 403
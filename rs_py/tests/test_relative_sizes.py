@@ -1,6 +1,8 @@
 import inspect
+import math
 import pytest
 from src.python.relative_sizes import RelativeSizes
+from src.python.compiled_scale import CompiledScale
 
 @pytest.fixture
 def rs():
@@ -94,6 +96,113 @@ class TestConvertFailures:
         result = rs.convert(value, unit, scale)
         assert result == expected_error, f"Expected error message '{expected_error}' but got '{result}'"
 
+class TestCompiledScale:
+    def test_convert_accepts_compiled_scale(self, rs, simple_scale):
+        compiled = CompiledScale(simple_scale)
+        for value, unit in [(1000, "thousandth"), (212000, "thousandths"), (949, "thousandth"), (-100, "one")]:
+            assert rs.convert(value, unit, compiled) == rs.convert(value, unit, simple_scale)
+
+    def test_raw_scale_is_compiled_once(self, rs, simple_scale):
+        first = rs.compile_scale(simple_scale)
+        assert isinstance(first, CompiledScale)
+        assert rs.compile_scale(simple_scale) is first
+        assert rs.compile_scale(first) is first
+
+    def test_invalid_scale_does_not_compile(self, rs):
+        assert rs.compile_scale({"units": []}) is None
+        assert rs.compile_scale(None) is None
+
+    @pytest.mark.parametrize("unit, expected", [
+        ("one", "one"),
+        ("ones", "one"),
+        ("hundreds", "hundred"),
+        ("unknown", None),
+    ])
+    def test_find_unit(self, simple_scale, unit, expected):
+        found = CompiledScale(simple_scale).find_unit(unit)
+        assert (found.name if found else None) == expected
+
+    def test_find_unit_irregular_plural(self):
+        scale = CompiledScale({
+            "units": [{"name": "foot", "plural": "feet", "conversionFactor": 1}],
+            "defaultUnit": "foot"
+        })
+        assert scale.find_unit("feet").name == "foot"
+
+    @pytest.mark.parametrize("base_value, expected", [
+        (0.95, "one"),
+        (0.949, "thousandth"),
+        (95, "hundred"),
+        (1e9, "hundred"),
+        (-5, None),
+    ])
+    def test_largest_fitting(self, simple_scale, base_value, expected):
+        found = CompiledScale(simple_scale).largest_fitting(base_value)
+        assert (found.name if found else None) == expected
+
+class TestBreakpoints:
+    SCALES = [
+        {"units": [
+            {"name": "thousandth", "conversionFactor": 0.001},
+            {"name": "one", "conversionFactor": 1},
+            {"name": "hundred", "conversionFactor": 100}
+        ], "defaultUnit": "one"},
+        {"units": [
+            {"name": "inch", "conversionFactor": 0.0254},
+            {"name": "foot", "conversionFactor": 0.3048},
+            {"name": "yard", "conversionFactor": 0.9144},
+            {"name": "mile", "conversionFactor": 1609.344}
+        ], "defaultUnit": "foot"},
+        # Equal factors: the scan picks the first in config order
+        {"units": [
+            {"name": "a", "conversionFactor": 7.3},
+            {"name": "b", "conversionFactor": 2},
+            {"name": "c", "conversionFactor": 2}
+        ], "defaultUnit": "a"},
+    ]
+
+    def probes(self, bounds):
+        """Each bound and its neighbouring floats, plus zeros and infinities."""
+        values = [0.0, -0.0, math.inf, -math.inf, 1e300, -1e300]
+        for bound in bounds:
+            below = above = bound
+            for _ in range(3):
+                below, above = math.nextafter(below, -math.inf), math.nextafter(above, math.inf)
+                values += [below, above]
+            values.append(bound)
+        return values
+
+    @pytest.mark.parametrize("scale", SCALES)
+    def test_table_matches_scan(self, scale):
+        compiled = CompiledScale(scale)
+        for source in compiled.units:
+            bounds, targets = compiled.breakpoints(source)
+            assert list(bounds) == sorted(set(bounds))
+            assert len(targets) == len(bounds) + 1
+            # Thresholds merged away still have to agree with the scan
+            edges = [sign * u.conversion_factor * 0.95 for u in compiled.units for sign in (1, -1)]
+            for base_value in self.probes(list(bounds) + edges):
+                assert compiled.select_target(source, base_value) is compiled.select_by_scan(source, base_value)
+
+    def test_nan_uses_the_fallback(self, simple_scale):
+        compiled = CompiledScale(simple_scale)
+        hundred = compiled.find_unit("hundred")
+        assert compiled.select_target(hundred, math.nan).name == "one"
+
+    def test_no_table_for_factors_that_are_not_positive(self):
+        compiled = CompiledScale({"units": [
+            {"name": "one", "conversionFactor": 1}, {"name": "none", "conversionFactor": 0}
+        ], "defaultUnit": "one"})
+        assert compiled.breakpoints(compiled.units[0]) is None
+        assert compiled.describe_breakpoints() is None
+        assert compiled.select_target(compiled.units[0], 0.5).name == "one"
+
+    def test_describe_breakpoints(self, simple_scale):
+        [thousandth, one, hundred] = CompiledScale(simple_scale).describe_breakpoints()
+        assert thousandth == {"unit": "thousandth", "bounds": [0.95, 95.0], "targets": [0, 1, 2]}
+        assert hundred["unit"] == "hundred"
+        assert hundred["targets"] == [1, 2]
+
 class TestRelativeSizesSignature:
     def test_class_exists(self):
         """Verify that the RelativeSizes class exists."""
@@ -125,4 +234,74 @@ class TestRelativeSizesSignature:
         except ImportError as e:
             pytest.fail(f"Failed to import relative_sizes: {e}")
         except Exception as e:
-            pytest.fail(f"Unexpected error during import: {e}")
\ No newline at end of file
+            pytest.fail(f"Unexpected error during import: {e}")
+
+class TestConvertMany:
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+
+    @pytest.mark.parametrize("unit", ["thousandth", "one", "hundreds"])
+    def test_matches_scalar_convert(self, rs, simple_scale, unit):
+        values = [0, 1, -1, 9.85, 949, 950, 212000, -100, 3.001, 1e9, -2000, 0.0004]
+        expected = [rs.convert(v, unit, simple_scale) for v in values]
+        assert rs.convert_many(values, unit, simple_scale, as_strings=True) == expected
+
+    def test_returns_rounded_values_and_unit_indices(self, rs, simple_scale, numpy):
+        target_values, unit_indices = rs.convert_many(numpy.array([949, 950, 212000]), "thousandth", simple_scale)
+        assert target_values.tolist() == [949, 1.0, 2.12]
+        assert unit_indices.tolist() == [0, 1, 2]
+
+    @pytest.mark.parametrize("values, unit, scale, expected_error", [
+        ([1, "x"], "one", None, "Please provide a valid number"),
+        ([[1, 2], 3], "one", None, "Please provide a valid number"),
+        ([1, None], "one", None, "Please provide a valid number"),
+        ([float("inf")], "one", None, "Please provide a valid number"),
+        ([1], "", None, "Please provide a valid unit"),
+        ([1], "one", {}, "Invalid scale configuration"),
+        ([1], "unknown", None, "Unknown unit: unknown"),
+    ])
+    def test_errors(self, rs, simple_scale, values, unit, scale, expected_error):
+        with pytest.raises(ValueError, match=expected_error):
+            rs.convert_many(values, unit, simple_scale if scale is None else scale)
+
+class TestConvertAll:
+    def test_every_unit_from_one_base_value(self, rs, simple_scale):
+        assert rs.convert_all(212000, "thousandths", simple_scale) == [
+            "212000 thousandths", "212.0 ones", "2.12 hundreds"
+        ]
+        assert rs.convert_all(1, "one", simple_scale)[1] == "1.0 one"
+
+    @pytest.mark.parametrize("value, unit", [(1000, "thousandth"), (949, "thousandth"), (212000, "thousandth"), (-100, "one")])
+    def test_includes_the_unit_convert_picks(self, rs, simple_scale, value, unit):
+        target = rs.convert(value, unit, simple_scale).split(" is ")[1]
+        assert target in rs.convert_all(value, unit, simple_scale)
+
+    def test_many_matches_one_at_a_time(self, rs, simple_scale):
+        pytest.importorskip("numpy")
+        values = [0, 1, -1, 9.85, 949, 950, 212000, -100, 3.001, 1e9, 0.0004]
+        expected = [rs.convert_all(v, "thousandths", simple_scale) for v in values]
+        assert rs.convert_all_many(values, "thousandths", simple_scale) == expected
+
+    @pytest.mark.parametrize("value, unit, scale, expected_error", [
+        ("x", "one", None, "Please provide a valid number"),
+        ("inf", "one", None, "Please provide a valid number"),
+        (float("nan"), "one", None, "Please provide a valid number"),
+        (None, "one", None, "Please provide a valid number"),
+        (1e308, "hundred", None, "Please provide a valid number"),
+        (1, "", None, "Please provide a valid unit"),
+        (1, "one", {}, "Invalid scale configuration"),
+        (1, "unknown", None, "Unknown unit: unknown"),
+    ])
+    def test_errors(self, rs, simple_scale, value, unit, scale, expected_error):
+        scale = simple_scale if scale is None else scale
+        with pytest.raises(ValueError, match=expected_error):
+            rs.convert_all(value, unit, scale)
+        with pytest.raises(ValueError, match=expected_error):
+            rs.convert_all_many([value], unit, scale)
+
+    @pytest.mark.parametrize("values", [[[1, 2], 3], [1, None], [1, [2]]])
+    def test_many_takes_only_a_flat_list_of_numbers(self, rs, simple_scale, values):
+        pytest.importorskip("numpy")
+        with pytest.raises(ValueError, match="Please provide a valid number"):
+            rs.convert_all_many(values, "one", simple_scale)
@@ -0,0 +1,128 @@
+# test_result_cache.py
+import threading
+import pytest
+from src.python.compiled_scale import CompiledScale
+from src.python.relative_sizes import RelativeSizes
+from src.python.result_cache import ResultCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def scale():
+    return {
+        "name": "time",
+        "defaultUnit": "second",
+        "units": [
+            {"name": "second", "plural": "seconds", "conversionFactor": 1, "decimalPlaces": 0},
+            {"name": "minute", "plural": "minutes", "conversionFactor": 60, "decimalPlaces": 1}
+        ]
+    }
+
+class TestResultCache:
+    def test_hits_and_misses(self):
+        cache = ResultCache(maxsize=2)
+        assert cache.get("a") is None
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hitRate"]) == (1, 1, 0.5)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ResultCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = ResultCache(maxsize=2, ttl=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+        assert cache.stats()["size"] == 0
+
+    def test_clear(self):
+        cache = ResultCache()
+        cache.put("a", 1)
+        cache.clear()
+        assert cache.get("a") is None
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            ResultCache(maxsize=0)
+
+    def test_counters_are_consistent_across_threads(self):
+        cache = ResultCache(maxsize=50)
+
+        def worker(offset):
+            for i in range(2000):
+                key = (i + offset) % 100
+                if cache.get(key) is None:
+                    cache.put(key, key)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats()
+        assert stats["hits"] + stats["misses"] == 8 * 2000
+        assert stats["size"] <= 50
+
+class TestConvertCache:
+    def test_repeated_conversions_hit(self, scale):
+        rs = RelativeSizes()
+        cache = rs.enable_cache(maxsize=10)
+        first = rs.convert(90, "seconds", scale)
+        assert rs.convert(90, "second", scale) == first
+        assert rs.convert("90", "seconds", scale) == first
+        assert cache.stats()["hits"] == 2
+
+    def test_results_match_uncached(self, scale):
+        rs = RelativeSizes()
+        rs.enable_cache(maxsize=10)
+        for value in [0, 1, 59, 60, 90, 3600, -5, 1.5]:
+            for _ in range(2):
+                assert rs.convert(value, "seconds", scale) == RelativeSizes().convert(value, "seconds", scale)
+
+    def test_changed_scale_content_does_not_hit(self, scale):
+        rs = RelativeSizes()
+        rs.enable_cache(maxsize=10)
+        before = rs.convert(90, "seconds", scale)
+        changed = dict(scale, units=[dict(u, decimalPlaces=2) for u in scale["units"]])
+        assert rs.convert(90, "seconds", changed) != before
+
+    def test_equal_content_shares_results(self, scale):
+        rs = RelativeSizes()
+        cache = rs.enable_cache(maxsize=10)
+        rs.convert(90, "seconds", CompiledScale(scale))
+        rs.convert(90, "seconds", CompiledScale(dict(scale)))
+        assert cache.stats()["hits"] == 1
+        assert CompiledScale(scale).key == CompiledScale(scale).key != CompiledScale(dict(scale, name="other")).key
+
+    def test_errors_are_not_cached(self, scale):
+        rs = RelativeSizes()
+        cache = rs.enable_cache(maxsize=10)
+        rs.convert("x", "seconds", scale)
+        rs.convert(1, "fortnights", scale)
+        assert cache.stats()["size"] == 0
+
+    def test_disable(self, scale):
+        rs = RelativeSizes()
+        rs.enable_cache()
+        rs.disable_cache()
+        assert rs.cache is None
+        assert rs.convert(60, "seconds", scale) == "60 seconds is 1.0 minute"
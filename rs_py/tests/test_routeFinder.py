@@ -91,3 +91,137 @@ def test_errors():
 	assert findRoute(
 	    [("A", "B"), ("C", "D")], "A",
 	    "D") == "ERROR: there is no connection between start and end"
+
+
+def random_legs(seed, points=7, legs=12):
+	import random
+	rng = random.Random(seed)
+	names = [chr(ord("A") + i) for i in range(points)]
+	pairs = set()
+	while len(pairs) < legs:
+		a, b = rng.sample(names, 2)
+		if (b, a) not in pairs:
+			pairs.add((a, b))
+	return [makep2p(a, b, rng.randint(1, 9), rng.randint(1, 90)) for a, b in sorted(pairs)]
+
+
+def route_costs(routes, route):
+	costs = {frozenset(leg.step): (leg.distance, leg.duration) for leg in routes}
+	steps = [costs[frozenset(pair)] for pair in zip(route, route[1:])]
+	return sum(d for d, _ in steps), sum(t for _, t in steps)
+
+
+def simple_paths(routes, start, end, path=None):
+	path = path or [start]
+	if path[-1] == end:
+		yield path
+		return
+	for leg in routes:
+		for a, b in (leg.step, leg.step[::-1]):
+			if a == path[-1] and b not in path:
+				yield from simple_paths(routes, start, end, path + [b])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_searches_match_brute_force(seed):
+	routes = random_legs(seed)
+	found = findRoute(routes, "A", "G")
+	if isinstance(found, str):
+		assert found == "ERROR: there is no connection between start and end"
+		return
+	every = list(simple_paths(routes, "A", "G"))
+	assert sorted(found.allRoutes) == sorted(every)
+	costs = [route_costs(routes, r) for r in every]
+	assert found.minDistance.distance == min(d for d, _ in costs)
+	assert found.minDuration.duration == min(t for _, t in costs)
+	assert len(found.fewestStops.route) == min(len(r) for r in every)
+	for answer in (found.minDistance, found.minDuration, found.fewestStops):
+		assert answer.route in every
+		assert (answer.distance, answer.duration) == route_costs(routes, answer.route)
+
+
+def test_all_routes_limits():
+	routes = random_legs(3, points=8, legs=20)
+	every = findRoute(routes, "A", "H", max_routes=None).allRoutes
+	assert findRoute(routes, "A", "H", max_routes=5).allRoutes == every[:5]
+	assert not every.truncated
+	capped = findRoute(routes, "A", "H", max_routes=5).allRoutes
+	assert capped.truncated and capped == every[:5] and len(capped) == 5
+	assert not findRoute(routes, "A", "H", max_routes=len(every)).allRoutes.truncated
+	short = findRoute(routes, "A", "H", max_routes=None, max_stops=3).allRoutes
+	assert sorted(short) == sorted(r for r in every if len(r) <= 4)
+
+
+def test_route_graph_answers_many_queries():
+	from src.python.routeFinder import RouteGraph
+	routes = [makep2p("A", "B", 2, 20), makep2p("B", "C", 3, 30), makep2p("A", "C", 10, 100)]
+	graph = RouteGraph(routes)
+	assert graph.find("A", "C").minDistance.route == ["A", "B", "C"]
+	assert graph.find("C", "A").fewestStops.route == ["C", "A"]
+	assert graph.find("A", "D") == "ERROR: end point is not in routes"
+	assert findRoute([makep2p("A", "B", -1, 10)], "A", "B").startswith("ERROR: negative")
+
+
+@pytest.mark.parametrize("by", ["distance", "duration"])
+def test_alternatives_come_cheapest_first(by):
+	routes = random_legs(5, points=8, legs=18)
+	found = findRoute(routes, "A", "H", max_routes=None)
+	costs = {tuple(r): route_costs(routes, r) for r in found.allRoutes}
+	index = 0 if by == "distance" else 1
+	ranked = list(found.alternatives(by))
+	assert sorted(tuple(r.route) for r in ranked) == sorted(costs)
+	assert [getattr(r, by) for r in ranked] == sorted(c[index] for c in costs.values())
+	assert ranked[0] == (found.minDistance if by == "distance" else found.minDuration)
+
+
+def test_all_routes_is_drawn_lazily():
+	import itertools
+	from src.python.routeFinder import RouteGraph
+	# A ladder has 2 ** rungs routes from one end to the other
+	rungs = 40
+	routes = [makep2p(f"{side}{i}", f"{side}{i + 1}") for i in range(rungs) for side in "LR"]
+	routes += [makep2p(f"L{i}", f"R{i}") for i in range(rungs + 1)]
+	found = RouteGraph(routes).find("L0", f"R{rungs}")
+	assert found.allRoutes[0] == found.minDistance.route
+	assert ["L0", "R0"] + [f"R{i}" for i in range(1, rungs + 1)] in found.allRoutes
+	top = list(itertools.islice(found.alternatives(), 5))
+	assert [r.distance for r in top] == sorted(r.distance for r in top)
+	# A cap leaves routes out, and says so
+	capped = RouteGraph(routes).find("L0", f"R{rungs}", max_routes=50).allRoutes
+	assert capped.truncated and len(capped) == 50
+
+
+def test_leg_table_stands_in_for_legs():
+	from src.python.routeFinder import LegTable
+	routes = random_legs(7, points=8, legs=18)
+	table = LegTable(routes)
+	assert len(table) == 18 and len(table.names) == 8
+	assert all(a.same_as(b) for a, b in zip(table, routes))
+	assert table[-1].same_as(routes[-1])
+	from_legs, from_table = findRoute(routes, "A", "H", max_routes=None), findRoute(table, "A", "H", max_routes=None)
+	assert from_table.allRoutes == from_legs.allRoutes
+	for answer in ("minDistance", "minDuration", "fewestStops"):
+		assert getattr(from_table, answer) == getattr(from_legs, answer)
+	assert findRoute(LegTable(), "A", "B") == "ERROR: no routes supplied"
+	table.add("A", "B", -1)
+	assert findRoute(table, "A", "B").startswith("ERROR: negative")
+
+
+def test_leg_table_reads_csv(tmp_path):
+	import io
+	from src.python.routeFinder import LegTable, RouteGraph
+	path = tmp_path / "legs.csv"
+	path.write_text("start,end,distance,duration\nA,B,2,20\nB,C,,\nA,C,5.5,30\n")
+	table = LegTable.from_csv(path)
+	assert table.names == ["A", "B", "C"]
+	assert list(table.distance) == [2, 1, 5.5] and list(table.duration) == [20, 60, 30]
+	graph = RouteGraph(table, names=["C"])
+	assert graph.names == ["C", "A", "B"]
+	assert graph.find("A", "C").minDistance.route == ["A", "B", "C"]
+	graph.remove_leg(makep2p("B", "A", 2, 20))
+	assert graph.find("A", "C").minDistance.route == ["A", "C"]
+	assert len(LegTable.from_csv(io.StringIO("end,start\nB,A\n"))) == 1
+	with pytest.raises(ValueError, match="no end column"):
+		LegTable.from_csv(io.StringIO("start,stop\nA,B\n"))
+	with pytest.raises(ValueError, match="line 3"):
+		LegTable.from_csv(io.StringIO("start,end,distance\nA,B,1\nB,C,far\n"))
@@ -0,0 +1,119 @@
+from src.python.routeFinder import LegTable, RouteGraph, makep2p
+from src.python.route_index import RouteIndex, cached_index, legs_key
+import pytest
+
+
+def random_legs(seed, points=9, legs=16):
+	import random
+	rng = random.Random(seed)
+	names = [f"P{i}" for i in range(points)]
+	pairs = set()
+	while len(pairs) < legs:
+		a, b = rng.sample(names, 2)
+		if (b, a) not in pairs:
+			pairs.add((a, b))
+	return [makep2p(a, b, rng.randint(1, 9), rng.randint(1, 90)) for a, b in sorted(pairs)]
+
+
+def assert_matches_search(index, legs):
+	graph = RouteGraph(legs)
+	for start in graph.names:
+		for end in graph.names:
+			for by in ("distance", "duration"):
+				expected = graph.shortest(start, end, by)
+				found = index.route(start, end, by)
+				if expected is None:
+					assert found is None
+				else:
+					assert (found.distance, found.duration) == (expected.distance, expected.duration)
+					assert len(found.route) == len(expected.route)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_index_matches_search(seed):
+	legs = random_legs(seed)
+	assert_matches_search(RouteIndex(legs), legs)
+
+
+def test_find_answers_like_findRoute():
+	legs = [makep2p("A", "B", 2, 20), makep2p("B", "C", 3, 30), makep2p("A", "C", 10, 40)]
+	found = RouteIndex(legs).find("A", "C")
+	assert found.minDistance.route == ["A", "B", "C"]
+	assert found.minDuration.route == ["A", "C"]
+	assert found.fewestStops.route == ["A", "C"]
+	assert sorted(found.allRoutes) == [["A", "B", "C"], ["A", "C"]]
+	index = RouteIndex(legs + [makep2p("D", "E")])
+	assert index.find("A", "A") == "ERROR: same start and end points"
+	assert index.find("Z", "A") == "ERROR: start point is not in routes"
+	assert index.find("A", "Z") == "ERROR: end point is not in routes"
+	assert index.find("A", "E") == "ERROR: there is no connection between start and end"
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_leg_changes_clear_only_what_they_touch(seed):
+	legs = random_legs(seed)
+	index = RouteIndex(legs)
+	extra = makep2p("P0", "P8", 1, 1)
+	index.add_leg(extra)
+	assert_matches_search(index, legs + [extra])
+	index.build()
+	removed = legs[0]
+	index.remove_leg(removed)
+	assert_matches_search(index, legs[1:] + [extra])
+	with pytest.raises(ValueError):
+		index.remove_leg(removed)
+
+
+def test_unused_leg_clears_no_rows():
+	legs = [makep2p("A", "B", 1, 10), makep2p("B", "C", 1, 10), makep2p("C", "D", 1, 10)]
+	index = RouteIndex(legs + [makep2p("A", "D", 50, 500)])
+	index.remove_leg(makep2p("D", "A", 50, 500))
+	assert all(row is not None for rows in index.rows.values() for row in rows)
+	index.add_leg(makep2p("A", "C", 1, 10))
+	assert [row is None for row in index.rows["distance"]] == [True, False, True, True]
+
+
+def test_new_point_clears_every_row():
+	legs = random_legs(1)
+	index = RouteIndex(legs)
+	index.add_leg(makep2p("P3", "Q", 4, 40))
+	assert all(row is None for rows in index.rows.values() for row in rows)
+	assert index.route("Q", "P3").route == ["Q", "P3"]
+
+
+def test_key_ignores_leg_order_and_tracks_changes():
+	legs = random_legs(2)
+	index = RouteIndex(legs)
+	assert index.key == legs_key(legs[::-1]) == legs_key([makep2p(*leg.step[::-1], leg.distance, leg.duration) for leg in legs])
+	assert RouteIndex(LegTable(legs), build=False).key == index.key
+	extra = makep2p("P1", "P7", 3, 3)
+	index.add_leg(extra)
+	assert index.key == legs_key(legs + [extra]) != legs_key(legs)
+	index.remove_leg(extra)
+	assert index.key == legs_key(legs)
+
+
+def test_saves_and_loads(tmp_path):
+	legs = random_legs(4)
+	path = tmp_path / "index.routes"
+	RouteIndex(legs).save(path)
+	loaded = RouteIndex.load(path, legs[::-1])
+	assert loaded is not None and all(row is not None for row in loaded.rows["duration"])
+	assert_matches_search(loaded, legs)
+	assert RouteIndex.load(path, legs[1:]) is None
+	assert RouteIndex.load(tmp_path / "missing.routes", legs) is None
+
+
+def test_cached_index_builds_once(tmp_path):
+	legs = random_legs(5)
+	first = cached_index(legs, tmp_path)
+	[saved] = list(tmp_path.iterdir())
+	assert saved.name == f"{first.key}.routes"
+	mtime = saved.stat().st_mtime_ns
+	assert_matches_search(cached_index(legs, tmp_path), legs)
+	assert saved.stat().st_mtime_ns == mtime
+
+
+def test_pool_builds_the_same_rows():
+	legs = random_legs(6, points=12, legs=24)
+	assert RouteIndex(legs, jobs=2).rows == RouteIndex(legs).rows
@@ -0,0 +1,45 @@
+# test_scale_model.py
+import json
+import pytest
+from src.python.compiled_scale import CompiledScale
+from src.python.relative_sizes import RelativeSizes
+from src.python.scale_model import Scale, Unit, load_scales, to_config
+from src.python.scale_registry import DEFAULT_CONFIG_PATH, ConfigSnapshot
+
+@pytest.fixture
+def config():
+    with open(DEFAULT_CONFIG_PATH) as f:
+        return json.load(f)
+
+class TestModel:
+    def test_round_trips_the_config(self, config):
+        assert to_config(load_scales(config)) == config
+
+    def test_snapshot_serves_the_config_shape(self, config):
+        assert ConfigSnapshot(config, 1).config == config
+
+    def test_units_are_slotted_and_immutable(self, config):
+        unit = load_scales(config)[0].units[0]
+        assert not hasattr(unit, "__dict__")
+        with pytest.raises(AttributeError):
+            unit.conversion_factor = 2
+        with pytest.raises(AttributeError):
+            unit.extra = 1
+
+    def test_from_dict_defaults(self):
+        unit = Unit.from_dict({"name": "glass", "conversionFactor": 1, "aliases": ["g", "", 3]})
+        assert (unit.plural, unit.decimal_places, unit.aliases) == ("glasss", 0, ("g",))
+        assert Unit.from_dict({"name": "cup", "conversionFactor": 1, "aliases": "c"}).aliases == ()
+
+class TestConvertsLikeDicts:
+    def test_scale_converts_as_its_dict_does(self, config):
+        rs = RelativeSizes()
+        for raw, scale in zip(config["scales"], load_scales(config)):
+            assert isinstance(CompiledScale(scale).scale, Scale)
+            for unit in raw["units"]:
+                for value in (0, 1, 0.5, 37, 90000, -2500, 1e9):
+                    assert rs.convert(value, unit["plural"], scale) == rs.convert(value, unit["plural"], raw)
+
+    def test_find_best_unit_takes_units(self, config):
+        [time] = [s for s in load_scales(config) if s.name == "time"]
+        assert RelativeSizes().find_best_unit(7200, time.units).name == "hour"
@@ -0,0 +1,167 @@
+# test_scale_registry.py
+import json
+import os
+import pytest
+from src.python.scale_registry import ConfigError, ScaleRegistry, config_version, read_config, validate_config
+
+def time_scale(name="time"):
+    return {
+        "name": name,
+        "defaultUnit": "second",
+        "units": [
+            {"name": "second", "plural": "seconds", "conversionFactor": 1, "decimalPlaces": 0},
+            {"name": "minute", "plural": "minutes", "conversionFactor": 60, "decimalPlaces": 1}
+        ]
+    }
+
+FIRST = config_version({"scales": [time_scale()]})
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.json"
+
+    def write(config):
+        # Bump the mtime explicitly: two writes can land in the same tick
+        stamp = os.stat(path).st_mtime_ns + 1_000_000 if path.exists() else None
+        path.write_text(config if isinstance(config, str) else json.dumps(config))
+        if stamp is not None:
+            os.utime(path, ns=(stamp, stamp))
+
+    write({"scales": [time_scale()]})
+    write.path = str(path)
+    return write
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def registry(config_file, clock):
+    return ScaleRegistry(config_file.path, check_interval=1.0, clock=clock)
+
+class TestLoading:
+    def test_indexes_scales_and_units(self, registry):
+        snapshot = registry.current()
+        assert snapshot.version == FIRST
+        assert snapshot.scale_names == ["time"]
+        assert snapshot.scales["time"].find_unit("minutes").name == "minute"
+        assert snapshot.default_state == {"inputValue": 1, "currentUnit": "second", "currentScale": "time"}
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(ConfigError, match="not found"):
+            ScaleRegistry(str(tmp_path / "missing.json"))
+
+    @pytest.mark.parametrize("config, message", [
+        ({}, "non-empty 'scales'"),
+        ({"scales": [{"name": "x", "units": []}]}, "Invalid scale"),
+        ({"scales": [time_scale(), time_scale()]}, "Duplicate scale"),
+        ({"scales": [{**time_scale(), "name": ""}]}, "needs a name"),
+        ({"scales": [{**time_scale(), "units": [{"name": "second", "conversionFactor": 0}]}]}, "Invalid unit"),
+        ({"scales": [{**time_scale(), "defaultUnit": "hour"}]}, "Default unit"),
+    ])
+    def test_invalid_configs_are_rejected(self, config_file, config, message):
+        config_file(config)
+        with pytest.raises(ConfigError, match=message):
+            ScaleRegistry(config_file.path)
+
+    def test_validate_config_accepts_shipped_config(self):
+        validate_config(ScaleRegistry().current().config)
+
+class TestReloading:
+    # The copied scale's units are in two scales
+    @pytest.mark.filterwarnings("ignore::src.python.scale_registry.ConfigWarning")
+    def test_change_is_picked_up_after_check_interval(self, registry, config_file, clock):
+        config_file({"scales": [time_scale(), time_scale("duration")]})
+        assert registry.current().version == FIRST
+
+        clock.now += 1.0
+        snapshot = registry.current()
+        assert snapshot.version == config_version({"scales": [time_scale(), time_scale("duration")]})
+        assert snapshot.scale_names == ["time", "duration"]
+
+    def test_unchanged_file_keeps_version(self, registry, clock):
+        clock.now += 5.0
+        assert registry.current().version == FIRST
+
+    def test_version_follows_the_content(self, registry, config_file, clock):
+        # Another process loading the same file reports the same version
+        assert ScaleRegistry(config_file.path).version == registry.version
+        config_file({"scales": [time_scale("duration")]})
+        clock.now += 1.0
+        assert registry.current().version != FIRST
+        # Writing the first content back is the first version again
+        config_file({"scales": [time_scale()]})
+        clock.now += 1.0
+        assert registry.current().version == FIRST
+
+    def test_old_snapshot_is_left_intact(self, registry, config_file, clock):
+        old = registry.current()
+        config_file({"scales": [time_scale("duration")]})
+        clock.now += 1.0
+        registry.current()
+        assert old.scale_names == ["time"]
+        assert "time" in old.scales
+
+    def test_broken_file_keeps_previous_version(self, registry, config_file, clock):
+        config_file("{not json")
+        clock.now += 1.0
+        assert registry.current().version == FIRST
+        assert registry.last_error == "Config file contains invalid JSON"
+
+        config_file({"scales": [time_scale("duration")]})
+        clock.now += 1.0
+        assert registry.current().version == config_version({"scales": [time_scale("duration")]})
+        assert registry.last_error is None
+
+    def test_reload_callbacks(self, registry, config_file):
+        seen = []
+        registry.on_reload(seen.append)
+        config_file({"scales": [time_scale("duration")]})
+        snapshot = registry.reload()
+        assert seen == [snapshot]
+
+    def test_readers_do_not_wait_for_a_reload(self, registry, config_file, clock):
+        config_file({"scales": [time_scale("duration")]})
+        clock.now += 1.0
+        # Another thread is mid-reload: readers get the current version at once
+        with registry._reload_lock:
+            assert registry.current().version == FIRST
+        clock.now += 1.0
+        assert registry.current().version != FIRST
+
+class TestConfigCache:
+    def test_cached_config_is_reused(self, config_file, tmp_path, monkeypatch):
+        cache_path = str(tmp_path / "cache.marshal")
+        config, stamp = read_config(config_file.path, cache_path)
+        assert os.path.exists(cache_path)
+
+        def no_json(*args, **kwargs):
+            raise AssertionError("config was parsed again")
+        monkeypatch.setattr(json, "load", no_json)
+        assert read_config(config_file.path, cache_path) == (config, stamp)
+
+    def test_changed_file_is_parsed_again(self, config_file, tmp_path):
+        cache_path = str(tmp_path / "cache.marshal")
+        read_config(config_file.path, cache_path)
+        config_file({"scales": [time_scale("duration")]})
+        config, _ = read_config(config_file.path, cache_path)
+        assert config["scales"][0]["name"] == "duration"
+
+    def test_corrupt_cache_is_ignored(self, config_file, tmp_path):
+        cache_path = tmp_path / "cache.marshal"
+        cache_path.write_bytes(b"not marshal data")
+        config, _ = read_config(config_file.path, str(cache_path))
+        assert config["scales"][0]["name"] == "time"
+
+    def test_unwritable_cache_is_skipped(self, config_file, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        config, _ = read_config(config_file.path, str(blocker / "cache.marshal"))
+        assert config["scales"][0]["name"] == "time"
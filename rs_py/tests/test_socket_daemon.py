@@ -0,0 +1,219 @@
+# test_socket_daemon.py
+import asyncio
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import pytest
+from src.python.relative_sizes import relative_sizes
+from src.python.scale_registry import DEFAULT_CONFIG_PATH, ScaleRegistry, config_version
+from src.python.socket_client import SocketClient
+from src.python.socket_daemon import ConverterDaemon, remove_stale_socket
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def short_dir():
+    # Unix socket paths are limited to about 100 bytes, so stay out of tmp_path
+    path = tempfile.mkdtemp(prefix="rs")
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+@pytest.fixture
+def config_path(short_dir):
+    path = os.path.join(short_dir, "config.json")
+    shutil.copy(DEFAULT_CONFIG_PATH, path)
+    return path
+
+class RunningDaemon:
+    """A ConverterDaemon serving from an event loop in a background thread."""
+
+    def __init__(self, path, registry):
+        self.path = path
+        self.daemon = ConverterDaemon(registry)
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        async def serve():
+            ready = asyncio.Event()
+            self.task = asyncio.ensure_future(self.daemon.serve(path, ready))
+            await ready.wait()
+            started.set()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(serve(),))
+        self.thread.start()
+        assert started.wait(5)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join(5)
+        self.loop.close()
+
+@pytest.fixture
+def daemon(short_dir, config_path):
+    running = RunningDaemon(os.path.join(short_dir, "d.sock"), ScaleRegistry(config_path))
+    yield running
+    running.stop()
+
+def expected(value, unit, scale_name):
+    return relative_sizes.convert(float(value), unit, ScaleRegistry().current().scales[scale_name])
+
+class TestRequests:
+    def test_convert(self, daemon):
+        with SocketClient(daemon.path) as client:
+            response = client.convert("time", 90000, "seconds")
+        assert response == {"result": expected(90000, "seconds", "time"), "configVersion": daemon.daemon.registry.version}
+
+    def test_unit_without_scale(self, daemon):
+        with SocketClient(daemon.path) as client:
+            response = client.convert(None, 5000, "m")
+        assert response["result"] == expected(5000, "m", "distance")
+
+    @pytest.mark.parametrize("request_, error", [
+        ({"scale": "nope", "value": 1, "unit": "seconds"}, "Scale 'nope' not found"),
+        ({"scale": "time", "value": "abc", "unit": "seconds"}, "'abc' is not a valid number"),
+        ({"scale": "time", "value": 1, "unit": "parsecs"}, "Unknown unit: parsecs"),
+        ({"value": 1, "unit": "parsecs"}, "No scale has a unit 'parsecs'"),
+        ([1, 2], "Request must be a JSON object"),
+    ])
+    def test_errors(self, daemon, request_, error):
+        with SocketClient(daemon.path) as client:
+            client.send(request_)
+            assert client.receive()["error"] == error
+
+    def test_pipelined_responses_keep_request_order(self, daemon):
+        requests = [{"scale": "time", "value": n, "unit": "seconds", "id": n} for n in range(1, 2001)]
+        with SocketClient(daemon.path) as client:
+            responses = list(client.convert_many(requests, window=64))
+        assert [r["id"] for r in responses] == list(range(1, 2001))
+        assert responses[-1]["result"] == expected(2000, "seconds", "time")
+
+    def test_bad_value_fails_only_its_request(self, daemon):
+        requests = [{"scale": "time", "value": value, "unit": "seconds", "id": n}
+                    for n, value in enumerate([60, float("inf"), float("nan"), 120])]
+        with SocketClient(daemon.path) as client:
+            responses = list(client.convert_many(requests))
+        assert [r["id"] for r in responses] == [0, 1, 2, 3]
+        assert [r.get("result") for r in responses] == [expected(60, "seconds", "time"), None, None,
+                                                        expected(120, "seconds", "time")]
+        assert responses[1]["error"] == "'inf' cannot be converted"
+
+    def test_respond_catches_conversion_errors(self, monkeypatch):
+        import src.python.socket_daemon as socket_daemon
+
+        def broken(*args):
+            raise OverflowError("too big")
+
+        monkeypatch.setattr(socket_daemon, "convert_record", broken)
+        registry = ScaleRegistry()
+        response = ConverterDaemon(registry).respond(b'{"scale": "time", "value": 1, "unit": "s", "id": 7}')
+        assert response == {"error": "Request could not be converted: too big", "id": 7, "configVersion": registry.version}
+
+    def test_many_clients_at_once(self, daemon):
+        failures = []
+
+        def worker(offset):
+            with SocketClient(daemon.path) as client:
+                requests = [{"scale": "distance", "value": offset + n, "unit": "meters"} for n in range(200)]
+                for n, response in enumerate(client.convert_many(requests)):
+                    if response["result"] != expected(offset + n, "meters", "distance"):
+                        failures.append((offset + n, response))
+
+        threads = [threading.Thread(target=worker, args=(i * 1000,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert failures == []
+
+    def test_oversized_message_closes_connection(self, daemon):
+        with SocketClient(daemon.path, timeout=5) as client:
+            client.sock.sendall((1 << 30).to_bytes(4, "big"))
+            with pytest.raises(ConnectionError):
+                client.receive()
+
+class TestReload:
+    # The copied scale's units are in two scales
+    @pytest.mark.filterwarnings("ignore::src.python.scale_registry.ConfigWarning")
+    def test_reload_serves_new_config(self, daemon, config_path):
+        config = json.load(open(config_path))
+        config["scales"].append(dict(config["scales"][0], name="duration"))
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+        daemon.daemon.reload()
+
+        with SocketClient(daemon.path) as client:
+            response = client.convert("duration", 60, "seconds")
+        assert response == {"result": "60 seconds is 1.0 minute", "configVersion": config_version(config)}
+
+    def test_broken_config_keeps_old_version(self, daemon, config_path):
+        version = daemon.daemon.registry.version
+        with open(config_path, "w") as f:
+            f.write("{broken")
+        daemon.daemon.reload()
+        with SocketClient(daemon.path) as client:
+            assert client.convert("time", 60, "seconds")["configVersion"] == version
+
+class TestSocketFile:
+    def test_stale_socket_is_removed(self, short_dir):
+        path = os.path.join(short_dir, "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        remove_stale_socket(path)
+        assert not os.path.exists(path)
+
+    def test_live_socket_is_left_alone(self, daemon):
+        with pytest.raises(OSError, match="already listening"):
+            remove_stale_socket(daemon.path)
+
+    def test_socket_is_removed_on_stop(self, short_dir, config_path):
+        running = RunningDaemon(os.path.join(short_dir, "d.sock"), ScaleRegistry(config_path))
+        running.stop()
+        assert not os.path.exists(running.path)
+
+def test_cli_serve_reloads_on_sighup(short_dir, config_path):
+    path = os.path.join(short_dir, "cli.sock")
+    server = subprocess.Popen(
+        [sys.executable, "cli.py", "serve", "--socket", path, "--config", config_path],
+        cwd=ROOT, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        def convert(*args):
+            return subprocess.run(
+                [sys.executable, "cli.py", "convert", "--socket", path, *args],
+                cwd=ROOT, capture_output=True, text=True
+            )
+
+        for _ in range(100):
+            if os.path.exists(path):
+                break
+            time.sleep(0.05)
+        assert convert("time", "60", "seconds").stdout == "60 seconds is 1.0 minute\n"
+        assert convert("duration", "60", "seconds").returncode == 1
+
+        config = json.load(open(config_path))
+        config["scales"].append(dict(config["scales"][0], name="duration"))
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+        server.send_signal(signal.SIGHUP)
+        for _ in range(100):
+            result = convert("duration", "60", "seconds")
+            if result.returncode == 0:
+                break
+            time.sleep(0.05)
+        assert result.stdout == "60 seconds is 1.0 minute\n"
+    finally:
+        server.terminate()
+        server.wait(5)
+    assert not os.path.exists(path)
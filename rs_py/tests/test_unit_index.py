@@ -0,0 +1,91 @@
+# test_unit_index.py
+import json
+import pytest
+from src.python.compiled_scale import CompiledScale, compile_scales
+from src.python.scale_registry import ConfigError, ConfigWarning, ScaleRegistry, validate_config
+from src.python.unit_index import AmbiguousUnitError, UnitIndex
+
+CONFIG = {"scales": [
+    {"name": "time", "defaultUnit": "second", "units": [
+        {"name": "second", "plural": "seconds", "aliases": ["s", "sec"], "conversionFactor": 1},
+        {"name": "minute", "plural": "minutes", "aliases": ["min", "m"], "conversionFactor": 60}
+    ]},
+    {"name": "distance", "defaultUnit": "meter", "units": [
+        {"name": "meter", "plural": "meters", "aliases": ["m"], "conversionFactor": 1},
+        {"name": "foot", "plural": "feet", "conversionFactor": 0.3048}
+    ]},
+    {"name": "drinks", "defaultUnit": "glass", "units": [
+        {"name": "glass", "plural": "glasses", "conversionFactor": 1}
+    ]}
+]}
+
+@pytest.fixture
+def index():
+    return UnitIndex(compile_scales(CONFIG))
+
+class TestLookup:
+    @pytest.mark.parametrize("unit, scale", [
+        ("second", "time"), ("seconds", "time"), ("sec", "time"), ("s", "time"),
+        ("feet", "distance"), ("meterss", "distance"), ("glass", "drinks"),
+        ("furlong", None), ("", None), (5, None),
+    ])
+    def test_scale_for(self, index, unit, scale):
+        assert index.scale_for(unit) == scale
+
+    def test_ambiguous_unit(self, index):
+        with pytest.raises(AmbiguousUnitError) as e:
+            index.scale_for("m")
+        assert e.value.scale_names == ["time", "distance"]
+        assert str(e.value).startswith("Ambiguous unit: m")
+
+    def test_ambiguous_report(self, index):
+        assert index.ambiguous() == {"m": [("time", "minute"), ("distance", "meter")]}
+
+    def test_agrees_with_find_unit(self, index):
+        scales = compile_scales(CONFIG)
+        for key in index.keys + ["meterss", "secondss", "nothing"]:
+            found = [name for name, scale in scales.items() if scale.find_unit(key)]
+            assert [scale for scale, _ in index.matches(key)] == found
+
+class TestCompletion:
+    def test_prefix(self, index):
+        assert index.complete("m") == ["m", "meter", "meters", "min", "minute", "minutes"]
+        assert index.complete("mi") == ["min", "minute", "minutes"]
+        assert index.complete("x") == []
+
+    def test_prefix_in_one_scale(self, index):
+        assert index.complete("m", "distance") == ["m", "meter", "meters"]
+
+    def test_shell_completes_scales_and_units(self, monkeypatch):
+        monkeypatch.setenv("RS_CONFIG_CACHE", "")
+        from src.python.cli_shell import RelativeSizesShell
+        shell = RelativeSizesShell()
+        assert shell.complete_convert("ti", "convert ti", 8, 10) == ["time"]
+        assert "kilometers" in shell.complete_convert("k", "convert 5 k", 10, 11)
+        assert shell.complete_convert("k", "convert time 5 k", 15, 16) == []
+        assert shell.complete_convert("h", "convert time 5 h", 15, 16) == ["h", "hour", "hours", "hr", "hrs"]
+        assert shell.complete_units("w", "units w", 6, 7) == ["weight"]
+
+    def test_shell_converts_without_scale(self, monkeypatch, capsys):
+        monkeypatch.setenv("RS_CONFIG_CACHE", "")
+        from src.python.cli_shell import RelativeSizesShell
+        RelativeSizesShell().onecmd("convert 90 min")
+        assert "90.0 minutes is 1.5 hours" in capsys.readouterr().out
+
+class TestConfig:
+    def test_aliases_must_be_a_list_of_names(self):
+        config = json.loads(json.dumps(CONFIG))
+        config["scales"][0]["units"][0]["aliases"] = "s"
+        with pytest.raises(ConfigError):
+            validate_config(config)
+
+    def test_ambiguous_names_are_reported_at_load(self, tmp_path):
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps(CONFIG))
+        with pytest.warns(ConfigWarning, match="'m' matches minute \\(time\\), meter \\(distance\\)"):
+            ScaleRegistry(str(path))
+
+    def test_singular_ending_in_s(self):
+        scale = CompiledScale(CONFIG["scales"][2])
+        assert scale.find_unit("glass").name == "glass"
+        assert scale.find_unit("glasses").name == "glass"